@@ -1,27 +1,28 @@
 # =============================================================================
 # Short Evaluation: k-metrics (PUBLIC QIs), l-diversity, χ² + Cramér's V
 # =============================================================================
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from sdc.cache import read_table
+from sdc.eqclass import EquivalenceClasses
+from sdc.utility import chisq_cramer, utility_delta
+
 IN_CSV   = "anonymised_dataF_sup2222.csv"   # <-- your anonymised file
 OUT_XLSX = "risk_utility_report.xlsx"   # Excel with tables
+PRIVATE_XLSX = None   # <-- private survey path to also report what survived anonymisation
 K_FLOOR  = 3
-
-# Try SciPy; skip χ² if not available
-try:
-    from scipy.stats import chi2_contingency
-    SCIPY_OK = True
-except Exception:
-    SCIPY_OK = False
+N_WORKERS = None   # e.g. 4: count classes over a process pool on large files
 
 # ----------------------- Config: PUBLIC QIs -----------------------
 QIS_PUBLIC = ["sex", "age_group", "marital_status", "evote"]  # education EXCLUDED
 SENSITIVE  = "party"
 
 # ----------------------- Load ------------------------------------
-df = pd.read_csv(IN_CSV) if IN_CSV.lower().endswith(".csv") else pd.read_excel(IN_CSV)
+df = read_table(IN_CSV)
 if "evote" in df.columns:
     ev = pd.to_numeric(df["evote"], errors="coerce")
     ev = ev.where(ev.isin([0,1]), np.nan).astype("Int64")
@@ -29,18 +30,20 @@ if "evote" in df.columns:
 
 # ----------------------- k & l metrics ----------------------------
 def k_metrics(data: pd.DataFrame, qi_cols, sensitive=SENSITIVE, k_floor=K_FLOOR):
-    grp = data.groupby(qi_cols, dropna=False)
-    k_counts = grp.size().reset_index(name="k")
+    has_sensitive = sensitive in data.columns
+    classes = EquivalenceClasses(data, qi_cols, sensitive if has_sensitive else None,
+                                 dropna=False, sensitive_dropna=False, n_workers=N_WORKERS)
+    k_counts = classes.class_table(k_name="k")
     k_min = int(k_counts["k"].min()) if len(k_counts) else 0
     k1_classes = int((k_counts["k"] == 1).sum())
     k_dist = k_counts["k"].value_counts().sort_index()
 
-    tmp = data.merge(k_counts, on=qi_cols, how="left")
-    avg_indiv_risk = float((1.0 / tmp["k"]).mean()) if len(tmp) else float("nan")
-    rec_in_small = int((tmp["k"] < k_floor).sum())
+    # per-record k straight from the class codes (no merge back onto rows)
+    avg_indiv_risk = float(classes.risk_record.mean()) if len(data) else float("nan")
+    rec_in_small = int((classes.k_record < k_floor).sum())
 
-    if sensitive in data.columns:
-        l_tab = grp[sensitive].nunique(dropna=False).reset_index(name="l")
+    if has_sensitive:
+        l_tab = classes.class_table(k_name=None, l_name="l")
         l_min = int(l_tab["l"].min()) if len(l_tab) else 0
         l_viol = int((l_tab["l"] < 2).sum())
     else:
@@ -61,33 +64,35 @@ def k_metrics(data: pd.DataFrame, qi_cols, sensitive=SENSITIVE, k_floor=K_FLOOR)
     return k_counts, risky, l_tab, metrics
 
 # ----------------------- χ² & Cramér’s V -------------------------
-def cramers_v(chi2, n, r, c):
-    denom = n * (min(r-1, c-1))
-    if denom <= 0: return np.nan
-    return float(np.sqrt(chi2 / denom))
-
-def chisq_cramer(data: pd.DataFrame, pairs):
-    rows = []
-    if not SCIPY_OK: return rows
-    for A, B in pairs:
-        if A not in data.columns or B not in data.columns: continue
-        sub = data[[A,B]].dropna()
-        if sub.empty: continue
-        tab = pd.crosstab(sub[A], sub[B])
-        if tab.shape[0] < 2 or tab.shape[1] < 2: continue
-        chi2, p, dof, _ = chi2_contingency(tab)
-        n = int(tab.values.sum())
-        V = cramers_v(chi2, n, tab.shape[0], tab.shape[1])
-        rows.append({"var1":A,"var2":B,"n":n,"rows":tab.shape[0],"cols":tab.shape[1],
-                     "chi2":float(chi2),"dof":int(dof),"p_value":float(p),"cramers_v":V})
-    return rows
+# All pairs in one batch (sdc.utility); tables smaller than 2x2 are skipped
+def chi_table(data: pd.DataFrame, pairs):
+    pairs = [(A, B) for A, B in pairs if A in data.columns and B in data.columns]
+    res = chisq_cramer(data, pairs)
+    return res[(res["rows"] >= 2) & (res["cols"] >= 2)].to_dict("records")
 
 demo_vars = [v for v in ["sex","age_group","marital_status","education"] if v in df.columns]
 pairs = []
 if "evote" in df.columns:
     for v in demo_vars: pairs.append((v,"evote"))     # (C) channel vs demos
 for v in demo_vars: pairs.append((v,"party"))         # (A/B) party vs demos
-chi_rows = chisq_cramer(df, pairs)
+chi_rows = chi_table(df, pairs)
+
+# ----------------------- Before/after (optional) ------------------
+def load_private(path):
+    """
+    Private survey in the release's domain: the same banding, recoding
+    (education, marital status) and cleaning (party, evote) as the
+    anonymiser, so overlap and kept shares compare like with like.
+    """
+    from Martin_supressor import prepare
+    return prepare(read_table(path))
+
+delta = None
+if PRIVATE_XLSX:
+    private = load_private(PRIVATE_XLSX)
+    pairs_both = [(A, B) for A, B in pairs if A in df.columns and B in df.columns]
+    # records aligned only if none were dropped; marginals otherwise
+    delta = utility_delta(private, df, pairs_both)
 
 # ----------------------- Run metrics -----------------------------
 kc, risky, ltab, m = k_metrics(df, QIS_PUBLIC, SENSITIVE, K_FLOOR)
@@ -102,23 +107,29 @@ print(f"records in k<{K_FLOOR}: {m['records_in_k<{}'.format(K_FLOOR)]}")
 print(f"l_min(party): {m['l_min']} | l_violations: {m['l_violations']}")
 print("risk_dist_classes:", m["risk_dist_classes"])
 
-if SCIPY_OK and chi_rows:
+if chi_rows:
     print("\n=== χ² & Cramér’s V (anonymised) ===")
     df_ch = pd.DataFrame(chi_rows).sort_values("cramers_v", ascending=False)
     print(df_ch.to_string(index=False, max_rows=12))
 else:
-    print("\n[INFO] SciPy not available or no valid χ² tables; skipping χ².")
+    print("\n[INFO] No valid χ² tables; skipping χ².")
+
+if delta is not None:
+    print(f"\n=== Private → anonymised (aligned on {delta['alignment'].iloc[0]}) ===")
+    print(delta.drop(columns="alignment").to_string(index=False))
 
 # ----------------------- Excel export ----------------------------
 with pd.ExcelWriter(OUT_XLSX, engine="openpyxl") as xw:
-    kc.to_excel(xw, "k_counts_public", index=False)
-    risky.to_excel(xw, "risky_public", index=False)
-    if len(ltab): ltab.to_excel(xw, "l_diversity_public", index=False)
-    pd.DataFrame([m]).to_excel(xw, "metrics_public", index=False)
+    kc.to_excel(xw, sheet_name="k_counts_public", index=False)
+    risky.to_excel(xw, sheet_name="risky_public", index=False)
+    if len(ltab): ltab.to_excel(xw, sheet_name="l_diversity_public", index=False)
+    pd.DataFrame([m]).to_excel(xw, sheet_name="metrics_public", index=False)
     if chi_rows:
-        pd.DataFrame(chi_rows).to_excel(xw, "chisq_cramer", index=False)
+        pd.DataFrame(chi_rows).to_excel(xw, sheet_name="chisq_cramer", index=False)
+    if delta is not None:
+        delta.to_excel(xw, sheet_name="utility_delta", index=False)
     # quick audit
-    pd.DataFrame({"column": sorted(df.columns)}).to_excel(xw, "columns_audit", index=False)
+    pd.DataFrame({"column": sorted(df.columns)}).to_excel(xw, sheet_name="columns_audit", index=False)
 
 print(f"\n[OK] Wrote Excel report: {Path(OUT_XLSX).resolve()}")
 print("[DONE]")
\ No newline at end of file
@@ -1,44 +1,39 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from sdc.ages import dob_to_age_band
+from sdc.cache import read_table
+from sdc.eqclass import ClassIndex, EquivalenceClasses
+from sdc.hierarchy import OTHER, Hierarchy
+from sdc.pram import adjacent_matrix, apply_pram, flip_matrix, n_changed
+from sdc.stream import read_chunks, stream_anonymise
+from sdc.suppression import local_suppression
+
 # ---------------- Config ----------------
 INPUT = "Group goopers Dataset F-20251103\private_dataF.xlsx"         # <-- set your private survey path
 OUTPUT = "anonymised_dataF_sup2222.csv"  # <-- output CSV (evote + education published)
 SURVEY_DATE = datetime(2025, 11, 7)
 K = 3
 RANDOM_SEED = 69
-np.random.seed(RANDOM_SEED)
-rng = np.random.default_rng(RANDOM_SEED)
+CHUNK_SIZE = None   # e.g. 100_000: stream INPUT in chunks (registers larger than RAM)
+
+# Ordered age bands (adjacent PRAM moves between neighbours)
+AGE_BANDS = ['18-30', '31-50', '51+']
+
+# PRAM change probability per QI (age_group: to a neighbouring band)
+PRAM_P = {'sex': 0.01, 'age_group': 0.02, 'education': 0.03, 'marital_status': 0.01, 'evote': 0.03}
 
 # PUBLIC QIs for k-anonymity guarantee (education EXCLUDED)
 PUB  = ['sex', 'age_group', 'marital_status', 'evote']
 BASE = ['sex', 'age_group', 'marital_status']
 
-# ---------------- Load & basic cleaning ----------------
-df = pd.read_excel(INPUT)
-
-# Drop direct identifiers (ZIP not published nor used)
-for c in ['name', 'citizenship', 'zip']:
-    if c in df.columns:
-        df.drop(columns=c, inplace=True, errors='ignore')
-
-# ------------- Age grouping from dob (3 fixed bands) -----
-def dob_to_age_group(dob):
-    dob_parsed = pd.to_datetime(dob, errors='coerce', dayfirst=True)
-    if pd.isnull(dob_parsed):
-        return np.nan
-    age = int((SURVEY_DATE - dob_parsed).days // 365.25)
-    return "18-30" if age <= 30 else "31-50" if age <= 50 else "51+"
-
-if 'dob' in df.columns:
-    df['age_group'] = df['dob'].apply(dob_to_age_group)
-    df.drop(columns=['dob'], inplace=True, errors='ignore')
-elif 'age_group' not in df.columns:
-    raise ValueError("Neither 'dob' nor 'age_group' present.")
-
 # ------------- Collapse education & marital --------------
-education_map = {
+EDUCATION = Hierarchy('education', [('grouped', {
     "Primary education": "Lower education",
     "Upper secondary education": "Lower education",
     "Vocational Education and Training (VET)": "Lower education",
@@ -48,89 +43,79 @@ education_map = {
     "Masters programmes": "Higher education",
     "PhD programmes": "Higher education",
     "Not stated": "Lower education",
-    "Education": "Lower education"
-}
-df['education'] = df.get('education', "Lower education")
-df['education'] = df['education'].map(education_map).fillna("Lower education")
+    "Education": "Lower education",
+    OTHER: "Lower education"
+})])
 
-marital_map = {
+MARITAL_STATUS = Hierarchy('marital_status', [('grouped', {
     "Married": "Married",
     "Married/separated": "Married",
     "Separated": "Married",
     "Never married": "Not married",
     "Divorced": "Not married",
-    "Widowed": "Not married"
-}
-df['marital_status'] = df.get('marital_status', "Not married")
-df['marital_status'] = df['marital_status'].map(marital_map).fillna("Not married")
-
-# Sensitive attribute cleanup
-if 'party' not in df.columns:
-    raise ValueError("Missing 'party' in input data.")
-# Optional: keep 'Invalid vote' as missing so we don't invent signal
-df.loc[df['party'].astype(str).str.strip().eq('Invalid vote'), 'party'] = np.nan
-
-# Coerce evote to {0,1,NaN}
-if 'evote' not in df.columns:
-    raise ValueError("Missing 'evote' in input data.")
-df['evote'] = pd.to_numeric(df['evote'], errors='coerce')
-df.loc[~df['evote'].isin([0, 1]), 'evote'] = np.nan
-df['evote'] = df['evote'].astype('Int64')
-
-# ---------------- Initial k-suppression on evote ----------
-# (Only PUBLIC QIs used; education excluded)
-freq = df.groupby(PUB, dropna=False).size().reset_index(name='count')
-df = df.merge(freq, on=PUB, how='left')
-mask_small = df['count'] < K
-df.loc[mask_small, 'evote'] = pd.NA
-init_suppressed = int(mask_small.sum())
-df.drop(columns=['count'], inplace=True, errors=True)
-print(f"Suppressed evote for {init_suppressed} records (groups with size < {K}).")
+    "Widowed": "Not married",
+    OTHER: "Not married"
+})])
+
+# ---------------- Load & basic cleaning ----------------
+def prepare(df, age_bands=AGE_BANDS):
+    """Drop identifiers, band ages, collapse education/marital, clean party and evote."""
+    df = df.copy()
+
+    # Drop direct identifiers (ZIP not published nor used)
+    for c in ['name', 'citizenship', 'zip']:
+        if c in df.columns:
+            df.drop(columns=c, inplace=True, errors='ignore')
+
+    # ------------- Age grouping from dob (fixed bands) -----
+    if 'dob' in df.columns:
+        df['age_group'] = dob_to_age_band(df['dob'], age_bands, reference=SURVEY_DATE,
+                                          year_days=365.25, dayfirst=True)
+        df.drop(columns=['dob'], inplace=True, errors='ignore')
+    elif 'age_group' not in df.columns:
+        raise ValueError("Neither 'dob' nor 'age_group' present.")
+
+    df['education'] = df.get('education', "Lower education")
+    df['education'] = EDUCATION.generalise(df['education'], 'grouped')
+    df['marital_status'] = df.get('marital_status', "Not married")
+    df['marital_status'] = MARITAL_STATUS.generalise(df['marital_status'], 'grouped')
+
+    # Sensitive attribute cleanup
+    if 'party' not in df.columns:
+        raise ValueError("Missing 'party' in input data.")
+    # Optional: keep 'Invalid vote' as missing so we don't invent signal
+    df.loc[df['party'].astype(str).str.strip().eq('Invalid vote'), 'party'] = np.nan
+
+    # Coerce evote to {0,1,NaN}
+    if 'evote' not in df.columns:
+        raise ValueError("Missing 'evote' in input data.")
+    df['evote'] = pd.to_numeric(df['evote'], errors='coerce')
+    df.loc[~df['evote'].isin([0, 1]), 'evote'] = np.nan
+    df['evote'] = df['evote'].astype('Int64')
+    return df
 
 # ---------------- PRAM (small noise to QIs) ---------------
-def pram_2cat(series, cats, p):
-    """Flip between two categories with probability p (keeps NaN)."""
-    s = series.copy()
-    m = s.notna()
-    s = s.astype(object)
-    idx = s[m].index
-    u = rng.random(len(idx))
-    for i, ix in enumerate(idx):
-        val = s.at[ix]
-        if val not in cats:
-            continue
-        if u[i] < p:
-            s.at[ix] = cats[1] if val == cats[0] else cats[0]
-    return s
-
-def pram_age(series, p):
-    """Adjacent PRAM for ordered age bands (3 fixed bands)."""
-    order = ['18-30', '31-50', '51+']
-    s = series.copy().astype(object)
-    m = s.notna()
-    idx = s[m].index
-    u = rng.random(len(idx))
-    for i, ix in enumerate(idx):
-        val = s.at[ix]
-        if val not in order:
-            continue
-        r = u[i]
-        if val == '18-30':
-            if r < p: s.at[ix] = '31-50'
-        elif val == '31-50':
-            if r < p/2: s.at[ix] = '18-30'
-            elif r < p: s.at[ix] = '51+'
-        elif val == '51+':
-            if r < p: s.at[ix] = '31-50'
-    return s
-
-# Apply gentle PRAM (education is published but NOT used in k calcs)
-df['sex'] = pram_2cat(df['sex'], ['Female', 'Male'], p=0.01)
-df['age_group'] = pram_age(df['age_group'], p=0.02)  # 3 bands unchanged
-df['education'] = pram_2cat(df['education'], ['Lower education', 'Higher education'], p=0.03)
-df['marital_status'] = pram_2cat(df['marital_status'], ['Married', 'Not married'], p=0.01)
-ev_mask = df['evote'].notna()
-df.loc[ev_mask, 'evote'] = pram_2cat(df.loc[ev_mask, 'evote'], [0, 1], p=0.03)
+def apply_qi_pram(df, rng, pram_p=PRAM_P, age_bands=AGE_BANDS):
+    """
+    Apply gentle PRAM (education is published but NOT used in k calcs).
+    One uniform per value + cumulative lookup in the transition matrix
+    (flip_matrix: 2-category flip with prob p, adjacent_matrix: ordered age bands).
+    Returns the frame and the realised transitions per QI.
+    """
+    df = df.copy()
+    t = {}
+    df['sex'], t['sex'] = apply_pram(df['sex'], ['Female', 'Male'], flip_matrix(2, p=pram_p['sex']), rng)
+    df['age_group'], t['age_group'] = apply_pram(df['age_group'], age_bands,
+                                                 adjacent_matrix(len(age_bands), p=pram_p['age_group']),
+                                                 rng)  # bands unchanged
+    df['education'], t['education'] = apply_pram(df['education'], ['Lower education', 'Higher education'],
+                                                 flip_matrix(2, p=pram_p['education']), rng)
+    df['marital_status'], t['marital_status'] = apply_pram(df['marital_status'], ['Married', 'Not married'],
+                                                           flip_matrix(2, p=pram_p['marital_status']), rng)
+    ev_mask = df['evote'].notna()
+    df.loc[ev_mask, 'evote'], t['evote'] = apply_pram(df.loc[ev_mask, 'evote'], [0, 1],
+                                                      flip_matrix(2, p=pram_p['evote']), rng)
+    return df, t
 
 # -------- Enforce k≥K on PUBLIC QIs (no age change) -------
 def enforce_k_public(df_in, K, max_rounds=4):
@@ -140,68 +125,77 @@ def enforce_k_public(df_in, K, max_rounds=4):
       2) Topping up that NaN bucket to K by suppressing a few more evote within same BASE cluster
       3) If still failing, locally coarsen marital_status to 'Any' (age bands unchanged)
       4) As last resort, drop failing PUBLIC classes
+    Class sizes are kept in a ClassIndex that is updated as records move
+    between classes, so no step regroups or masks the whole frame.
     """
     dfw = df_in.copy()
+    index = ClassIndex(dfw, PUB, n_cluster=len(BASE))
+    suppressed, coarsened = [], []
+
+    def apply_changes():
+        dfw.iloc[suppressed, dfw.columns.get_loc('evote')] = pd.NA
+        dfw.iloc[coarsened, dfw.columns.get_loc('marital_status')] = 'Any'
+        return dfw
+
+    def suppress(key, positions):
+        index.move(key, positions, key[:-1] + (None,))
+        suppressed.extend(positions)
 
     for _ in range(max_rounds):
-        freq_pub = dfw.groupby(PUB, dropna=False).size().reset_index(name='k_pub')
-        small_pub = freq_pub[freq_pub['k_pub'] < K]
-        if small_pub.empty:
-            return dfw, []
+        small_pub = index.small(K)
+        if not small_pub:
+            return apply_changes(), []
 
         # Step 1: Move small 0/1 classes to NaN & top up NaN bucket to K
-        for _, row in small_pub.iterrows():
-            sx, ag, ms, ev = row['sex'], row['age_group'], row['marital_status'], row['evote']
-            base_mask = (dfw['sex'].eq(sx)) & (dfw['age_group'].eq(ag)) & (dfw['marital_status'].eq(ms))
+        for key in small_pub:
+            sx, ag, ms, ev = key
+            base = (sx, ag, ms)
+            if None in base:
+                continue  # a missing BASE value never matches its cluster
 
-            if pd.notna(ev):
-                dfw.loc[base_mask & dfw['evote'].eq(ev), 'evote'] = pd.NA
+            if ev is not None:
+                suppress(key, list(index.rows(key)))
 
-            cluster_idx = dfw.index[base_mask]
-            nan_count = dfw.loc[cluster_idx, 'evote'].isna().sum()
-            need = K - nan_count
+            need = K - index.count(base + (None,))
             if need > 0:
-                cand_idx = dfw.index[base_mask & dfw['evote'].notna()]
-                if len(cand_idx):
-                    to_sup = list(cand_idx[:need])
-                    dfw.loc[to_sup, 'evote'] = pd.NA
+                voted = [c for c in index.cluster(base) if c[-1] is not None]
+                to_sup = {}
+                for pos, cls in index.first_rows(voted, need):
+                    to_sup.setdefault(cls, []).append(pos)
+                for cls, positions in to_sup.items():
+                    suppress(cls, positions)
 
         # Step 2: If still failing, coarsen marital to 'Any' in those BASE clusters (age unchanged)
-        freq_pub2 = dfw.groupby(PUB, dropna=False).size().reset_index(name='k_after')
-        still_small = freq_pub2[freq_pub2['k_after'] < K]
-        if still_small.empty:
-            return dfw, []
+        still_small = index.small(K)
+        if not still_small:
+            return apply_changes(), []
 
         changed = False
-        for _, row in still_small.iterrows():
-            sx, ag, ms, ev = row['sex'], row['age_group'], row['marital_status'], row['evote']
-            base_mask = (dfw['sex'].eq(sx)) & (dfw['age_group'].eq(ag)) & (dfw['marital_status'].eq(ms))
+        for key in still_small:
+            sx, ag, ms, ev = key
             if ms != 'Any':
-                dfw.loc[base_mask, 'marital_status'] = 'Any'
                 changed = True
+                if sx is None or ag is None or ms is None:
+                    continue
+                for cls in index.cluster((sx, ag, ms)):
+                    rows = list(index.rows(cls))
+                    index.move(cls, rows, (sx, ag, 'Any', cls[-1]))
+                    coarsened.extend(rows)
 
         if not changed:
             break  # nothing else we can do in this loop
 
     # Step 3: Last resort—drop failing PUBLIC classes
-    freq_final = dfw.groupby(PUB, dropna=False).size().reset_index(name='k_pub')
-    failing = freq_final[freq_final['k_pub'] < K]
-    drop_index = pd.Index([])
-    if not failing.empty:
-        for _, row in failing.iterrows():
-            m = (dfw['sex'].eq(row['sex']) &
-                 dfw['age_group'].eq(row['age_group']) &
-                 dfw['marital_status'].eq(row['marital_status']) &
-                 ((dfw['evote'].isna() & pd.isna(row['evote'])) | (dfw['evote'] == row['evote'])))
-            drop_index = drop_index.union(dfw.index[m])
-        dfw = dfw.drop(index=drop_index)
+    drop_pos = []
+    for key in index.small(K):
+        if None not in key[:-1]:
+            drop_pos.extend(index.drop(key))
+    dfw = apply_changes()
+    drop_index = dfw.index[drop_pos].sort_values()
+    dfw = dfw.drop(index=drop_index)
 
     return dfw, list(drop_index)
 
-df, dropped = enforce_k_public(df, K=K, max_rounds=4)
-if dropped:
-    print(f"[INFO] Dropped {len(dropped)} record(s) to satisfy k≥{K} on PUBLIC QIs (age bands unchanged).")
-
 # --------- REPAIR l-diversity on 'party' without suppression ---------
 # Strategy:
 # 1) Pairwise SWAPS between RED-only and GREEN-only PUBLIC classes (preserve marginals)
@@ -216,77 +210,82 @@ def compute_party_counts_by_pub(data):
     vc = vc[['Red','Green']]
     return vc
 
-def sample_index_in_class(data, key, party_value=None):
-    """Pick a row index from a PUBLIC class; optionally restricted to a party value."""
-    m = (data['sex'].eq(key[0]) &
-         data['age_group'].eq(key[1]) &
-         data['marital_status'].eq(key[2]) &
-         ((data['evote'].isna() & pd.isna(key[3])) | (data['evote'] == key[3])))
-    if party_value is not None:
-        m = m & (data['party'] == party_value)
-    idx = data.index[m]
-    if len(idx) == 0: return None
-    return rng.choice(idx)
-
-def repair_party_l_diversity(df_in, max_swaps=1000, max_flips=1000):
+def sample_index_in_class(index, key, party_value, rng):
+    """Pick a row position from a PUBLIC class restricted to a party value."""
+    rows = index.rows(tuple(key) + (party_value,))
+    if not rows: return None
+    # Same draw as choosing from the class's row labels in frame order
+    return rng.choice(rows)
+
+def repair_party_l_diversity(df_in, rng, max_swaps=1000, max_flips=1000):
     dfw = df_in.copy()
+    # Row positions per (PUBLIC class, party), built once and kept in step
+    # with every swap/flip instead of re-scanning the frame per draw
+    index = ClassIndex(dfw, PUB + ['party'], n_cluster=len(PUB))
+    new_party = {}
+
+    def relabel(i, pos, old, new):
+        index.move(tuple(keys[i]) + (old,), [pos], tuple(keys[i]) + (new,))
+        counts[old][i] -= 1
+        counts[new][i] += 1
+        new_party[pos] = new
 
     # 1) Swaps between RED-only and GREEN-only classes
     vc = compute_party_counts_by_pub(dfw)
-    red_only = vc[(vc['Red'] > 0) & (vc['Green'] == 0)].copy()
-    green_only = vc[(vc['Green'] > 0) & (vc['Red'] == 0)].copy()
+    keys = list(vc.index)
+    counts = {p: vc[p].to_numpy().copy() for p in ['Red', 'Green']}
+    red_only = np.flatnonzero((counts['Red'] > 0) & (counts['Green'] == 0))
+    green_only = np.flatnonzero((counts['Green'] > 0) & (counts['Red'] == 0))
 
     n_swaps = 0
     # Align pair counts
     n_pairs = min(len(red_only), len(green_only), max_swaps)
-    if n_pairs > 0:
-        red_keys = list(red_only.index)[:n_pairs]
-        green_keys = list(green_only.index)[:n_pairs]
-        for rk, gk in zip(red_keys, green_keys):
-            # Pick a Red in rk and a Green in gk
-            idx_r = sample_index_in_class(dfw, rk, 'Red')
-            idx_g = sample_index_in_class(dfw, gk, 'Green')
-            if idx_r is None or idx_g is None: 
-                continue
-            # Swap party labels
-            dfw.at[idx_r, 'party'], dfw.at[idx_g, 'party'] = dfw.at[idx_g, 'party'], dfw.at[idx_r, 'party']
-            n_swaps += 1
+    for r, g in zip(red_only[:n_pairs], green_only[:n_pairs]):
+        # Pick a Red in rk and a Green in gk
+        pos_r = sample_index_in_class(index, keys[r], 'Red', rng)
+        pos_g = sample_index_in_class(index, keys[g], 'Green', rng)
+        if pos_r is None or pos_g is None:
+            continue
+        # Swap party labels
+        relabel(r, pos_r, 'Red', 'Green')
+        relabel(g, pos_g, 'Green', 'Red')
+        n_swaps += 1
 
     # 2) Minimal flips for remaining l=1 classes
-    # Recompute after swaps
-    vc2 = compute_party_counts_by_pub(dfw)
-    red_only2 = vc2[(vc2['Red'] > 0) & (vc2['Green'] == 0)]
-    green_only2 = vc2[(vc2['Green'] > 0) & (vc2['Red'] == 0)]
+    # Counts were updated by the swaps, no regrouping needed
+    red_only2 = np.flatnonzero((counts['Red'] > 0) & (counts['Green'] == 0))
+    green_only2 = np.flatnonzero((counts['Green'] > 0) & (counts['Red'] == 0))
 
     n_flips = 0
     # Flip one record to create the missing party in each remaining class (bounded)
-    for key in list(red_only2.index)[:max_flips]:
-        idx = sample_index_in_class(dfw, key, 'Red')
-        if idx is not None:
-            dfw.at[idx, 'party'] = 'Green'
+    for i in red_only2[:max_flips]:
+        pos = sample_index_in_class(index, keys[i], 'Red', rng)
+        if pos is not None:
+            relabel(i, pos, 'Red', 'Green')
             n_flips += 1
-    for key in list(green_only2.index)[:max_flips - n_flips]:
-        idx = sample_index_in_class(dfw, key, 'Green')
-        if idx is not None:
-            dfw.at[idx, 'party'] = 'Red'
+    for i in green_only2[:max_flips - n_flips]:
+        pos = sample_index_in_class(index, keys[i], 'Green', rng)
+        if pos is not None:
+            relabel(i, pos, 'Green', 'Red')
             n_flips += 1
 
+    if new_party:
+        positions = list(new_party)
+        dfw.iloc[positions, dfw.columns.get_loc('party')] = [new_party[p] for p in positions]
     return dfw, n_swaps, n_flips
 
-df, party_swaps, party_flips = repair_party_l_diversity(df, max_swaps=1000, max_flips=1000)
-print(f"Party l-diversity repair: swaps={party_swaps}, flips={party_flips}")
-
 # ---------------- Metrics (PUBLIC only; education EXCLUDED) -----------
 def risk_metrics(df, qis, k=K):
-    freq = df.groupby(qis, dropna=False).size().reset_index(name='count')
-    merged = df.merge(freq, on=qis, how='left')
+    classes = EquivalenceClasses(df, qis, 'party', dropna=False)
+    freq = classes.class_table(k_name='count')
+    count = classes.k_record
     total = len(df)
-    unique = int((merged['count'] == 1).sum())
-    small = int((merged['count'] < k).sum())
-    avg_risk = float((1.0 / merged['count']).mean()) if len(merged) else float('nan')
-    # l-diversity on 'party' (exclude NaN from counting distincts)
-    l_table = df.groupby(qis)['party'].nunique(dropna=True).reset_index(name='l')
-    l_viol = int((l_table['l'] < 2).sum())
+    unique = int((count == 1).sum())
+    small = int((count < k).sum())
+    avg_risk = float(classes.risk_record.mean()) if total else float('nan')
+    # l-diversity on 'party' (exclude NaN from counting distincts),
+    # over classes without a missing QI
+    l_viol = int(((classes.l < 2) & classes.complete).sum())
     k_dist = freq['count'].value_counts().sort_index().to_dict()
     return {
         'total': total,
@@ -300,12 +299,89 @@ def risk_metrics(df, qis, k=K):
         'risk_by_k': k_dist
     }
 
-print("\n=== Evaluation Metrics (PUBLIC QIs: sex, age_group, marital_status, evote) ===")
-m_pub = risk_metrics(df, PUB, k=K)
-for k_, v_ in m_pub.items():
-    if k_ != 'risk_by_k': print(f"{k_}: {v_}")
-print("risk_by_k:", m_pub['risk_by_k'])
-
-# ---------------- Save final file -------------------------
-df.to_csv(OUTPUT, index=False)
-print(f"\nSaved output to {OUTPUT}")
\ No newline at end of file
+# ---------------- Full pipeline -----------------------------
+def anonymise(raw, k=K, seed=RANDOM_SEED, pram_p=PRAM_P, age_bands=AGE_BANDS, verbose=False):
+    """
+    generalise -> suppress -> PRAM -> enforce k -> l-repair on a raw
+    survey frame. Returns the anonymised frame and a flat summary (what
+    each step changed plus the PUBLIC risk metrics).
+    """
+    rng = np.random.default_rng(seed)
+    df = prepare(raw, age_bands)
+
+    # ---------------- Initial k-suppression on evote ----------
+    # (Only PUBLIC QIs used; education excluded)
+    # Classes a blank cannot lift to K lose their evote anyway and are
+    # left to enforce_k_public below
+    df, report = local_suppression(df, PUB, k, attributes=['evote'], unfixable='blank')
+    init_suppressed = report['cells']['evote']
+    if verbose:
+        print(f"Suppressed evote for {init_suppressed} records (groups with size < {k}).")
+
+    df, transitions = apply_qi_pram(df, rng, pram_p, age_bands)
+    if verbose:
+        for name, t in transitions.items():
+            print(f"PRAM {name}: {n_changed(t)} of {int(t.to_numpy().sum())} values changed")
+
+    df, dropped = enforce_k_public(df, K=k, max_rounds=4)
+    if verbose and dropped:
+        print(f"[INFO] Dropped {len(dropped)} record(s) to satisfy k≥{k} on PUBLIC QIs (age bands unchanged).")
+
+    df, party_swaps, party_flips = repair_party_l_diversity(df, rng, max_swaps=1000, max_flips=1000)
+    if verbose:
+        print(f"Party l-diversity repair: swaps={party_swaps}, flips={party_flips}")
+
+    summary = {'evote_suppressed': init_suppressed}
+    summary.update({f'pram_{name}': n_changed(t) for name, t in transitions.items()})
+    summary.update({'dropped': len(dropped), 'party_swaps': party_swaps, 'party_flips': party_flips})
+    summary.update({m: v for m, v in risk_metrics(df, PUB, k=k).items() if m != 'risk_by_k'})
+    return df, summary
+
+# ---------------- Chunked pipeline (larger than RAM) ---------
+def anonymise_stream(path, output, chunk_size=CHUNK_SIZE, k=K, seed=RANDOM_SEED, pram_p=PRAM_P,
+                     age_bands=AGE_BANDS):
+    """
+    generalise -> PRAM -> suppress over ``path`` in chunks of ``chunk_size``
+    rows, written to ``output`` (sdc.stream.stream_anonymise).
+
+    Generalisation and PRAM are row-local and run on every chunk, the PRAM
+    generator seeded by the chunk's first row so both passes draw the same
+    values. PRAM comes before suppression here, so the evote plan made on
+    the global PUBLIC class counts gives k≥K on the written file; records
+    a blank cannot lift to K are removed. enforce_k_public and the party
+    l-repair move records between classes of the whole frame and are not
+    run; the after-summary reports min l instead.
+    Returns the PUBLIC class counters before and after suppression and the
+    cells suppressed per QI.
+    """
+    def transform(chunk):
+        rng = np.random.default_rng([seed, int(chunk.index[0]) if len(chunk) else 0])
+        df, _ = apply_qi_pram(prepare(chunk, age_bands), rng, pram_p, age_bands)
+        return df
+
+    before, after, cells = stream_anonymise(lambda: read_chunks(path, chunk_size), transform, PUB, output,
+                                            k=k, suppress=['evote'], sensitive='party', unfixable='remove')
+    return before, after, cells
+
+
+if __name__ == "__main__" and CHUNK_SIZE:
+    before, after, cells = anonymise_stream(INPUT, OUTPUT)
+    print("Cells suppressed: " + ", ".join(f"{a}: {n}" for a, n in cells.items()))
+    comparison = pd.DataFrame.from_dict(
+        {'generalised + PRAM': before.summary(K), 'suppressed': after.summary(K)}, orient='index')
+    print(f"\n=== k≥{K} on PUBLIC QIs (chunks of {CHUNK_SIZE} rows) ===")
+    print(comparison.to_string())
+    print(f"\nSaved output to {OUTPUT}")
+
+elif __name__ == "__main__":
+    df, summary = anonymise(read_table(INPUT), verbose=True)
+
+    print("\n=== Evaluation Metrics (PUBLIC QIs: sex, age_group, marital_status, evote) ===")
+    m_pub = risk_metrics(df, PUB, k=K)
+    for k_, v_ in m_pub.items():
+        if k_ != 'risk_by_k': print(f"{k_}: {v_}")
+    print("risk_by_k:", m_pub['risk_by_k'])
+
+    # ---------------- Save final file -------------------------
+    df.to_csv(OUTPUT, index=False)
+    print(f"\nSaved output to {OUTPUT}")
@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from sdc.cache import read_table
+from sdc.eqclass import EquivalenceClasses
+from sdc.pram import dominance_flip
+from sdc.sweep import sweep
+from sdc.utility import information_loss
+
+# The pipeline itself lives in Martin_supressor.py
+from Martin_supressor import PRAM_P, PUB, anonymise, prepare, risk_metrics
+
+# ---------------- Config ----------------
+INPUT = r"Group goopers Dataset F-20251103\private_dataF.xlsx"   # <-- set your private survey path
+OUTPUT = "sweep_results.csv"
+N_WORKERS = None            # None = one per CPU
+
+# Every combination is run: generalise -> suppress -> PRAM -> l-repair
+# (-> localised PRAM on party when dominance_threshold is set) -> evaluate
+GRID = {
+    'k': [2, 3, 5],
+    'seed': [69, 70, 71],
+    'pram_scale': [0.5, 1.0, 2.0],      # multiplies every PRAM_P probability
+    'age_bands': [
+        ('18-30', '31-50', '51+'),
+        ('18-40', '41+'),
+        ('18-30', '31-45', '46-60', '61+'),
+    ],
+    'dominance_threshold': [None, 0.80],
+    'flip_frac': [(0.20, 0.40)],
+}
+
+
+# ---------------- One grid point ----------------
+def run_point(raw, k, seed, pram_scale, age_bands, dominance_threshold, flip_frac):
+    pram_p = {qi: p * pram_scale for qi, p in PRAM_P.items()}
+    df, summary = anonymise(raw, k=k, seed=seed, pram_p=pram_p, age_bands=list(age_bands))
+
+    if dominance_threshold is not None:
+        # A child of the seed: independent of the uniforms that drove PRAM,
+        # while anonymise() still matches Martin_supressor.py at this seed
+        flip_seed, = np.random.SeedSequence(seed).spawn(1)
+        low, high = flip_frac
+        df, stats = dominance_flip(df, PUB, np.random.default_rng(flip_seed),
+                                   dominance_threshold=dominance_threshold,
+                                   flip_frac_low=low, flip_frac_high=high)
+        summary['dominance_flips'] = stats['flipped']
+        metrics = risk_metrics(df, PUB, k=k)
+        metrics.pop('risk_by_k')
+        summary.update(metrics)
+
+    classes = EquivalenceClasses(df, PUB, 'party', dropna=False)
+    summary['max_dominance'] = float(classes.dominant_ratio.max())
+    summary['records_kept_pct'] = len(df) / len(raw) * 100
+
+    # Utility against the generalised data before suppression and PRAM
+    summary.update(information_loss(prepare(raw, list(age_bands)), df, PUB, k=k,
+                                    n_suppressed=len(raw) - len(df)))
+    return summary
+
+
+if __name__ == "__main__":
+    raw = read_table(INPUT)
+    results = sweep(raw, run_point, GRID, n_workers=N_WORKERS)
+
+    # Tuples as readable labels in the table
+    for c in ['age_bands', 'flip_frac']:
+        results[c] = results[c].map(lambda v: "/".join(map(str, v)))
+
+    pd.set_option('display.width', 200)
+    print(f"=== {len(results)} scenarios ===")
+    print(results.sort_values(['avg_risk_pct', 'records_kept_pct'], ascending=[True, False])
+                 .to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    results.to_csv(OUTPUT, index=False)
+    print(f"\nSaved to: {OUTPUT}")
@@ -1,9 +1,17 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
-from scipy.stats import chi2_contingency
-import matplotlib.pyplot as plt
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.utility import Associations
+
+# Charts are optional so the tests also run headless
+SHOW_PLOTS = False
 
 # Load your data
-df = pd.read_excel("Group goopers Dataset F-20251103\private_dataF.xlsx")  # or .csv
+df = read_table("Group goopers Dataset F-20251103\private_dataF.xlsx")  # or .csv
 
 # Clean and prepare
 df["party"] = df["party"].str.strip().str.title()  # Normalize party labels
@@ -14,22 +22,27 @@ df["age_bin"] = pd.cut(df["age"], bins=[18, 30, 45, 65, 120], labels=["18–29",
 # Attributes to test
 attributes = ["sex", "zip", "education", "marital_status", "citizenship", "age_bin"]
 
+# Every contingency table and χ² test in one batch (missing values left out)
+tests = Associations(df, [(attr, "party") for attr in attributes])
+results = tests.results.set_index("var1")
+
 for attr in attributes:
-    # Drop missing
-    sub = df[[attr, "party"]].dropna()
-    
     # Contingency table
-    table = pd.crosstab(sub[attr], sub["party"])
+    table = tests.table(attr, "party")
     print(f"\n{attr} × party\n", table)
     
     # Chi-square test
-    chi2, p, dof, expected = chi2_contingency(table)
+    chi2, p, dof = results.loc[attr, "chi2"], results.loc[attr, "p_value"], results.loc[attr, "dof"]
     print(f"Chi² = {chi2:.2f}, p = {p:.4f}, dof = {dof}")
-    
-    # Plot
-    table_pct = table.div(table.sum(axis=1), axis=0)
-    table_pct.plot(kind="bar", stacked=True)
-    plt.title(f"{attr} × Party")
-    plt.ylabel("Proportion")
-    plt.tight_layout()
+
+if SHOW_PLOTS:
+    import matplotlib.pyplot as plt
+
+    for attr in attributes:
+        table = tests.table(attr, "party")
+        table_pct = table.div(table.sum(axis=1), axis=0)
+        table_pct.plot(kind="bar", stacked=True)
+        plt.title(f"{attr} × Party")
+        plt.ylabel("Proportion")
+        plt.tight_layout()
     plt.show()
\ No newline at end of file
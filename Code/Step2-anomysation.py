@@ -1,42 +1,29 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
 import numpy as np
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import dob_to_age_band
+from sdc.cache import read_table
+from sdc.hierarchy import ZIP, Hierarchy
 
 # Load raw dataset
-raw_df = pd.read_excel("Group goopers Dataset F-20251103\private_dataF.xlsx", engine="openpyxl")
+raw_df = read_table("Group goopers Dataset F-20251103\private_dataF.xlsx", engine="openpyxl")
 
 # Drop citizenship
 if 'citizenship' in raw_df.columns:
     raw_df.drop(columns=['citizenship'], inplace=True)
 
 # Generalize ZIP codes into two regions
-def generalize_zip(zip_code):
-    zip_str = str(zip_code)
-    if zip_str.startswith(('21', '22')):
-        return '21-22xx'
-    else:
-        return '23-24xx'
-
-raw_df['zip'] = raw_df['zip'].apply(generalize_zip)
+raw_df['zip'] = ZIP.generalise(raw_df['zip'], 'region')
 
 # Convert DOB to age groups
-def dob_to_age_group(dob):
-    today = datetime(2025, 11, 7)
-    age = (today - pd.to_datetime(dob)).days // 365
-    if age <= 30:
-        return "18-30"
-    elif age <= 45:
-        return "31-45"
-    elif age <= 60:
-        return "46-60"
-    else:
-        return "61+"
-
-raw_df['age_group'] = raw_df['dob'].apply(dob_to_age_group)
+raw_df['age_group'] = dob_to_age_band(raw_df['dob'], "18-30/31-45/46-60/61+")
 raw_df.drop(columns=['dob'], inplace=True)
 
 # Apply new education grouping
-education_map = {
+EDUCATION = Hierarchy('education', [('grouped', {
     'Primary education': 'Lower Education',
     'Upper secondary education': 'Lower Education',
     'Vocational Education and Training (VET)': 'Lower Education',
@@ -47,8 +34,8 @@ education_map = {
     'PhD programmes': 'Higher Education',
     'Education': 'Unclassified',
     'Not stated': 'Unclassified'
-}
-raw_df['education'] = raw_df['education'].map(education_map)
+})])
+raw_df['education'] = EDUCATION.generalise(raw_df['education'], 'grouped')
 
 # Suppress marital status for k=1
 quasi_identifiers = ['age_group', 'zip', 'sex', 'education']
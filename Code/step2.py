@@ -1,10 +1,16 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime
 import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import dob_to_age_band
+from sdc.cache import read_table
+from sdc.hierarchy import OTHER, Hierarchy
 
 # === Load raw dataset ===
-raw_df = pd.read_excel(r"C:\\Users\\andre\\Downloads\\Group goopers Dataset F-20251106\\private_dataF.xlsx")
+raw_df = read_table(r"C:\\Users\\andre\\Downloads\\Group goopers Dataset F-20251106\\private_dataF.xlsx")
 
 # === Drop direct identifiers ===
 cols_to_drop = ['citizenship', 'name', 'zip']
@@ -12,24 +18,14 @@ raw_df = raw_df.drop(columns=[c for c in cols_to_drop if c in raw_df.columns])
 
 # === Convert DOB to age groups ===
 # === Convert DOB to age groups ===
-def dob_to_age_group(dob):
-    today = datetime(2025, 11, 7)
-    try:
-        age = (today - pd.to_datetime(dob)).days // 365
-    except Exception:
-        return np.nan
-    if age <= 45:
-        return "18-30"
-    elif age <= 60:
-        return "31-50"
-    else:
-        return "51+"
-
-raw_df['age_group'] = raw_df['dob'].apply(dob_to_age_group)
+# (age in whole days // 365 at 7 Nov 2025; cut at 45/60 but published
+# under the same labels as the other releases)
+raw_df['age_group'] = dob_to_age_band(raw_df['dob'], "18-45/46-60/61+",
+                                      labels=["18-30", "31-50", "51+"])
 raw_df.drop(columns=['dob'], inplace=True, errors='ignore')
 
 # === Simplify education levels ===
-education_map = {
+EDUCATION = Hierarchy('education', [('grouped', {
     'Primary education': 'Lower Education',
     'Upper secondary education': 'Lower Education',
     'Vocational Education and Training (VET)': 'Lower Education',
@@ -39,19 +35,21 @@ education_map = {
     'Masters programmes': 'Higher Education',
     'PhD programmes': 'Higher Education',
     'Education': 'Lower Education',
-    'Not stated': 'Lower Education'
-}
-raw_df['education'] = raw_df['education'].map(education_map).fillna('Lower Education')
+    'Not stated': 'Lower Education',
+    OTHER: 'Lower Education'
+})])
+raw_df['education'] = EDUCATION.generalise(raw_df['education'], 'grouped')
 
 # === Simplify marital status to married/not married ===
-marital_map = {
+MARITAL_STATUS = Hierarchy('marital_status', [('grouped', {
     'Married': 'Married',
     'Married/separated': 'Married',
     'Never married': 'Not married',
     'Divorced': 'Not married',
-    'Widowed': 'Not married'
-}
-raw_df['marital_status'] = raw_df['marital_status'].map(marital_map).fillna('Not married')
+    'Widowed': 'Not married',
+    OTHER: 'Not married'
+})])
+raw_df['marital_status'] = MARITAL_STATUS.generalise(raw_df['marital_status'], 'grouped')
 
 # === Replace 'Invalid vote' with random Red or Green ===
 np.random.seed(69)  # For reproducibility
@@ -12,9 +12,15 @@
 #   - Exports tables to Excel; optional chi-square (evote vs demographics)
 # =============================================================================
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.eqclass import EquivalenceClasses
+
 IN_CSV = "Code/anonymised_dataF_sup.csv"
 OUT_XLSX = "risk_tables.xlsx"
 OUT_CHISQ = "aux_chisq_summary.csv"
@@ -39,9 +45,11 @@ def k_metrics(data: pd.DataFrame, qi_cols, label: str):
     if not qi_cols:
         raise ValueError("No QIs provided.")
 
-    # Equivalence classes
-    grp = data.groupby(qi_cols, dropna=False)
-    k_counts = grp.size().reset_index(name="k")
+    # Equivalence classes (one factorized pass for k and l)
+    has_party = "party" in data.columns
+    classes = EquivalenceClasses(data, qi_cols, "party" if has_party else None,
+                                 dropna=False, sensitive_dropna=False)
+    k_counts = classes.class_table(k_name="k")
 
     # Core k-metrics
     k_min = int(k_counts["k"].min())
@@ -49,13 +57,12 @@ def k_metrics(data: pd.DataFrame, qi_cols, label: str):
     k_dist = k_counts["k"].value_counts().sort_index()
 
     # Record-weighted average individual risk: mean(1/k_row)
-    # (merge class sizes back to each row)
-    data_tmp = data.merge(k_counts, on=qi_cols, how="left")
-    avg_indiv_risk = float((1.0 / data_tmp["k"]).mean())
+    # (class size of each row read from its class code)
+    avg_indiv_risk = float(classes.risk_record.mean())
 
     # l-diversity on 'party'
-    if "party" in data.columns:
-        l_table = grp["party"].nunique(dropna=False).reset_index(name="l")
+    if has_party:
+        l_table = classes.class_table(k_name=None, l_name="l")
         l_min = int(l_table["l"].min())
         l_viol = l_table[l_table["l"] < 2].copy()
         l_viol_count = int(len(l_viol))
@@ -1,7 +1,15 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
 import numpy as np
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import dob_to_age_band
+from sdc.cache import read_table
+from sdc.hierarchy import OTHER, Hierarchy
+from sdc.suppression import local_suppression
+
 INPUT = "private_dataF.xlsx"
 OUTPUT = "anonymised_dataF_sup.csv"
 SURVEY_DATE = datetime(2025, 11, 7)
@@ -10,28 +18,18 @@ RANDOM_SEED = 69
 np.random.seed(RANDOM_SEED)
 
 # --- load and basic cleaning (same as your outline) ---
-df = pd.read_excel(INPUT)
+df = read_table(INPUT)
 for c in ['citizenship','name','zip']:
     if c in df.columns:
         df.drop(columns=c, inplace=True, errors=True)
 
-def dob_to_age_group(dob):
-    dob_parsed = pd.to_datetime(dob, errors='coerce')
-    if pd.isnull(dob_parsed):
-        return np.nan
-    age = int((SURVEY_DATE - dob_parsed).days // 365.25)
-    if age <= 30:
-        return "18-30"
-    elif age < 50:
-        return "31-50"
-    else:
-        return "51+"
-
-df['age_group'] = df.get('dob').apply(dob_to_age_group)
+# Age in days // 365.25; 50-year-olds are already published as "51+"
+df['age_group'] = dob_to_age_band(df.get('dob'), "18-30/31-49/50+", reference=SURVEY_DATE,
+                                  year_days=365.25, labels=["18-30", "31-50", "51+"])
 df.drop(columns=['dob'], inplace=True, errors=True)
 
 # education and marital maps (as before)
-education_map = {
+EDUCATION = Hierarchy('education', [('grouped', {
     "Primary education": "Lower education",
     "Upper secondary education": "Lower education",
     "Vocational Education and Training (VET)": "Lower education",
@@ -41,19 +39,21 @@ education_map = {
     "Masters programmes": "Higher education",
     "PhD programmes": "Higher education",
     "Not stated": "Lower education",
-    "Education": "Lower education"
-}
-df['education'] = df['education'].map(education_map).fillna("Lower education")
+    "Education": "Lower education",
+    OTHER: "Lower education"
+})])
+df['education'] = EDUCATION.generalise(df['education'], 'grouped')
 
-marital_map = {
+MARITAL_STATUS = Hierarchy('marital_status', [('grouped', {
     "Married": "Married",
     "Married/separated": "Married",
     "Separated": "Married",
     "Never married": "Not married",
     "Divorced": "Not married",
-    "Widowed": "Not married"
-}
-df['marital_status'] = df['marital_status'].map(marital_map).fillna("Not married")
+    "Widowed": "Not married",
+    OTHER: "Not married"
+})])
+df['marital_status'] = MARITAL_STATUS.generalise(df['marital_status'], 'grouped')
 
 # fix invalid votes (keep your seed)
 invalid_mask = df['party'] == 'Invalid vote'
@@ -85,18 +85,20 @@ print("BASELINE (attack includes evote):")
 print(f" Total: {baseline['total']}; Unique: {baseline['unique']} ({baseline['unique_pct']:.2f}%)")
 print(f" <{K}: {baseline['small']} ({baseline['small_pct']:.2f}%) ; Avg risk: {baseline['avg_risk_pct']:.2f}%")
 
-# ---------------- Suppress evote for small cells (correct order) ----------------
-# compute counts per full QI including evote
-freq = df.groupby(qis_attack, dropna=False).size().reset_index(name='count')
-df = df.merge(freq, on=qis_attack, how='left')
-
-# suppress evote where count < K
-mask_small = df['count'] < K
-n_suppressed = mask_small.sum()
-df.loc[mask_small, 'evote'] = np.nan
-df.drop(columns=['count'], inplace=True, errors=True)
-
-print(f"Suppressed evote for {n_suppressed} records (groups with size < {K}).")
+# ---------------- Local suppression for small cells ----------------
+# Blank the fewest cells (evote first, then marital status) that lift the
+# groups with size < K to K; a blank counts as its own value. Records
+# whose group cannot reach K by blanking are removed
+df, report = local_suppression(df, qis_attack, K, attributes=['evote', 'marital_status'],
+                               unfixable='remove')
+
+print(f"Suppressed {report['total_cells']} cells in {report['small_classes']} groups with size < {K}:")
+for attr, n in report['cells'].items():
+    print(f"  {attr}: {n}")
+if report['records_removed']:
+    print(f"  {report['records_removed']} records removed: blanking cannot lift their group to {K}")
+if report['records_below_k']:
+    raise SystemExit(f"{report['records_below_k']} records are still in groups with size < {K}")
 # ---------------- Recompute risk AFTER suppression ----------------
 # 1) attack scenario: attacker still uses evote as QI (but evote now NaN for suppressed rows)
 after_attack = risk_metrics(df, qis_attack, k=K)
@@ -0,0 +1,76 @@
+# =============================================================================
+# Benchmark: incremental re-identification audit vs. a full re-audit
+# =============================================================================
+# Usage:  python benchmarks/bench_audit.py [n_anon]
+# Audits a synthetic release against registers of 10k .. 1M people, then
+# edits a few cells the way the anonymisers do (parties flipped, zips
+# suppressed, age bands moved) and times the second audit both ways:
+#   full = reidentification_results(), incremental = LinkageAudit.audit().
+# The incremental table is checked against the full one every time.
+# =============================================================================
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.linkage import AGE_QI, SUPPRESSED, ZIP_QI, LinkageAudit, reidentification_results
+
+N_ANON = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+REGISTER_SIZES = [10_000, 100_000, 1_000_000]
+N_EDITS = 20
+RANDOM_SEED = 42
+
+DOMAINS = {
+    'sex': ['Female', 'Male'],
+    'maritalstatus_a': ['Married', 'Single'],
+    'last_voted': [0, 1],
+    'citizenship_a': ['EU', 'non EU'],
+    'age_a': ['<30', '30-49', '50-64', '65+'],
+    'zip_a': ['21xx', '22xx', '23xx', '24xx', SUPPRESSED],
+}
+
+
+def synthetic(n, rng, with_names=True):
+    df = pd.DataFrame({c: rng.choice(v, size=n) for c, v in DOMAINS.items()})
+    if with_names:
+        df['name'] = [f"person_{i}" for i in range(n)]
+    else:
+        df['party'] = rng.choice(['Red', 'Green', 'Blue'], size=n)
+    return df
+
+
+def edited(release, rng):
+    """A few anonymiser tweaks: parties flipped, zips suppressed, ages moved."""
+    release = release.copy()
+    release.loc[rng.choice(len(release), N_EDITS), 'party'] = 'Green'
+    release.loc[rng.choice(len(release), N_EDITS), ZIP_QI] = SUPPRESSED
+    release.loc[rng.choice(len(release), N_EDITS), AGE_QI] = rng.choice(DOMAINS[AGE_QI], N_EDITS)
+    return release
+
+
+rng = np.random.default_rng(RANDOM_SEED)
+anon_df = synthetic(N_ANON, rng, with_names=False)
+
+print(f"{'register':>10} {'first (s)':>10} {'full (s)':>10} {'incr (s)':>10} {'re-scored':>10} {'pairs':>12}")
+for n in REGISTER_SIZES:
+    public_df = synthetic(n, rng)
+
+    t0 = time.perf_counter()
+    audit = LinkageAudit(public_df)
+    audit.audit(anon_df)
+    t_first = time.perf_counter() - t0
+
+    release = edited(anon_df, rng)
+    t0 = time.perf_counter()
+    full = reidentification_results(release, public_df)
+    t_full = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    incremental = audit.audit(release)
+    t_incr = time.perf_counter() - t0
+    pd.testing.assert_frame_equal(incremental, full)
+
+    print(f"{n:>10,} {t_first:>10.3f} {t_full:>10.3f} {t_incr:>10.3f} {audit.rescored:>10,} {len(full):>12,}")
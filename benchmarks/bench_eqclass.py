@@ -0,0 +1,51 @@
+# =============================================================================
+# Benchmark: serial vs. pooled equivalence-class counting
+# =============================================================================
+# Usage:  python benchmarks/bench_eqclass.py [n_records]
+# Builds a synthetic survey of n_records (default 8M) with the QI domains of
+# the F datasets and times EquivalenceClasses with and without n_workers.
+# The pooled path factorizes the QIs and bincounts the class codes slice by
+# slice; it only pays off with several cores, so n_workers stays off by
+# default until this shows a speed-up on the machine at hand.
+# =============================================================================
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.eqclass import EquivalenceClasses
+
+N_RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 8_000_000
+WORKERS = [1, 2, 4, 8]
+RANDOM_SEED = 42
+
+QIS = ['age_group', 'sex', 'marital_status', 'evote']
+DOMAINS = {
+    'age_group': ['18-29', '30-49', '50-64', '65+'],
+    'sex': ['Female', 'Male'],
+    'marital_status': ['Married', 'Never married', 'Divorced', 'Widowed'],
+    'evote': [0, 1, np.nan],
+    'party': ['Red', 'Green', 'Blue', 'Yellow'],
+}
+
+rng = np.random.default_rng(RANDOM_SEED)
+df = pd.DataFrame({c: rng.choice(v, size=N_RECORDS) for c, v in DOMAINS.items()})
+
+print(f"{N_RECORDS:,} records, {os.cpu_count()} CPUs")
+print(f"{'workers':>8} {'time (s)':>10} {'speed-up':>9}")
+serial = None
+for n_workers in WORKERS:
+    t0 = time.perf_counter()
+    classes = EquivalenceClasses(df, QIS, sensitive='party', dropna=False,
+                                 n_workers=n_workers if n_workers > 1 else None)
+    elapsed = time.perf_counter() - t0
+    if serial is None:
+        serial, reference = elapsed, classes
+    else:
+        assert np.array_equal(classes.codes, reference.codes), "pooled codes differ"
+        assert np.array_equal(classes.k, reference.k), "pooled class sizes differ"
+    print(f"{n_workers:>8} {elapsed:>10.3f} {serial / elapsed:>8.2f}x")
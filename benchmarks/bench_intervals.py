@@ -0,0 +1,79 @@
+# =============================================================================
+# Benchmark: interval sweep vs. pairwise age tests with exact register ages
+# =============================================================================
+# Usage:  python benchmarks/bench_intervals.py [n_anon]
+# The anonymised side keeps its noisy age bands while the public register
+# holds exact ages (as written by part2/agecalculator.py). For registers of
+# 1k .. 1M people it times link_pairs(public_age='age'), which joins the ages
+# with a sorted sweep, against testing every (record, person) pair of a block
+# with age_groups_can_match. The pairwise test only runs on small registers.
+# =============================================================================
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.linkage import (AGE_QI, EXACT_QIS, SUPPRESSED, ZIP_QI, age_groups_can_match,
+                         link_pairs)
+
+N_ANON = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+REGISTER_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+PAIRWISE_LIMIT = 10_000
+RANDOM_SEED = 42
+
+DOMAINS = {
+    'sex': ['Female', 'Male'],
+    'maritalstatus_a': ['Married', 'Single'],
+    'last_voted': [0, 1],
+    'citizenship_a': ['EU', 'non EU'],
+    'zip_a': ['21xx', '22xx', '23xx', '24xx', SUPPRESSED],
+}
+AGE_BANDS = ['<30', '30-49', '50-64', '65+']
+
+
+def synthetic(n, rng):
+    df = pd.DataFrame({c: rng.choice(v, size=n) for c, v in DOMAINS.items()})
+    df['age'] = rng.integers(18, 96, size=n)
+    return df
+
+
+def pairwise_pairs(anon_df, public_df):
+    """Reference: every pair of a hard-QI block tested with age_groups_can_match."""
+    pairs = []
+    public_ages = public_df['age'].to_numpy()
+    public_zips = public_df[ZIP_QI].to_numpy()
+    for i, (_, row) in enumerate(anon_df.iterrows()):
+        same = np.logical_and.reduce([public_df[c].to_numpy() == row[c] for c in EXACT_QIS])
+        for j in np.flatnonzero(same):
+            if not age_groups_can_match(row[AGE_QI], public_ages[j]):
+                continue
+            if SUPPRESSED not in (row[ZIP_QI], public_zips[j]) and row[ZIP_QI] != public_zips[j]:
+                continue
+            pairs.append((i, j))
+    return pairs
+
+
+rng = np.random.default_rng(RANDOM_SEED)
+anon_df = synthetic(N_ANON, rng).drop(columns='age')
+anon_df[AGE_QI] = rng.choice(AGE_BANDS, size=N_ANON)
+
+print(f"{'register':>10} {'sweep (s)':>10} {'pairs':>12} {'pairwise (s)':>13}")
+for n in REGISTER_SIZES:
+    public_df = synthetic(n, rng)
+
+    t0 = time.perf_counter()
+    pairs = link_pairs(anon_df, public_df, public_age='age')
+    t_sweep = time.perf_counter() - t0
+
+    t_pairwise = float('nan')
+    if n <= PAIRWISE_LIMIT:
+        t0 = time.perf_counter()
+        reference = pairwise_pairs(anon_df, public_df)
+        t_pairwise = time.perf_counter() - t0
+        assert list(zip(pairs['anon_pos'], pairs['public_pos'])) == reference, \
+            "interval sweep disagrees with the pairwise test"
+
+    print(f"{n:>10,} {t_sweep:>10.3f} {len(pairs):>12,} {t_pairwise:>13.3f}")
@@ -0,0 +1,81 @@
+# =============================================================================
+# Benchmark: merge linkage vs. the old full register scan
+# =============================================================================
+# Usage:  python benchmarks/bench_linkage.py [n_anon]
+# Builds synthetic public registers of 1k .. 1M people with the same QI
+# domains as part2/ and times the identifier.py matching stage on each:
+#   merge = link_pairs(), scan = the original row-by-row loop over the register.
+# The scan is only timed (and checked against) where it finishes in reasonable time.
+# =============================================================================
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.linkage import AGE_QI, EXACT_QIS, SUPPRESSED, ZIP_QI, age_groups_can_match, link_pairs
+
+N_ANON = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+REGISTER_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SCAN_LIMIT = 10_000
+RANDOM_SEED = 42
+
+DOMAINS = {
+    'sex': ['Female', 'Male'],
+    'maritalstatus_a': ['Married', 'Single'],
+    'last_voted': [0, 1],
+    'citizenship_a': ['EU', 'non EU'],
+    'age_a': ['<30', '30-49', '50-64', '65+'],
+    'zip_a': ['21xx', '22xx', '23xx', '24xx', SUPPRESSED],
+}
+
+
+def synthetic(n, rng, with_names=True):
+    df = pd.DataFrame({c: rng.choice(v, size=n) for c, v in DOMAINS.items()})
+    if with_names:
+        df['name'] = [f"person_{i}" for i in range(n)]
+    return df
+
+
+def scan_matches(anon_row, public_df):
+    """Reference: the original full-register scan from identifier.py."""
+    matches = []
+    for idx, public_row in public_df.iterrows():
+        if not age_groups_can_match(anon_row[AGE_QI], public_row[AGE_QI]):
+            continue
+        if any(anon_row[c] != public_row[c] for c in EXACT_QIS):
+            continue
+        anon_zip, public_zip = str(anon_row[ZIP_QI]), str(public_row[ZIP_QI])
+        max_score = 5
+        if anon_zip != SUPPRESSED and public_zip != SUPPRESSED:
+            max_score += 1
+            if anon_zip != public_zip:
+                continue
+        matches.append((idx, 100.0, public_row['name']))
+    return matches
+
+
+rng = np.random.default_rng(RANDOM_SEED)
+anon_df = synthetic(N_ANON, rng, with_names=False)
+
+print(f"{'register':>10} {'merge (s)':>10} {'pairs':>12} {'scan (s)':>10} {'speed-up':>9}")
+for n in REGISTER_SIZES:
+    public_df = synthetic(n, rng)
+
+    t0 = time.perf_counter()
+    pairs = link_pairs(anon_df, public_df)
+    t_merge = time.perf_counter() - t0
+
+    t_scan = float('nan')
+    if n <= SCAN_LIMIT:
+        t0 = time.perf_counter()
+        scanned = [(i, idx) for i, (_, row) in enumerate(anon_df.iterrows())
+                   for idx, _, _ in scan_matches(row, public_df)]
+        t_scan = time.perf_counter() - t0
+        assert list(zip(pairs['anon_pos'], pairs['public_pos'])) == scanned, \
+            "merge pipeline disagrees with the full scan"
+
+    speedup = f"{t_scan / t_merge:>8.1f}x" if n <= SCAN_LIMIT else ''
+    print(f"{n:>10,} {t_merge:>10.3f} {len(pairs):>12,} {t_scan:>10.3f} {speedup}")
@@ -1,13 +1,31 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
-# Load anonymized dataset
-df = pd.read_csv(f"C:/Users/andre/Downloads/Group goopers Dataset F-20251106/suppressed_dataF.csv")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.eqclass import EquivalenceClasses
+from sdc.stream import ClassCounter, read_chunks
+
+# Anonymized dataset
+INPUT_PATH = "C:/Users/andre/Downloads/Group goopers Dataset F-20251106/suppressed_dataF.csv"
 #Group goopers Dataset F-20251106/anonymised_dataF_v2.csv
 # Define quasi-identifiers
 quasi_identifiers = ['age_group', 'sex', 'marital_status', 'evote']
+N_WORKERS = None   # e.g. 4: count classes over a process pool on large files
+CHUNK_SIZE = None   # e.g. 100_000: count classes chunk by chunk (files larger than RAM)
+DROPNA = True   # False: a blank is its own value, as in the suppressor, so blanked records are counted
 
 # Group and calculate k-anonymity metrics
-k_counts = df.groupby(quasi_identifiers).size().reset_index(name='count')
+if CHUNK_SIZE:
+    counter = ClassCounter(quasi_identifiers)
+    for chunk in read_chunks(INPUT_PATH, CHUNK_SIZE):
+        counter.update(chunk.dropna(subset=quasi_identifiers) if DROPNA else chunk)
+    k_counts = counter.class_table(k_name='count')
+else:
+    df = pd.read_csv(INPUT_PATH)
+    classes = EquivalenceClasses(df, quasi_identifiers, dropna=DROPNA, n_workers=N_WORKERS)
+    k_counts = classes.class_table(k_name='count')
 k_min = k_counts['count'].min()
 k1_records = k_counts[k_counts['count'] == 1].shape[0]
 k_distribution = k_counts['count'].value_counts().sort_index()
@@ -1,16 +1,32 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
-import numpy as np
 
-# === Load anonymized dataset ===
-df = pd.read_csv(r"C:/Users/andre/Downloads/Group goopers Dataset F-20251106/suppressed_dataF.csv")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.eqclass import EquivalenceClasses
+from sdc.stream import ClassCounter, read_chunks
+
+# === Anonymized dataset ===
+INPUT_PATH = r"C:/Users/andre/Downloads/Group goopers Dataset F-20251106/suppressed_dataF.csv"
 
 # === Define quasi-identifiers and sensitive attribute ===
 quasi_identifiers = ['age_group', 'sex', 'marital_status', 'evote']
 sensitive_attr = 'party'
-
-# === Group by quasi-identifiers ===
-grouped = df.groupby(quasi_identifiers)
-k_counts = grouped.size().reset_index(name='k')  # renamed to 'k' for clarity
+N_WORKERS = None   # e.g. 4: count classes over a process pool on large files
+CHUNK_SIZE = None   # e.g. 100_000: count classes chunk by chunk (files larger than RAM)
+DROPNA = True   # False: a blank is its own value, as in the suppressor, so blanked records are counted
+
+# === Equivalence classes on quasi-identifiers (one pass) ===
+if CHUNK_SIZE:
+    classes = ClassCounter(quasi_identifiers, sensitive_attr)
+    for chunk in read_chunks(INPUT_PATH, CHUNK_SIZE):
+        classes.update(chunk.dropna(subset=quasi_identifiers) if DROPNA else chunk)
+else:
+    df = pd.read_csv(INPUT_PATH)
+    classes = EquivalenceClasses(df, quasi_identifiers, sensitive=sensitive_attr, dropna=DROPNA,
+                                 n_workers=N_WORKERS)
+k_counts = classes.class_table(k_name='k')
 
 # === Calculate basic k-anonymity metrics ===
 k_min = k_counts['k'].min()
@@ -20,15 +36,11 @@ individual_risks = 1 / k_counts['k']
 avg_individual_risk = individual_risks.mean()
 
 # === Compute l-diversity ===
-l_diversity = grouped[sensitive_attr].nunique().reset_index(name='l_diversity')
+l_diversity = classes.class_table(k_name=None, l_name='l_diversity')
 
 # === Detect "homogeneous" groups (dominant party ≥ 80%) ===
-party_counts = df.groupby(quasi_identifiers + [sensitive_attr]).size().reset_index(name='party_count')
-group_totals = df.groupby(quasi_identifiers).size().reset_index(name='k')
-
-# Compute ratio within each group
-dominant_ratio = pd.merge(party_counts, group_totals, on=quasi_identifiers)
-dominant_ratio['party_ratio'] = dominant_ratio['party_count'] / dominant_ratio['k']
+# Party count per group together with its group size and ratio
+dominant_ratio = classes.sensitive_table(count_name='party_count', k_name='k', ratio_name='party_ratio')
 
 # Keep only groups where the dominant party ≥ 80%
 homogeneous_groups = (
@@ -1,35 +1,17 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime
 import random
+import sys
+from pathlib import Path
 
-# === Load raw dataset ===
-raw_df = pd.read_excel(r"C:\\Users\\andre\\Downloads\\Group goopers Dataset F-20251106\\private_dataF.xlsx")
-
-# === Drop direct identifiers ===
-cols_to_drop = ['citizenship', 'name', 'zip']
-raw_df = raw_df.drop(columns=[c for c in cols_to_drop if c in raw_df.columns])
-
-# === Convert DOB to age groups ===
-# === Convert DOB to age groups ===
-def dob_to_age_group(dob):
-    today = datetime(2025, 11, 7)
-    try:
-        age = (today - pd.to_datetime(dob)).days // 365
-    except Exception:
-        return np.nan
-    if age <= 30:
-        return "18-30"
-    elif age <= 50:
-        return "31-50"
-    else:
-        return "51+"
+import numpy as np
 
-raw_df['age_group'] = raw_df['dob'].apply(dob_to_age_group)
-raw_df.drop(columns=['dob'], inplace=True, errors='ignore')
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import dob_to_age_band
+from sdc.cache import read_table
+from sdc.hierarchy import OTHER, Hierarchy
+from sdc.utility import information_loss
 
 # === Simplify education levels ===
-education_map = {
+EDUCATION = Hierarchy('education', [('grouped', {
     'Primary education': 'Lower Education',
     'Upper secondary education': 'Lower Education',
     'Vocational Education and Training (VET)': 'Higher Education',
@@ -39,28 +21,55 @@ education_map = {
     'Masters programmes': 'Higher Education',
     'PhD programmes': 'Higher Education',
     'Education': 'Lower Education',
-    'Not stated': 'Lower Education'
-}
-raw_df['education'] = raw_df['education'].map(education_map).fillna('Lower Education')
+    'Not stated': 'Lower Education',
+    OTHER: 'Lower Education'
+})])
 
 # === Simplify marital status to married/not married ===
-marital_map = {
+MARITAL_STATUS = Hierarchy('marital_status', [('grouped', {
     'Married': 'Married',
     'Married/separated': 'Married',
     'Never married': 'Not married',
     'Divorced': 'Not married',
-    'Widowed': 'Not married'
-}
-raw_df['marital_status'] = raw_df['marital_status'].map(marital_map).fillna('Not married')
+    'Widowed': 'Not married',
+    OTHER: 'Not married'
+})])
+
+
+def generalise(raw_df):
+    """Row-local recoding: drop identifiers, age groups, education, marital status."""
+    # === Drop direct identifiers ===
+    cols_to_drop = ['citizenship', 'name', 'zip']
+    raw_df = raw_df.drop(columns=[c for c in cols_to_drop if c in raw_df.columns])
+
+    # === Convert DOB to age groups ===
+    # (age in whole days // 365 at 7 Nov 2025, whole column at once)
+    raw_df['age_group'] = dob_to_age_band(raw_df['dob'], "18-30/31-50/51+")
+    raw_df.drop(columns=['dob'], inplace=True, errors='ignore')
+
+    raw_df['education'] = EDUCATION.generalise(raw_df['education'], 'grouped')
+    raw_df['marital_status'] = MARITAL_STATUS.generalise(raw_df['marital_status'], 'grouped')
+    return raw_df
+
+
+if __name__ == "__main__":
+    # === Load raw dataset ===
+    private_df = read_table(r"C:\\Users\\andre\\Downloads\\Group goopers Dataset F-20251106\\private_dataF.xlsx")
+    raw_df = generalise(private_df)
+
+    # === Information loss of the recoding (from the class histograms) ===
+    loss = information_loss(private_df, raw_df, ['sex', 'education', 'marital_status'],
+                            hierarchies={'education': EDUCATION, 'marital_status': MARITAL_STATUS})
 
-# === Replace 'Invalid vote' with random Red or Green ===
-np.random.seed(69)  # For reproducibility
-raw_df.loc[raw_df['party'] == 'Invalid vote', 'party'] = np.random.choice(['Red', 'Green'], 
-                                                                          size=(raw_df['party'] == 'Invalid vote').sum())
+    # === Replace 'Invalid vote' with random Red or Green ===
+    np.random.seed(69)  # For reproducibility
+    raw_df.loc[raw_df['party'] == 'Invalid vote', 'party'] = np.random.choice(['Red', 'Green'], 
+                                                                              size=(raw_df['party'] == 'Invalid vote').sum())
 
-# === Save anonymised dataset ===
-output_path = "anonymised_dataF.csv"
-raw_df.to_csv(output_path, index=False)
+    # === Save anonymised dataset ===
+    output_path = "anonymised_dataF.csv"
+    raw_df.to_csv(output_path, index=False)
 
-print(f"Anonymisation complete. Rows retained: {len(raw_df)}")
-print(f"Saved to: {output_path}")
+    print(f"Anonymisation complete. Rows retained: {len(raw_df)}")
+    print("Information loss: " + ", ".join(f"{m} = {v:.4g}" for m, v in loss.items()))
+    print(f"Saved to: {output_path}")
@@ -0,0 +1,99 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import band_rule, exact_age
+from sdc.cache import read_table
+from sdc.hierarchy import OTHER, Hierarchy
+from sdc.lattice import Lattice
+
+# -----------------------------
+# Configuration
+# -----------------------------
+INPUT_PATH  = r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\private_dataF.xlsx"
+OUTPUT_PATH = r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\lattice_dataF.csv"
+
+K = 3
+L = 2
+dominance_threshold = 0.80
+loss = 'dm'   # 'dm' (discernibility), 'avg_class' or 'prec'
+
+# Generalisation hierarchies: every level must generalise the one below it
+hierarchies = {
+    'age': Hierarchy('age', [
+        ('10y', band_rule("18-30/31-40/41-50/51-65/66+")),
+        ('3 bands', band_rule("18-30/31-50/51+")),
+        ('suppressed', '*'),
+    ]),
+    'sex': Hierarchy('sex', [('suppressed', '*')]),
+    'education': Hierarchy('education', [
+        ('lower/higher', {
+            "Primary education": "Lower education",
+            "Upper secondary education": "Lower education",
+            "Vocational Education and Training (VET)": "Lower education",
+            "Short cycle higher education": "Higher education",
+            "Vocational bachelors educations": "Higher education",
+            "Bachelors programmes": "Higher education",
+            "Masters programmes": "Higher education",
+            "PhD programmes": "Higher education",
+            OTHER: "Lower education",
+        }),
+        ('suppressed', '*'),
+    ]),
+    'marital_status': Hierarchy('marital_status', [
+        ('married/not', {
+            "Married": "Married",
+            "Married/separated": "Married",
+            "Separated": "Married",
+            OTHER: "Not married",
+        }),
+        ('suppressed', '*'),
+    ]),
+    'evote': Hierarchy('evote', [('suppressed', '*')]),
+}
+sensitive_attr = 'party'
+
+# -----------------------------
+# Load data
+# -----------------------------
+df = read_table(INPUT_PATH)
+df = df.drop(columns=[c for c in ['name', 'citizenship', 'zip'] if c in df.columns])
+df['age'] = exact_age(df['dob'])
+df = df.drop(columns=['dob'])
+# Keep 'Invalid vote' as missing so it never counts towards l
+df.loc[df[sensitive_attr].astype(str).str.strip().eq('Invalid vote'), sensitive_attr] = np.nan
+
+# -----------------------------
+# Search the lattice
+# -----------------------------
+start = time.perf_counter()
+lattice = Lattice(df, hierarchies, sensitive=sensitive_attr)
+result = lattice.search(k=K, l=L, dominance=dominance_threshold, loss=loss)
+elapsed = time.perf_counter() - start
+
+print(f"Lattice: {len(lattice.nodes())} nodes over {', '.join(lattice.qis)}")
+if result is None:
+    print(f"No generalisation meets k≥{K}, l≥{L}, dominance<{dominance_threshold:.0%}.")
+    sys.exit(1)
+
+print(f"Evaluated {result['evaluated']} nodes, tagged {result['tagged']} by monotonicity "
+      f"({elapsed:.2f}s)\n")
+print(f"Minimal nodes meeting k≥{K}, l≥{L}, dominance<{dominance_threshold:.0%} ({loss} loss):")
+for node, score in sorted(result['frontier'], key=lambda f: f[1]):
+    print(f"  {score:>12.1f}  " + ", ".join(f"{qi}={level}" for qi, level in node.items()))
+
+print("\n=== Chosen generalisation ===")
+for qi, level in result['node'].items():
+    print(f"{qi}: {level}")
+print(f"classes: {result['n_classes']}, min k: {result['k']}, min l: {result['l']}, "
+      f"max dominance: {result['max_dominance']:.2f}")
+
+# -----------------------------
+# Save
+# -----------------------------
+out = lattice.generalise(df, result['levels'])
+out.to_csv(OUTPUT_PATH, index=False)
+print(f"\nSaved generalised data to: {OUTPUT_PATH}")
@@ -0,0 +1,113 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import dob_to_age_band, exact_age
+from sdc.cache import read_table
+from sdc.eqclass import EquivalenceClasses
+from sdc.hierarchy import OTHER, ZIP, Hierarchy
+from sdc.mondrian import anonymise
+
+# -----------------------------
+# Configuration
+# -----------------------------
+INPUT_PATH  = r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\private_dataF.xlsx"
+OUTPUT_PATH = r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\mondrian_dataF.csv"
+
+K = 3
+L = 2
+quasi_identifiers = ['sex', 'age', 'education', 'marital_status', 'evote', 'zip']
+sensitive_attr = 'party'
+
+# Ordered categories: Mondrian cuts these into contiguous ranges
+order = {
+    'education': [
+        "Not stated",
+        "Education",
+        "Primary education",
+        "Upper secondary education",
+        "Qualifying educational programmes",
+        "Vocational Education and Training (VET)",
+        "Short cycle higher education",
+        "Vocational bachelors educations",
+        "Bachelors programmes",
+        "Masters programmes",
+        "PhD programmes",
+    ],
+    'marital_status': [
+        "Married",
+        "Married/separated",
+        "Separated",
+        "Divorced",
+        "Widowed",
+        "Never married",
+    ],
+}
+
+# -----------------------------
+# Load data
+# -----------------------------
+raw_df = read_table(INPUT_PATH)
+df = raw_df.drop(columns=[c for c in ['name', 'citizenship', 'dob'] if c in raw_df.columns])
+df['age'] = exact_age(raw_df['dob'])
+# Keep 'Invalid vote' as missing so it never counts towards l
+df.loc[df[sensitive_attr].astype(str).str.strip().eq('Invalid vote'), sensitive_attr] = np.nan
+
+# -----------------------------
+# Mondrian partitioning
+# -----------------------------
+mondrian_df, part = anonymise(df, quasi_identifiers, k=K, sensitive=sensitive_attr, l=L, order=order)
+
+# -----------------------------
+# Fixed bands (global recoding as in generalisation.py) on the same QIs
+# -----------------------------
+EDUCATION = Hierarchy('education', [('grouped', {
+    'Primary education': 'Lower Education',
+    'Upper secondary education': 'Lower Education',
+    'Vocational Education and Training (VET)': 'Higher Education',
+    'Short cycle higher education': 'Lower Education',
+    'Vocational bachelors educations': 'Higher Education',
+    'Bachelors programmes': 'Higher Education',
+    'Masters programmes': 'Higher Education',
+    'PhD programmes': 'Higher Education',
+    OTHER: 'Lower Education',
+})])
+MARITAL_STATUS = Hierarchy('marital_status', [('grouped', {
+    'Married': 'Married',
+    'Married/separated': 'Married',
+    OTHER: 'Not married',
+})])
+
+fixed_df = df.copy()
+fixed_df['age'] = dob_to_age_band(raw_df['dob'], "18-30/31-50/51+")
+fixed_df['education'] = EDUCATION.generalise(df['education'], 'grouped')
+fixed_df['marital_status'] = MARITAL_STATUS.generalise(df['marital_status'], 'grouped')
+fixed_df['zip'] = ZIP.generalise(df['zip'], 'prefix')
+
+# -----------------------------
+# Compare
+# -----------------------------
+def summary(data):
+    classes = EquivalenceClasses(data, quasi_identifiers, sensitive=sensitive_attr, dropna=False)
+    return {
+        'classes': classes.n_classes,
+        'min k': int(classes.k.min()),
+        f'records k<{K}': int(classes.k[classes.k < K].sum()),
+        'min l': int(classes.l.min()),
+        'avg class size': round(classes.n_records / classes.n_classes, 2),
+        'discernibility': int((classes.k.astype(np.int64) ** 2).sum()),
+    }
+
+comparison = pd.DataFrame.from_dict(
+    {'fixed bands': summary(fixed_df), 'Mondrian': summary(mondrian_df)}, orient='index')
+print(f"=== k≥{K}, l≥{L} on {', '.join(quasi_identifiers)} ===")
+print(comparison.to_string())
+
+print(f"\nMondrian partitions: {part.max() + 1}")
+print(mondrian_df[quasi_identifiers].drop_duplicates().head(10).to_string(index=False))
+
+mondrian_df.to_csv(OUTPUT_PATH, index=False)
+print(f"\nSaved to: {OUTPUT_PATH}")
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.stream import read_chunks, stream_anonymise
+
+# Same row-local recoding as generalisation.py
+from generalisation import generalise
+
+# -----------------------------
+# Configuration
+# -----------------------------
+INPUT_PATH  = r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\private_dataF.xlsx"
+OUTPUT_PATH = r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\stream_anonymised_dataF.csv"
+
+CHUNK_SIZE = 100_000        # rows held in memory at a time
+K = 3
+quasi_identifiers = ['age_group', 'sex', 'marital_status', 'evote']
+suppressible = ['evote', 'marital_status']   # cheapest first
+sensitive_attr = 'party'
+
+# Same legacy stream as np.random.seed(69) in generalisation.py: the draws run
+# on over the chunks in file order, so every 'Invalid vote' gets the same fill
+# (as long as suppression does not remove an 'Invalid vote' record)
+rng = np.random.RandomState(69)
+
+
+def fill_invalid_votes(chunk, counts):
+    """Replace 'Invalid vote' with random Red or Green (pass 2 only; ``counts`` is not needed)."""
+    invalid = chunk[sensitive_attr] == 'Invalid vote'
+    chunk.loc[invalid, sensitive_attr] = rng.choice(['Red', 'Green'], size=int(invalid.sum()))
+    return chunk
+
+
+# -----------------------------
+# Two passes over the file: count, then suppress + write
+# -----------------------------
+before, after, cells = stream_anonymise(
+    lambda: read_chunks(INPUT_PATH, CHUNK_SIZE),
+    generalise,
+    quasi_identifiers,
+    OUTPUT_PATH,
+    k=K,
+    suppress=suppressible,
+    sensitive=sensitive_attr,
+    post=fill_invalid_votes,
+    unfixable='remove',
+)
+
+comparison = pd.DataFrame.from_dict(
+    {'generalised': before.summary(K), 'suppressed': after.summary(K)}, orient='index')
+print(f"=== k≥{K} on {', '.join(quasi_identifiers)} (chunks of {CHUNK_SIZE} rows) ===")
+print(comparison.to_string())
+print("\nCells suppressed: " + ", ".join(f"{a}: {n}" for a, n in cells.items()))
+print(f"\nSaved to: {OUTPUT_PATH}")
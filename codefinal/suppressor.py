@@ -1,27 +1,32 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
-import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.suppression import local_suppression
 
 # === Load anonymized dataset ===
 df = pd.read_csv(r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\generalised_dataF.csv")
 
 # === Define quasi-identifiers ===
 quasi_identifiers = ['age_group', 'sex', 'marital_status', 'evote']
+K = 2  # no k=1 combinations
+
+# Attributes that may be blanked, cheapest first
+suppressible = ['evote', 'marital_status', 'sex', 'age_group']
+
+# === Blank the fewest cells that lift every combination to k ===
+# (records whose combination cannot reach k by blanking are removed)
+df, report = local_suppression(df, quasi_identifiers, K, attributes=suppressible, unfixable='remove')
 
-# === Identify high-risk (k=1) combinations ===
-k_counts = df.groupby(quasi_identifiers).size().reset_index(name='count')
-high_risk_combos = k_counts[k_counts['count'] == 1][quasi_identifiers]
-
-print(f"Found {len(high_risk_combos)} high-risk (k=1) combinations to suppress evote for.")
-
-# === Blank evote for those combinations ===
-for _, combo in high_risk_combos.iterrows():
-    mask = (
-        (df['age_group'] == combo['age_group']) &
-        (df['sex'] == combo['sex']) &
-        (df['marital_status'] == combo['marital_status']) &
-        (df['evote'] == combo['evote'])
-    )
-    df.loc[mask, 'evote'] = np.nan  # blank it
+print(f"Found {report['small_classes']} high-risk (k=1) combinations to suppress.")
+for attr, n in report['cells'].items():
+    print(f"  {attr}: {n} cells suppressed")
+if report['records_removed']:
+    print(f"  {report['records_removed']} records removed: blanking cannot lift their class to k={K}")
+if report['records_below_k']:
+    raise SystemExit(f"{report['records_below_k']} records are still in classes below k={K}; nothing saved")
 
 # === Save updated dataset ===
 output_path = r"C:\Users\andre\Downloads\Group goopers Dataset F-20251106\suppressed_dataF.csv"
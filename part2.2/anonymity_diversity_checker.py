@@ -1,22 +1,22 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.eqclass import EquivalenceClasses
 
 # Load dataset
-df = pd.read_excel(r"C:\Users\Gamer\Downloads\anonymised_dataL.xlsx")
+df = read_table(r"C:\Users\Gamer\Downloads\anonymised_dataL.xlsx")
 
 
 # Quasi-identifiers (use age_a as is)
 quasi_identifiers = ['sex', 'maritalstatus_a', 'last_voted', 'citizenship_a', 'age_a']
 sensitive_attr = 'party'
+N_WORKERS = None   # e.g. 4: count classes over a process pool on large files
 
-# Count total per group
-group_totals = df.groupby(quasi_identifiers).size().reset_index(name='k')
-
-# Count per party within group
-party_counts = df.groupby(quasi_identifiers + [sensitive_attr]).size().reset_index(name='party_count')
-
-# Merge totals and compute party ratio
-dominant_ratio = pd.merge(party_counts, group_totals, on=quasi_identifiers)
-dominant_ratio['party_ratio'] = dominant_ratio['party_count'] / dominant_ratio['k']
+# Count per party within group, with group totals and party ratio (one pass)
+classes = EquivalenceClasses(df, quasi_identifiers, sensitive=sensitive_attr, n_workers=N_WORKERS)
+dominant_ratio = classes.sensitive_table(count_name='party_count', k_name='k', ratio_name='party_ratio')
 
 # Keep groups with ≥80% dominant party
 homogeneous_groups = dominant_ratio[dominant_ratio['party_ratio'] >= 0.8]
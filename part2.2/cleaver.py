@@ -1,11 +1,15 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
 
 # Read the survey list
 with open(r'C:\Users\Gamer\Downloads\survey_listL.txt', 'r') as f:
     survey_names = [line.strip() for line in f if line.strip()]
 
 # Read the Excel file
-df = pd.read_excel(r"C:\Users\Gamer\Downloads\public_data_registerL_citizenship_fixed.xlsx")
+df = read_table(r"C:\Users\Gamer\Downloads\public_data_registerL_citizenship_fixed.xlsx")
 
 # Filter to keep only rows where the name is in the survey list
 df_filtered = df[df['name'].isin(survey_names)]
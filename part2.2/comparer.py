@@ -1,58 +1,51 @@
-import pandas as pd
 import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.eqclass import EquivalenceClasses
+from sdc.linkage import homogeneous_groups
 
 # === Load datasets ===
 anonymised_path = r"C:\\Users\\Gamer\\Downloads\\anonymised_dataL.csv"
 public_data_path = r"C:\\Users\\Gamer\\Downloads\\public_data_registerL_citizenship_fixed.xlsx"
 
 anon_df = pd.read_csv(anonymised_path)
-pub_df = pd.read_excel(public_data_path)
+pub_df = read_table(public_data_path)
 
 quasi_identifiers = ["sex", "last_voted", "citizenship_a", "maritalstatus_a", "zip_a"]
 
+# Share of a group the most common party must reach (1.0 = pure groups only)
+DOMINANCE_THRESHOLD = 1.0
+
 # === Check column consistency ===
 print("\n--- Checking Columns ---")
 print("Anonymised columns:", anon_df.columns.tolist())
 print("Public columns:", pub_df.columns.tolist())
 
-# === Step 1: Find pure groups in anonymised data ===
-pure_groups = (
-    anon_df.groupby(quasi_identifiers)
-    .agg(
-        party_count=("party", lambda x: x.nunique()),
-        unique_party=("party", lambda x: list(x.unique())[0] if x.nunique()==1 else None),
-        k=("party", "count")
-    )
-    .reset_index()
-)
+# === Step 1: Find pure groups in anonymised data and their public matches ===
+# (integer class counts; candidate names as one array + offsets per group)
+groups, offsets, names = homogeneous_groups(anon_df, pub_df, quasi_identifiers,
+                                            dominance=DOMINANCE_THRESHOLD)
+total_groups = EquivalenceClasses(anon_df, quasi_identifiers).n_classes
 
 print("\n--- Pure Groups Found in Anonymised Data ---")
-print("Total QI groups:", len(anon_df.groupby(quasi_identifiers)))
-print("Pure groups (unique party):", len(pure_groups[pure_groups['party_count'] == 1]))
+print("Total QI groups:", total_groups)
+print(f"Pure groups (party share ≥ {DOMINANCE_THRESHOLD:.0%}):", len(groups))
 
-print(pure_groups[pure_groups["party_count"] == 1])
+print(groups)
 
-# Keep only pure groups
-pure_groups = pure_groups[pure_groups["party_count"] == 1]
-
-# === Step 2: Group public dataset ===
-pub_grouped = (
-    pub_df.groupby(quasi_identifiers)["name"]
-    .apply(list)
-    .reset_index()
-)
+# === Step 2: Public register groups (size per QI combination) ===
+pub_grouped = EquivalenceClasses(pub_df, quasi_identifiers).class_table(k_name="n_public")
 
 print("\n--- Public Groups ---")
 print(pub_grouped)
 
-# === Step 3: Merge ===
-merged = pure_groups.merge(pub_grouped, on=quasi_identifiers, how="left")
-
-print("\n--- After Merging Pure Groups with Public Data ---")
-print(merged)
-
-# Drop groups with no public matches
-merged = merged.dropna(subset=["name"])
+# Drop groups with no public matches (row labels still index the offsets)
+merged = groups[groups["n_public"] > 0]
 
 print("\n--- Final Groups with Public Matches ---")
 print(merged)
@@ -61,12 +54,15 @@ print(merged)
 if merged.empty:
     print("\nNO MATCHING PURE GROUPS FOUND.")
 else:
-    for _, row in merged.iterrows():
+    for i, row in merged.iterrows():
         print("\n=== Pure Group (Unique Party) ===")
         for col in quasi_identifiers:
             print(f"{col}: {row[col]}")
-        print(f"Unique party in anonymised data: {row['unique_party']}")
+        if row["party_count"] == 1:
+            print(f"Unique party in anonymised data: {row['unique_party']}")
+        else:
+            print(f"Dominant party in anonymised data: {row['dominant_party']} ({row['dominant_ratio']:.0%})")
         print(f"k (anonymised count): {row['k']}")
         print("Possible public matches:")
-        for n in row["name"]:
+        for n in names[offsets[i]:offsets[i + 1]]:
             print(" -", n)
@@ -1,15 +1,27 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-# === Load dataset ===
-file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL.xlsx"
-df = pd.read_excel(file_path)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
 
-# === Remove rows where last_voted == 2 ===
-df_cleaned = df[df["last_voted"] != 2]
 
-# === Save cleaned file ===
-output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_cleaned.xlsx"
-df_cleaned.to_excel(output_path, index=False)
+# === Stage: remove rows where last_voted == 2 ===
+def remove_abstained(df):
+    """Register rows of people who abstained (last_voted == 2) are dropped."""
+    return df[df["last_voted"] != 2]
 
-print(f"✅ Cleaned file saved to: {output_path}")
-print(f"🧹 Removed {len(df) - len(df_cleaned)} rows where last_voted == 2.")
+
+if __name__ == "__main__":
+    # === Load dataset ===
+    file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL.xlsx"
+    df = read_table(file_path)
+
+    # === Remove rows where last_voted == 2 ===
+    df_cleaned = remove_abstained(df)
+
+    # === Save cleaned file ===
+    output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_cleaned.xlsx"
+    df_cleaned.to_excel(output_path, index=False)
+
+    print(f"✅ Cleaned file saved to: {output_path}")
+    print(f"🧹 Removed {len(df) - len(df_cleaned)} rows where last_voted == 2.")
@@ -1,26 +1,34 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
 from datetime import datetime
 
-# === Load dataset ===
-file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_cleaned.xlsx"
-df = pd.read_excel(file_path)
-
-# === Convert DOB to Age ===
-def dob_to_age(dob):
-    try:
-        dob = pd.to_datetime(dob, dayfirst=True, errors='coerce')
-        if pd.isna(dob):
-            return None
-        today = datetime.today()
-        age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-        return age
-    except Exception:
-        return None
-
-df["age"] = df["dob"].apply(dob_to_age)
-
-# === Save updated file ===
-output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_age.xlsx"
-df.to_excel(output_path, index=False)
-
-print(f"✅ Added 'age' column based on 'dob'. Saved to: {output_path}")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import exact_age
+from sdc.cache import read_table
+
+
+# === Stage: convert DOB to age ===
+def add_age(df, reference=None):
+    """
+    Calendar age at ``reference`` (default: today; birthday reached this
+    year or not), whole column at once.
+    """
+    df = df.copy()
+    df["age"] = exact_age(df["dob"], reference=reference or datetime.today(), year_days=None, dayfirst=True)
+    return df
+
+
+if __name__ == "__main__":
+    # === Load dataset ===
+    file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_cleaned.xlsx"
+    df = read_table(file_path)
+
+    # === Convert DOB to Age ===
+    df = add_age(df)
+
+    # === Save updated file ===
+    output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_age.xlsx"
+    df.to_excel(output_path, index=False)
+
+    print(f"✅ Added 'age' column based on 'dob'. Saved to: {output_path}")
@@ -1,16 +1,21 @@
-import pandas as pd
-import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.eqclass import EquivalenceClasses
 
 # === Load dataset ===
-df = pd.read_excel(r"C:\\Users\\andre\\Downloads\\invading privacy\\anonymised_dataL.xlsx")
+df = read_table(r"C:\\Users\\andre\\Downloads\\invading privacy\\anonymised_dataL.xlsx")
 
 # === Define quasi-identifiers and sensitive attribute ===
 quasi_identifiers = ['age_a', 'sex', 'maritalstatus_a', 'last_voted', 'citizenship_a', 'zip_a']
 #sensitive_attr = 'party'
+N_WORKERS = None   # e.g. 4: count classes over a process pool on large files
 
-# === Group by quasi-identifiers ===
-grouped = df.groupby(quasi_identifiers)
-k_counts = grouped.size().reset_index(name='k')  # "k" = number of records in each equivalence class
+# === Equivalence classes on quasi-identifiers (one pass) ===
+classes = EquivalenceClasses(df, quasi_identifiers, n_workers=N_WORKERS)
+k_counts = classes.class_table(k_name='k')  # "k" = number of records in each equivalence class
 
 # === Compute basic k-anonymity metrics ===
 k_min = k_counts['k'].min()
@@ -18,7 +23,7 @@ k1_records = k_counts[k_counts['k'] == 1].shape[0]
 k_distribution = k_counts['k'].value_counts().sort_index()
 
 # Individual risk per group = 1/k
-individual_risks = 1 / k_counts['k']
+individual_risks = classes.risk
 avg_individual_risk = individual_risks.mean()
 '''
 # === Compute l-diversity ===
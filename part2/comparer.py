@@ -1,5 +1,11 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.linkage import match_counts
+
 # === Load predicted and actual anonymised datasets ===
 predicted_path = r"C:\Users\andre\Downloads\invading privacy\anonymised_dataL_predicted.csv"
 actual_path = r"C:\Users\andre\Downloads\invading privacy\anonymised_dataL.csv"
@@ -11,10 +17,11 @@ actual_df = pd.read_csv(actual_path)
 quasi_identifiers = ["sex", "evote", "party", "age_a", "edu_a", "citizenship_a", "maritalstatus_a", "zip_a"]
 
 # === Check which predicted rows exist in the actual anonymised dataset ===
-predicted_df["match"] = predicted_df.apply(
-    lambda row: ((actual_df[quasi_identifiers] == row[quasi_identifiers]).all(axis=1)).any(),
-    axis=1
-)
+# (one 64-bit key per row on both sides, joined on the sorted keys)
+counts = match_counts(predicted_df, actual_df, quasi_identifiers)
+predicted_df["match"] = counts["matches"] > 0
+predicted_df["actual_matches"] = counts["matches"]          # identical rows in the actual data
+predicted_df["predicted_multiplicity"] = counts["multiplicity"]  # identical predicted rows
 
 # === Summary ===
 num_matches = predicted_df["match"].sum()
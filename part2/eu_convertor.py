@@ -1,29 +1,34 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
-# === Load dataset ===
-file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_marital_fixed.xlsx"
-df = pd.read_excel(file_path)
-
-# === Define EU countries ===
-eu_countries = {
-    "Austria", "Belgium", "Bulgaria", "Croatia", "Cyprus", "Czech Republic",
-    "Denmark", "Estonia", "Finland", "France", "Germany", "Greece", "Hungary",
-    "Ireland", "Italy", "Latvia", "Lithuania", "Luxembourg", "Malta",
-    "Netherlands", "Poland", "Portugal", "Romania", "Slovakia", "Slovenia",
-    "Spain", "Sweden"
-}
-
-# === Convert citizenship to EU / non-EU ===
-def classify_citizenship(country):
-    if pd.isna(country):
-        return "non-EU"
-    c = str(country).strip()
-    return "EU" if c in eu_countries else "non-EU"
-
-df["citizenship"] = df["citizenship"].apply(classify_citizenship)
-
-# === Save the updated file ===
-output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_citizenship_fixed.xlsx"
-df.to_excel(output_path, index=False)
-
-print(f"✅ Citizenship column classified and saved to: {output_path}")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.hierarchy import EU_COUNTRIES, Hierarchy
+
+CITIZENSHIP = Hierarchy("citizenship", [
+    ("eu", lambda c: "EU" if not pd.isna(c) and str(c).strip() in EU_COUNTRIES else "non-EU"),
+])
+
+
+# === Stage: convert citizenship to EU / non-EU ===
+def classify_citizenship(df):
+    """Citizenship collapsed to EU / non-EU."""
+    df = df.copy()
+    df["citizenship"] = CITIZENSHIP.generalise(df["citizenship"], "eu")
+    return df
+
+
+if __name__ == "__main__":
+    # === Load dataset ===
+    file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_marital_fixed.xlsx"
+    df = read_table(file_path)
+
+    df = classify_citizenship(df)
+
+    # === Save the updated file ===
+    output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_citizenship_fixed.xlsx"
+    df.to_excel(output_path, index=False)
+
+    print(f"✅ Citizenship column classified and saved to: {output_path}")
@@ -1,8 +1,14 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+
 # === Load dataset ===
 file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_marital_fixed.xlsx"
-df = pd.read_excel(file_path)
+df = read_table(file_path)
 
 # === Define European countries ===
 european_countries = {
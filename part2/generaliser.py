@@ -1,44 +1,22 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-from datetime import datetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.ages import dob_to_age_band
+from sdc.cache import read_table
+from sdc.hierarchy import CITIZENSHIP, ZIP, Hierarchy
 
 # === Load dataset ===
-raw_df = pd.read_excel(r"C:\Users\andre\Downloads\invading privacy\public_data_registerL.xlsx")
+raw_df = read_table(r"C:\Users\andre\Downloads\invading privacy\public_data_registerL.xlsx")
 
 # =========================================================
 # 0. CONFIG
 # =========================================================
 
-EU_COUNTRIES = [
-    "Austria",
-    "Belgium",
-    "Bulgaria",
-    "Croatia",
-    "Cyprus",
-    "Czech Republic",
-    "Denmark",
-    "Estonia",
-    "Finland",
-    "France",
-    "Germany",
-    "Greece",
-    "Hungary",
-    "Ireland",
-    "Italy",
-    "Latvia",
-    "Lithuania",
-    "Luxembourg",
-    "Malta",
-    "Netherlands",
-    "Poland",
-    "Portugal",
-    "Romania",
-    "Slovakia",
-    "Slovenia",
-    "Spain",
-    "Sweden"
-]
-
+# EU member states and the zip rules live in sdc/hierarchy.py
 
 np.random.seed(42)  # reproducibility
 
@@ -46,22 +24,8 @@ np.random.seed(42)  # reproducibility
 # 1. AGE ANONYMISATION (DOB → noisy grouped age)
 # =========================================================
 
-def dob_to_age_group(dob):
-    today = datetime(2025, 11, 7)
-    try:
-        age = (today - pd.to_datetime(dob)).days // 365
-    except Exception:
-        return np.nan
-    if age < 30:
-        return "<30"
-    elif age < 50:
-        return "30-49"
-    elif age < 65:
-        return "50-64"
-    else:
-        return "65+"
-
-raw_df['age_a'] = raw_df['dob'].apply(dob_to_age_group)
+# Whole column at once: age in days // 365 at 7 Nov 2025, then banded
+raw_df['age_a'] = dob_to_age_band(raw_df['dob'], "<30/30-49/50-64/65+")
 raw_df.drop(columns=['dob'], inplace=True, errors='ignore')
 
 
@@ -69,46 +33,26 @@ raw_df.drop(columns=['dob'], inplace=True, errors='ignore')
 # 2. CITIZENSHIP (EU / non EU)
 # =========================================================
 
-def simplify_citizenship(c):
-    if pd.isna(c):
-        return "Other"
-    c = str(c).strip()
-    if c in EU_COUNTRIES:
-        return "EU"
-    else:
-        return "non EU"
-
-raw_df["citizenship_a"] = raw_df["citizenship"].apply(simplify_citizenship)
+raw_df["citizenship_a"] = CITIZENSHIP.generalise(raw_df["citizenship"], "eu")
 raw_df.drop(columns=["citizenship"], inplace=True, errors="ignore")
 
 # =========================================================
 # 3. MARITAL STATUS (Married / Single)
 # =========================================================
 
-def simplify_marital(m):
-    if pd.isna(m):
-        return "Single"
-    m = str(m).lower()
-    if "married" in m:
-        return "Married"
-    else:
-        return "Single"
+MARITAL_STATUS = Hierarchy("marital_status", [
+    # anything mentioning "married" (incl. "never married") counts as Married
+    ("married", lambda m: "Married" if not pd.isna(m) and "married" in str(m).lower() else "Single"),
+])
 
-raw_df["maritalstatus_a"] = raw_df["marital_status"].apply(simplify_marital)
+raw_df["maritalstatus_a"] = MARITAL_STATUS.generalise(raw_df["marital_status"], "married")
 raw_df.drop(columns=["marital_status"], inplace=True, errors="ignore")
 
 # =========================================================
 # 4. ZIP CODE (Generalisation + Suppression)
 # =========================================================
 
-def generalize_zip(zip_code):
-    try:
-        zip_str = str(int(zip_code))
-        return zip_str[:2] + "xx"
-    except:
-        return "*"
-
-raw_df["zip_a"] = raw_df["zip"].apply(generalize_zip)
+raw_df["zip_a"] = ZIP.generalise(raw_df["zip"], "prefix")
 raw_df.drop(columns=["zip"], inplace=True, errors="ignore")
 
 # =========================================================
@@ -1,6 +1,10 @@
-import pandas as pd
-import numpy as np
-from collections import defaultdict
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.linkage import (AGE_NOISE, LinkageAudit, age_groups_can_match, linkage_risk,
+                         reidentification_results)
 
 # =========================================================
 # CONFIGURATION
@@ -10,16 +14,26 @@ from collections import defaultdict
 ANONYMIZED_PATH = r"C:\Users\andre\Downloads\invading privacy\anonymised_dataL.xlsx"
 PUBLIC_PATH = r"C:\Users\andre\Downloads\invading privacy\anonymised_dataL_predicted.xlsx"
 OUTPUT_PATH = r"C:\Users\andre\Downloads\invading privacy\reidentification_results.xlsx"
+RISK_PATH = r"C:\Users\andre\Downloads\invading privacy\reidentification_risk.xlsx"
+
+# Probabilistic (Fellegi-Sunter) linkage risk on top of the rule-based matching
+LINKAGE_RISK = False
+BLOCK_ON = ['sex']      # candidate pairs must agree on these
+COMPARE = ['age_a', 'maritalstatus_a', 'last_voted', 'citizenship_a', 'zip_a']
+
+# Register age column: 'age_a' (bands) or 'age' (exact ages, see agecalculator.py)
+PUBLIC_AGE_COLUMN = 'age_a'
 
-# Age noise parameter (±5 years)
-AGE_NOISE = 5
+# Folder keeping the last audited release and its candidate pairs, so a rerun
+# after a few anonymiser tweaks only re-scores the changed records (None: full run)
+AUDIT_STATE = None
 
 # =========================================================
 # LOAD DATA
 # =========================================================
 
-anon_df = pd.read_excel(ANONYMIZED_PATH)
-public_df = pd.read_excel(PUBLIC_PATH)
+anon_df = read_table(ANONYMIZED_PATH)
+public_df = read_table(PUBLIC_PATH)
 
 # Convert zip codes to strings to handle "*" suppression properly
 anon_df['zip_a'] = anon_df['zip_a'].astype(str)
@@ -34,175 +48,17 @@ print(f"\nSample zip values (anonymized): {anon_df['zip_a'].unique()[:5]}")
 print(f"Sample zip values (public): {public_df['zip_a'].unique()[:5]}")
 
 # =========================================================
-# AGE MATCHING LOGIC (accounting for ±5 year noise)
-# =========================================================
-
-def age_groups_can_match(age_group1, age_group2):
-    """
-    Check if two age groups could match given ±5 year noise.
-    
-    Examples:
-    - "<30" could match "<30" or "30-49" (if person is 25-34)
-    - "30-49" could match "<30", "30-49", or "50-64"
-    - "50-64" could match "30-49", "50-64", or "65+"
-    - "65+" could match "50-64" or "65+"
-    """
-    if pd.isna(age_group1) or pd.isna(age_group2):
-        return False
-    
-    # Same group always matches
-    if age_group1 == age_group2:
-        return True
-    
-    # Define age group boundaries
-    age_ranges = {
-        "<30": (0, 29),
-        "30-49": (30, 49),
-        "50-64": (50, 64),
-        "65+": (65, 150)
-    }
-    
-    if age_group1 not in age_ranges or age_group2 not in age_ranges:
-        return False
-    
-    min1, max1 = age_ranges[age_group1]
-    min2, max2 = age_ranges[age_group2]
-    
-    # Add noise buffer: expand each range by ±5
-    min1_expanded = min1 - AGE_NOISE
-    max1_expanded = max1 + AGE_NOISE
-    min2_expanded = min2 - AGE_NOISE
-    max2_expanded = max2 + AGE_NOISE
-    
-    # Check if ranges overlap
-    return not (max1_expanded < min2_expanded or max2_expanded < min1_expanded)
-
-# =========================================================
-# MATCHING FUNCTION
-# =========================================================
-
-def find_matches(anon_row, public_df):
-    """
-    Find all potential matches in public data for a given anonymized record.
-    Returns list of (index, match_strength) tuples.
-    """
-    matches = []
-    
-    for idx, public_row in public_df.iterrows():
-        match_score = 0
-        max_score = 0
-        
-        # Age (with noise tolerance)
-        max_score += 1
-        if age_groups_can_match(anon_row['age_a'], public_row['age_a']):
-            match_score += 1
-        else:
-            continue  # Age must match (within tolerance)
-        
-        # Sex (exact match required)
-        max_score += 1
-        if anon_row['sex'] == public_row['sex']:
-            match_score += 1
-        else:
-            continue  # Sex must match exactly
-        
-        # Marital status (exact match required)
-        max_score += 1
-        if anon_row['maritalstatus_a'] == public_row['maritalstatus_a']:
-            match_score += 1
-        else:
-            continue  # Marital status must match exactly
-        
-        # Last voted (exact match required)
-        max_score += 1
-        if anon_row['last_voted'] == public_row['last_voted']:
-            match_score += 1
-        else:
-            continue  # Last voted must match exactly
-        
-        # Citizenship (exact match required)
-        max_score += 1
-        if anon_row['citizenship_a'] == public_row['citizenship_a']:
-            match_score += 1
-        else:
-            continue  # Citizenship must match exactly
-        
-        # Zip code (handle suppression with "*")
-        anon_zip = str(anon_row['zip_a'])
-        public_zip = str(public_row['zip_a'])
-        
-        if anon_zip != "*" and public_zip != "*":
-            # Both zips available - must match
-            max_score += 1
-            if anon_zip == public_zip:
-                match_score += 1
-            else:
-                continue  # Zip mismatch
-        # If either is suppressed, we skip zip in scoring
-        
-        # Calculate match strength (percentage)
-        match_strength = (match_score / max_score) * 100
-        matches.append((idx, match_strength, public_row['name']))
-    
-    return matches
-
-# =========================================================
-# PERFORM MATCHING
-# =========================================================
-
-results = []
-
-for anon_idx, anon_row in anon_df.iterrows():
-    matches = find_matches(anon_row, public_df)
-    
-    if len(matches) == 0:
-        result = {
-            'anon_index': anon_idx,
-            'party': anon_row['party'],
-            'match_count': 0,
-            'match_type': 'No Match',
-            'confidence': 'N/A',
-            'matched_name': None,
-            'match_strength': 0,
-            **{col: anon_row[col] for col in ['age_a', 'sex', 'maritalstatus_a', 'last_voted', 'citizenship_a', 'zip_a']}
-        }
-        results.append(result)
-    
-    elif len(matches) == 1:
-        # Unique match - high confidence re-identification!
-        idx, strength, name = matches[0]
-        result = {
-            'anon_index': anon_idx,
-            'party': anon_row['party'],
-            'match_count': 1,
-            'match_type': 'UNIQUE MATCH',
-            'confidence': 'HIGH',
-            'matched_name': name,
-            'match_strength': strength,
-            **{col: anon_row[col] for col in ['age_a', 'sex', 'maritalstatus_a', 'last_voted', 'citizenship_a', 'zip_a']}
-        }
-        results.append(result)
-    
-    else:
-        # Multiple matches - ambiguous
-        for idx, strength, name in matches:
-            result = {
-                'anon_index': anon_idx,
-                'party': anon_row['party'],
-                'match_count': len(matches),
-                'match_type': 'Multiple Matches',
-                'confidence': 'LOW',
-                'matched_name': name,
-                'match_strength': strength,
-                **{col: anon_row[col] for col in ['age_a', 'sex', 'maritalstatus_a', 'last_voted', 'citizenship_a', 'zip_a']}
-            }
-            results.append(result)
-
-# =========================================================
-# CREATE RESULTS DATAFRAME
+# PERFORM MATCHING (blocks on hard QIs + age interval sweep)
 # =========================================================
 
-results_df = pd.DataFrame(results)
+if AUDIT_STATE:
+    audit = LinkageAudit.load(AUDIT_STATE, public_df, noise=AGE_NOISE, public_age=PUBLIC_AGE_COLUMN)
+    results_df = audit.audit(anon_df)
+    audit.save(AUDIT_STATE)
+    print(f"\nIncremental audit: re-scored {audit.rescored} of {len(anon_df)} records")
+else:
+    results_df = reidentification_results(anon_df, public_df, noise=AGE_NOISE,
+                                          public_age=PUBLIC_AGE_COLUMN)
 
 # =========================================================
 # SUMMARY STATISTICS
@@ -279,4 +135,36 @@ elif re_id_rate > 0:
 else:
     print("\n✅ LOW RISK: No unique re-identifications found")
 
-print("\n💡 Note: Age has ±5 year noise, so matches account for overlapping age groups")
\ No newline at end of file
+print("\n💡 Note: Age has ±5 year noise, so matches account for overlapping age groups")
+
+# =========================================================
+# PROBABILISTIC LINKAGE RISK (m/u learned by EM on blocked pairs)
+# =========================================================
+
+if LINKAGE_RISK:
+    risk_df, model, _ = linkage_risk(
+        anon_df, public_df, BLOCK_ON, COMPARE,
+        # Same interval rule as the matching above, against the register's age column
+        comparators={'age_a': lambda a, b: age_groups_can_match(a, b, AGE_NOISE)},
+        public_columns={'age_a': PUBLIC_AGE_COLUMN},
+    )
+
+    print("\n" + "="*60)
+    print("PROBABILISTIC LINKAGE RISK")
+    print("="*60)
+    print(f"\nCandidate pairs (blocked on {', '.join(BLOCK_ON)}): {model.attrs['pairs']}")
+    if model.attrs['pairs'] == 0:
+        print("No candidate pairs: no record can be linked, nothing to fit.")
+    else:
+        print(f"Estimated match rate among pairs: {model.attrs['p']:.4f} (EM iterations: {model.attrs['iterations']})")
+        if not model.attrs['converged']:
+            print("⚠️  EM stopped at the iteration limit without converging; treat the weights with care.")
+        print(model.round(3).to_string())
+
+    print(f"\nExpected re-identifications: {risk_df['reid_prob'].sum():.1f} of {len(anon_df)}")
+    print(f"Mean re-identification probability: {risk_df['reid_prob'].mean():.2%}")
+    print(f"Highest: {risk_df['reid_prob'].max():.2%}")
+    print(f"Records above 50%: {(risk_df['reid_prob'] > 0.5).sum()}")
+
+    anon_df.join(risk_df).to_excel(RISK_PATH, index=False)
+    print(f"\n📁 Per-record risk saved to: {RISK_PATH}")
@@ -1,25 +1,33 @@
-import pandas as pd
-
-# === Load dataset ===
-file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_zipA.xlsx"
-df = pd.read_excel(file_path)
-
-# === Simplify marital status ===
-def simplify_marital(status):
-    if pd.isna(status):
-        return "Single"
-    s = str(status).strip().lower()
-    if s in ["married/separated", "never married"]:
-        return "Married"
-    elif s in ["widowed", "divorced"]:
-        return "Single"
-    else:
-        return "Single"  # default fallback
-
-df["marital_status"] = df["marital_status"].apply(simplify_marital)
-
-# === Save updated file ===
-output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_marital_fixed.xlsx"
-df.to_excel(output_path, index=False)
-
-print(f"✅ Marital statuses converted and saved to: {output_path}")
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.hierarchy import Hierarchy
+
+MARITAL_STATUS = Hierarchy("marital_status", [
+    ("married", lambda s: "Married" if str(s).strip().lower() in ["married/separated", "never married"]
+                          else "Single"),  # widowed, divorced, missing and anything else
+])
+
+
+# === Stage: simplify marital status ===
+def simplify_marital_status(df):
+    """Marital status collapsed to Married / Single."""
+    df = df.copy()
+    df["marital_status"] = MARITAL_STATUS.generalise(df["marital_status"], "married")
+    return df
+
+
+if __name__ == "__main__":
+    # === Load dataset ===
+    file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_zipA.xlsx"
+    df = read_table(file_path)
+
+    df = simplify_marital_status(df)
+
+    # === Save updated file ===
+    output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_marital_fixed.xlsx"
+    df.to_excel(output_path, index=False)
+
+    print(f"✅ Marital statuses converted and saved to: {output_path}")
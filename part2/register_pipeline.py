@@ -0,0 +1,57 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+
+# The stages live in their own scripts, which still run on their own
+from abstained_remover import remove_abstained
+from agecalculator import add_age
+from eu_convertor import classify_citizenship
+from marriage_convertor import simplify_marital_status
+from zipsuppresor import add_zip_prefix
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+INPUT_PATH  = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL.xlsx"
+OUTPUT_PATH = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_citizenship_fixed.xlsx"
+
+# Set to True to also write the per-stage workbooks the separate scripts produce
+SAVE_INTERMEDIATES = False
+INTERMEDIATE_DIR = r"C:\Users\andre\Downloads\invading privacy"
+
+# One reference date for the whole run
+TODAY = datetime.today()
+
+# (stage, function, intermediate workbook)
+STAGES = [
+    ("remove abstained",        remove_abstained,                        "public_data_registerL_cleaned.xlsx"),
+    ("age from dob",            lambda df: add_age(df, reference=TODAY), "public_data_registerL_with_age.xlsx"),
+    ("zip prefix",              add_zip_prefix,                          "public_data_registerL_with_zipA.xlsx"),
+    ("marital status",          simplify_marital_status,                 "public_data_registerL_marital_fixed.xlsx"),
+    ("citizenship EU / non-EU", classify_citizenship,                    "public_data_registerL_citizenship_fixed.xlsx"),
+]
+
+
+def run(df, stages, save_intermediates=False, intermediate_dir=None):
+    """Apply the stages in order on one in-memory frame."""
+    for name, stage, intermediate in stages:
+        n_before = len(df)
+        df = stage(df)
+        print(f"✅ {name}: {n_before} → {len(df)} rows")
+        if save_intermediates:
+            path = Path(intermediate_dir) / intermediate
+            df.to_excel(path, index=False)
+            print(f"   📁 {path}")
+    return df
+
+
+# =========================================================
+# RUN: one read, one write
+# =========================================================
+register = read_table(INPUT_PATH)
+register = run(register, STAGES, SAVE_INTERMEDIATES, INTERMEDIATE_DIR)
+register.to_excel(OUTPUT_PATH, index=False)
+print(f"📁 Saved to: {OUTPUT_PATH}")
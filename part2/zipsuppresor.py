@@ -1,27 +1,35 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-# === Load dataset ===
-file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_age.xlsx"
-df = pd.read_excel(file_path)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from sdc.cache import read_table
+from sdc.hierarchy import Hierarchy, zip_prefix
 
-# === Generalize ZIP codes (e.g. 2100 → 21xx) ===
-def generalize_zip(zip_code):
-    try:
-        zip_str = str(int(zip_code))
-        return zip_str[:2] + "xx"
-    except:
-        return zip_code  # leave unchanged if invalid or missing
+# (leave unchanged if invalid or missing)
+ZIP = Hierarchy("zip", [("prefix", lambda z: zip_prefix(z, invalid=z))])
 
-df["zip_a"] = df["zip"].apply(generalize_zip)
 
-# === Move 'zip_a' to 7th column (G column, index 6 since 0-based) ===
-cols = list(df.columns)
-if "zip_a" in cols:
+# === Stage: generalize ZIP codes (e.g. 2100 → 21xx) ===
+def add_zip_prefix(df):
+    """Adds 'zip_a' with the generalised ZIP as the 7th column (G)."""
+    df = df.copy()
+    df["zip_a"] = ZIP.generalise(df["zip"], "prefix")
+
+    # === Move 'zip_a' to 7th column (G column, index 6 since 0-based) ===
+    cols = list(df.columns)
     cols.insert(6, cols.pop(cols.index("zip_a")))  # move to index 6
-    df = df[cols]
+    return df[cols]
+
+
+if __name__ == "__main__":
+    # === Load dataset ===
+    file_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_age.xlsx"
+    df = read_table(file_path)
+
+    df = add_zip_prefix(df)
 
-# === Save updated file ===
-output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_zipA.xlsx"
-df.to_excel(output_path, index=False)
+    # === Save updated file ===
+    output_path = r"C:\Users\andre\Downloads\invading privacy\public_data_registerL_with_zipA.xlsx"
+    df.to_excel(output_path, index=False)
 
-print(f"✅ Added 'zip_a' in column G with generalized ZIPs. Saved to: {output_path}")
+    print(f"✅ Added 'zip_a' in column G with generalized ZIPs. Saved to: {output_path}")
@@ -1,10 +1,17 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
-from scipy.stats import chi2_contingency
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from sdc.cache import read_table
+from sdc.utility import Associations
+
+# Charts are optional so the test also runs headless
+SHOW_PLOTS = False
 
 # === Load data ===
-df = pd.read_excel(r"C:\\Users\\andre\\Downloads\\Group goopers Dataset F-20251106\\private_dataF.xlsx")
+df = read_table(r"C:\\Users\\andre\\Downloads\\Group goopers Dataset F-20251106\\private_dataF.xlsx")
 
 # Only include valid votes
 df = df[df['evote'].isin([0, 1])]
@@ -15,6 +22,10 @@ demographic_cols = ['sex', 'education', 'marital_status', 'zip', 'citizenship']
 # Store p-values for later visualization
 p_values = {}
 
+# All contingency tables and χ² tests in one batch
+tests = Associations(df, [(col, 'evote') for col in demographic_cols])
+results = tests.results.set_index('var1')
+
 # Function to plot grouped bar chart for each demographic variable
 def plot_grouped_bar(table, title):
     table.plot(kind='bar', figsize=(10,6))
@@ -27,14 +38,13 @@ def plot_grouped_bar(table, title):
     plt.show()
 
 # === Loop through demographic columns ===
+tables = {}
 for col in demographic_cols:
-    temp = df[[col, 'evote']].dropna()
-
-    # Build contingency table
-    table = pd.crosstab(temp[col], temp['evote'])
+    # Contingency table (missing values left out)
+    table = tables[col] = tests.table(col, 'evote')
 
     # Chi-square test
-    chi2, p, dof, expected = chi2_contingency(table)
+    chi2, p = results.loc[col, 'chi2'], results.loc[col, 'p_value']
     p_values[col] = p
 
     # Print summary
@@ -47,27 +57,35 @@ for col in demographic_cols:
     else:
         print("→ No significant relationship.")
 
-    # Plot from actual data
-    plot_grouped_bar(table, f'Voting Behavior by {col.capitalize()}')
-
-# === Summary Heatmap of P-values ===
+# === Summary of P-values ===
 p_df = pd.DataFrame(list(p_values.items()), columns=['Demographic', 'p_value'])
 
 # Sort by p-value ascending, so smallest (lightest) at top → largest (darkest) at bottom
 p_df = p_df.sort_values(by='p_value', ascending=True)
 
-# Create heatmap with gradient and colorbar
-plt.figure(figsize=(6,4))
-sns.heatmap(
-    p_df[['p_value']].set_index(p_df['Demographic']),
-    annot=True,
-    cmap='Blues',          # lighter = lower p-value, darker = higher p-value
-    fmt='.4f',
-    cbar=True,             # show color spectrum
-    cbar_kws={'label': 'p-value'}  # label for clarity
-)
-plt.title('Chi-Square Test P-Values (Lowest → Highest)')
-plt.xlabel('')
-plt.ylabel('')
-plt.tight_layout()
-plt.show()
+print("\n=== P-values (lowest → highest) ===")
+print(p_df.to_string(index=False))
+
+if SHOW_PLOTS:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Plot from actual data
+    for col, table in tables.items():
+        plot_grouped_bar(table, f'Voting Behavior by {col.capitalize()}')
+
+    # Create heatmap with gradient and colorbar
+    plt.figure(figsize=(6,4))
+    sns.heatmap(
+        p_df[['p_value']].set_index(p_df['Demographic']),
+        annot=True,
+        cmap='Blues',          # lighter = lower p-value, darker = higher p-value
+        fmt='.4f',
+        cbar=True,             # show color spectrum
+        cbar_kws={'label': 'p-value'}  # label for clarity
+    )
+    plt.title('Chi-Square Test P-Values (Lowest → Highest)')
+    plt.xlabel('')
+    plt.ylabel('')
+    plt.tight_layout()
+    plt.show()
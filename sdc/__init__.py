@@ -0,0 +1,6 @@
+"""Shared statistical disclosure control helpers used by the scripts in
+Code/, codefinal/, part2/ and part2.2/.
+
+Scripts add the repository root to ``sys.path`` and import the submodules
+they need, e.g. ``from sdc.linkage import link_pairs``.
+"""
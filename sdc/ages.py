@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Reference date the survey scripts compute ages at
+SURVEY_DATE = datetime(2025, 11, 7)
+
+NS_PER_DAY = 86_400 * 10 ** 9
+
+# =========================================================
+# PARSING
+# =========================================================
+
+def parse_dob(dob, dayfirst=False):
+    """
+    Parse a whole dob column to datetime64 in one call (unparseable -> NaT).
+
+    Only the distinct values are parsed (a register has far fewer birth
+    dates than people), with one inferred format; values that do not
+    follow it (mixed formats in hand-edited sheets) get a second,
+    per-element pass instead of failing, like the old per-row parsing.
+    """
+    dob = pd.Series(dob)
+    if pd.api.types.is_datetime64_any_dtype(dob):
+        return dob
+
+    codes, uniques = pd.factorize(dob)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.to_datetime(uniques, errors='coerce', dayfirst=dayfirst).astype('datetime64[ns]')
+    retry = parsed.isna() & uniques.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(uniques[retry].astype(str), errors='coerce',
+                                       dayfirst=dayfirst, format='mixed')
+
+    values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes]
+    return pd.Series(values, index=dob.index, name=dob.name)
+
+# =========================================================
+# EXACT AGES
+# =========================================================
+
+def exact_age(dob, reference=SURVEY_DATE, year_days=365, dayfirst=False):
+    """
+    Age in whole years at ``reference`` for every dob (nullable Int64).
+
+    year_days -- 365 or 365.25: whole days since birth // year_days,
+                 None: calendar age (birthday reached this year or not)
+    """
+    parsed = parse_dob(dob, dayfirst=dayfirst)
+    missing = parsed.isna().to_numpy()
+    reference = pd.Timestamp(reference)
+
+    if year_days is None:
+        years = reference.year - parsed.dt.year.to_numpy(dtype=float, na_value=0)
+        month = parsed.dt.month.to_numpy(dtype=float, na_value=0)
+        day = parsed.dt.day.to_numpy(dtype=float, na_value=0)
+        before_birthday = (month > reference.month) | ((month == reference.month) & (day > reference.day))
+        ages = years - before_birthday
+    else:
+        born = parsed.astype('datetime64[ns]').to_numpy().astype(np.int64)
+        days = np.floor_divide(reference.as_unit('ns').value - born, NS_PER_DAY)
+        ages = np.floor_divide(days, year_days)
+
+    ages = np.where(missing, 0, ages).astype(np.int64)
+    return pd.Series(pd.arrays.IntegerArray(ages, missing), index=parsed.index, name='age')
+
+# =========================================================
+# AGE BANDS
+# =========================================================
+
+def parse_bands(spec):
+    """
+    Parse a band spec such as "18-30/31-50/51+" or "<30/30-49/50-64/65+"
+    (a list of labels works too). Returns the inclusive upper bound of
+    every closed band and the band labels; "<a" closes at a-1 and a
+    trailing "a+" is open. Only the upper bounds are used for binning.
+    """
+    labels = spec.split('/') if isinstance(spec, str) else list(spec)
+    uppers = []
+    for i, label in enumerate(labels):
+        text = label.strip()
+        if text.endswith('+'):
+            if i != len(labels) - 1:
+                raise ValueError(f"Open band {label!r} must be the last one in {spec!r}")
+            break
+        if text.startswith('<'):
+            uppers.append(int(text[1:]) - 1)
+        elif '-' in text:
+            uppers.append(int(text.split('-')[1]))
+        else:
+            raise ValueError(f"Cannot read age band {label!r} in {spec!r}")
+    if any(b <= a for a, b in zip(uppers, uppers[1:])):
+        raise ValueError(f"Age bands must be increasing: {spec!r}")
+    return np.array(uppers, dtype=np.int64), labels
+
+
+def age_bands(ages, spec, labels=None):
+    """
+    Bin exact ages into the bands of ``spec`` with one searchsorted.
+    ``labels`` renames the bands (same count) when a script publishes
+    labels that differ from its cutoffs. Missing or out-of-range -> NaN.
+    """
+    uppers, spec_labels = parse_bands(spec)
+    labels = spec_labels if labels is None else list(labels)
+    if len(labels) != len(spec_labels):
+        raise ValueError(f"{len(spec_labels)} bands in {spec!r} but {len(labels)} labels")
+
+    ages = pd.Series(ages)
+    missing = ages.isna().to_numpy()
+    values = ages.to_numpy(dtype=float, na_value=0)
+    band = np.searchsorted(uppers, values, side='left')
+    out_of_range = missing | (band >= len(labels))
+
+    out = np.asarray(labels + [np.nan], dtype=object)[np.where(out_of_range, len(labels), band)]
+    return pd.Series(out, index=ages.index, dtype=object)
+
+
+def band_rule(spec, labels=None):
+    """Scalar age -> band function, e.g. as a generalisation hierarchy level."""
+    uppers, spec_labels = parse_bands(spec)
+    labels = spec_labels if labels is None else list(labels)
+
+    def rule(age):
+        if pd.isna(age):
+            return np.nan
+        band = int(np.searchsorted(uppers, age, side='left'))
+        return labels[band] if band < len(labels) else np.nan
+    return rule
+
+
+def dob_to_age_band(dob, spec, reference=SURVEY_DATE, year_days=365, dayfirst=False, labels=None):
+    """Column-level dob -> age band: parse once, exact ages, then bin."""
+    return age_bands(exact_age(dob, reference, year_days, dayfirst), spec, labels)
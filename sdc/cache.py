@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Stores live in the user's cache folder (they hold plain copies of the
+# data, so they are kept away from the data folders) unless the
+# SDC_CACHE_DIR environment variable points somewhere else
+CACHE_DIR = 'sdc'
+INDEX_FILE = 'index.json'
+HASH_CHUNK = 1 << 20
+
+# =========================================================
+# CACHE KEYS
+# =========================================================
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _user_cache():
+    """%LOCALAPPDATA% on Windows, $XDG_CACHE_HOME or ~/.cache elsewhere."""
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        return Path(os.environ['LOCALAPPDATA']) / CACHE_DIR / 'cache'
+    return Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / CACHE_DIR
+
+
+def _cache_root(cache_dir):
+    if cache_dir is None:
+        cache_dir = os.environ.get('SDC_CACHE_DIR') or _user_cache()
+    return Path(cache_dir)
+
+
+def _read_index(root):
+    try:
+        with open(root / INDEX_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(root, index):
+    fd, tmp = tempfile.mkstemp(dir=root, suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, root / INDEX_FILE)
+
+# =========================================================
+# COLUMN STORE
+# =========================================================
+
+def _save_column(store, i, column):
+    """Write one column as .npy files; returns its metadata entry."""
+    meta = {'name': column.name, 'dtype': str(column.dtype)}
+    dtype = column.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        meta['kind'] = 'numeric'
+        np.save(store / f'{i}.npy', column.to_numpy())
+    elif isinstance(dtype, np.dtype) and dtype.kind in 'mM':
+        meta['kind'] = 'datetime'
+        np.save(store / f'{i}.npy', column.to_numpy().view(np.int64))
+    else:
+        # Text and mixed columns: int32 codes + the distinct values
+        meta['kind'] = 'categorical'
+        codes, uniques = pd.factorize(column, sort=True)
+        np.save(store / f'{i}.npy', codes.astype(np.int32))
+        values = list(uniques)
+        if all(isinstance(v, str) for v in values):
+            np.save(store / f'{i}.cat.npy', np.asarray(values, dtype=str))
+        else:
+            meta['pickled'] = True
+            np.save(store / f'{i}.cat.npy', np.asarray(values, dtype=object), allow_pickle=True)
+    return meta
+
+
+def _load_column(store, i, meta, categorical):
+    # mmap_mode='c': pages are mapped from disk and only copied when written to
+    data = np.load(store / f'{i}.npy', mmap_mode='c')
+    if meta['kind'] == 'numeric':
+        return data
+    if meta['kind'] == 'datetime':
+        return data.view(meta['dtype'])
+
+    values = np.load(store / f'{i}.cat.npy', allow_pickle=meta.get('pickled', False))
+    column = pd.Categorical.from_codes(data, categories=pd.Index(values))
+    return column if categorical else column.astype(meta['dtype'])
+
+
+def write_store(df, target):
+    """Write ``df`` as a column store: to a fresh directory, then moved to ``target``."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    store = Path(tempfile.mkdtemp(dir=target.parent))
+    try:
+        columns = [_save_column(store, i, df[c]) for i, c in enumerate(df.columns)]
+        with open(store / 'meta.json', 'w') as f:
+            json.dump({'n_rows': len(df), 'columns': columns}, f, indent=1)
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(store, target)
+    except BaseException:
+        shutil.rmtree(store, ignore_errors=True)
+        raise
+
+
+def read_store(store, categorical=False):
+    """A frame written by ``write_store``, its columns memory-mapped from disk."""
+    with open(store / 'meta.json') as f:
+        meta = json.load(f)
+    columns = {m['name']: _load_column(store, i, m, categorical) for i, m in enumerate(meta['columns'])}
+    return pd.DataFrame(columns, copy=False)
+
+# =========================================================
+# LOADER
+# =========================================================
+
+def _parse(path, **kwargs):
+    if path.suffix.lower() in ('.xlsx', '.xlsm', '.xls'):
+        return pd.read_excel(path, **kwargs)
+    return pd.read_csv(path, **kwargs)
+
+
+def read_table(path, cache_dir=None, categorical=False, refresh=False, **kwargs):
+    """
+    ``pd.read_excel`` / ``pd.read_csv`` (by file extension) through a
+    columnar cache.
+
+    The first load parses the file and stores every column as a .npy file:
+    numbers and dates as-is, text as int32 codes plus its distinct values.
+    Later loads memory-map those files instead of parsing the workbook.
+    A store is keyed by the SHA-1 of the file and the read options; the
+    index remembers the size and mtime it was hashed at, so an unchanged
+    file is not even re-hashed, and a touched but identical file reuses
+    its store. A changed file's old store is deleted.
+
+    cache_dir   -- folder of the stores (default: SDC_CACHE_DIR, else the
+                   user's cache folder, e.g. ~/.cache/sdc)
+    categorical -- return text columns as pandas Categoricals (no decoding)
+    refresh     -- ignore any existing store and parse the file again
+    Other keyword arguments go to the pandas reader.
+    """
+    path = Path(path).resolve()
+    root = _cache_root(cache_dir)
+    options = json.dumps(kwargs, sort_keys=True, default=str)
+    entry_key = f'{path}|{options}'
+
+    stat = path.stat()
+    index = _read_index(root)
+    entry = index.get(entry_key)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        digest = entry['sha1']
+    else:
+        digest = _file_hash(path)
+
+    store_id = hashlib.sha1(f'{digest}|{options}'.encode()).hexdigest()[:20]
+    store = root / f'{path.stem}-{store_id}'
+    if not refresh and (store / 'meta.json').exists():
+        df = read_store(store, categorical)
+    else:
+        write_store(_parse(path, **kwargs), store)
+        df = read_store(store, categorical)
+
+    if entry != {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': digest, 'store': store.name}:
+        index = _read_index(root)
+        old = index.get(entry_key)
+        index[entry_key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                            'sha1': digest, 'store': store.name}
+        _write_index(root, index)
+        # The store of the file's previous contents, unless another entry still uses it
+        if old and old['store'] != store.name and all(e['store'] != old['store'] for e in index.values()):
+            shutil.rmtree(root / old['store'], ignore_errors=True)
+    return df
@@ -0,0 +1,271 @@
+import heapq
+from itertools import islice, repeat
+
+import numpy as np
+import pandas as pd
+
+from sdc.parallel import PARALLEL_MIN_ROWS, WorkerPool, count_classes, factorize_combined
+
+# Above this many QI combinations the counts are no longer taken from a
+# dense bincount table but from a sort of the combined codes
+DENSE_LIMIT = 1 << 24
+
+
+def combine_codes(df, qis):
+    """
+    Factorize every QI column (sorted, missing values last, like groupby)
+    and fold them into one int64 code per record. Returns the codes, the
+    number of possible combinations and a mask of records with a missing QI.
+    """
+    n = len(df)
+    combined = np.zeros(n, dtype=np.int64)
+    missing = np.zeros(n, dtype=bool)
+    radix = 1
+    for col in qis:
+        codes, uniques = pd.factorize(df[col], sort=True)
+        na = codes < 0
+        missing |= na
+        size = len(uniques) + 1
+        codes = np.where(na, size - 1, codes)
+        if radix * size >= 2 ** 62:
+            # Too many combinations for int64: renumber the classes so far
+            _, combined = np.unique(combined, return_inverse=True)
+            radix = int(combined.max()) + 1 if n else 1
+        combined = combined * size + codes
+        radix *= size
+    return combined, radix, missing
+
+
+class EquivalenceClasses:
+    """
+    Equivalence classes of ``df`` on the quasi-identifiers ``qis``.
+
+    The QIs are factorized once and every statistic is read off integer
+    bincounts of the class codes, so no groupby/merge round trips are
+    needed. Classes are ordered like ``df.groupby(qis)``.
+
+    dropna            -- drop records with a missing QI (groupby default);
+                         with False missing values form their own classes
+    sensitive_dropna  -- ignore missing sensitive values when counting l
+                         (``nunique()`` default); False counts them as a value
+    n_workers         -- factorize the QIs and count the classes over one
+                         process pool (sdc.parallel) once there are
+                         PARALLEL_MIN_ROWS records or more; off by default,
+                         see benchmarks/bench_eqclass.py
+
+    Per class:  keys, k, risk (1/k), l, dominant_count, dominant_value,
+                dominant_ratio, sensitive_counts (classes x values)
+    Per record: codes (-1 for dropped records), k_record, risk_record,
+                l_record, dominant_ratio_record
+    """
+
+    def __init__(self, df, qis, sensitive=None, dropna=True, sensitive_dropna=True, n_workers=None):
+        self.qis = list(qis)
+        self.sensitive = sensitive
+        self.n_records = len(df)
+        self.parallel = bool(n_workers and n_workers > 1 and self.n_records >= PARALLEL_MIN_ROWS)
+        self.n_workers = n_workers
+
+        counted = self._count_parallel(df, dropna) if self.parallel else None
+        if counted is not None:
+            self.codes, self.k = counted
+            rows = np.flatnonzero(self.codes >= 0) if dropna else np.arange(self.n_records)
+            class_codes = self.codes[rows]
+        else:
+            combined, radix, missing = combine_codes(df, self.qis)
+            rows = np.flatnonzero(~missing) if dropna else np.arange(self.n_records)
+            combined = combined[rows]
+            if radix <= max(DENSE_LIMIT, 2 * len(rows)):
+                counts = np.bincount(combined, minlength=radix)
+                present = counts > 0
+                class_codes = (np.cumsum(present) - 1)[combined]
+                self.k = counts[present]
+            else:
+                _, class_codes, self.k = np.unique(combined, return_inverse=True, return_counts=True)
+            self.codes = np.full(self.n_records, -1, dtype=np.int64)
+            self.codes[rows] = class_codes
+        self.n_classes = len(self.k)
+
+        # Every record of a class carries the same QI values, so any one will do
+        representative = np.empty(self.n_classes, dtype=np.int64)
+        representative[class_codes] = rows
+        self.keys = df[self.qis].iloc[representative].reset_index(drop=True)
+        self.complete = self.keys.notna().all(axis=1).to_numpy()
+        self.risk = 1.0 / self.k
+
+        if sensitive is not None:
+            self._count_sensitive(df[sensitive].to_numpy()[rows], class_codes, sensitive_dropna)
+
+    def _count_parallel(self, df, dropna):
+        """Class code of every record and class sizes, over one pool; None if the codes overflow."""
+        with WorkerPool(self.n_workers, context=df) as pool:
+            factorized = factorize_combined(pool, self.qis, dropna)
+            if factorized is None:
+                return None
+            shared, radix = factorized
+            with shared:
+                k = count_classes(pool, shared, radix, max(DENSE_LIMIT, 2 * self.n_records))
+                return shared.release(), k
+
+    def _count_sensitive(self, values, class_codes, sensitive_dropna):
+        s_codes, uniques = pd.factorize(values, sort=True)
+        values = list(uniques)
+        if not sensitive_dropna and (s_codes < 0).any():
+            s_codes = np.where(s_codes < 0, len(values), s_codes)
+            values.append(np.nan)
+        keep = s_codes >= 0
+        n_values = len(values)
+
+        flat = class_codes[keep] * n_values + s_codes[keep]
+        self.sensitive_values = values
+        self.sensitive_counts = np.bincount(
+            flat, minlength=self.n_classes * n_values).reshape(self.n_classes, n_values)
+        self.l = (self.sensitive_counts > 0).sum(axis=1)
+        if n_values:
+            dom = self.sensitive_counts.argmax(axis=1)
+            self.dominant_count = self.sensitive_counts[np.arange(self.n_classes), dom]
+            self.dominant_value = np.asarray(values, dtype=object)[dom]
+        else:
+            self.dominant_count = np.zeros(self.n_classes, dtype=np.int64)
+            self.dominant_value = np.full(self.n_classes, None, dtype=object)
+        self.dominant_ratio = self.dominant_count / self.k
+
+    # ------------------------- per record -------------------------
+    def _per_record(self, values, fill):
+        return np.where(self.codes >= 0, values[self.codes], fill)
+
+    @property
+    def k_record(self):
+        """Class size of every record (0 for records dropped by dropna)."""
+        return self._per_record(self.k, 0)
+
+    @property
+    def risk_record(self):
+        """1/k of every record (NaN for records dropped by dropna)."""
+        return self._per_record(self.risk, np.nan)
+
+    @property
+    def l_record(self):
+        """l of every record's class (0 for records dropped by dropna)."""
+        return self._per_record(self.l, 0)
+
+    @property
+    def dominant_ratio_record(self):
+        """Dominant sensitive share of every record's class (NaN if dropped)."""
+        return self._per_record(self.dominant_ratio, np.nan)
+
+    # ------------------------- tables -----------------------------
+    def class_table(self, k_name='k', l_name=None):
+        """One row per class: the QI values, the class size and optionally l."""
+        table = self.keys.copy()
+        if k_name is not None:
+            table[k_name] = self.k
+        if l_name is not None:
+            table[l_name] = self.l
+        return table
+
+    def sensitive_table(self, count_name='count', k_name='k', ratio_name='ratio'):
+        """
+        One row per (class, sensitive value) present, like
+        ``groupby(qis + [sensitive]).size()`` merged with the class sizes.
+        """
+        cls, val = np.nonzero(self.sensitive_counts)
+        table = self.keys.iloc[cls].reset_index(drop=True)
+        table[self.sensitive] = np.asarray(self.sensitive_values, dtype=object)[val]
+        table[count_name] = self.sensitive_counts[cls, val]
+        table[k_name] = self.k[cls]
+        table[ratio_name] = table[count_name] / table[k_name]
+        return table
+
+
+def class_key(values):
+    """Hashable class key with missing values normalised to None."""
+    return tuple(None if pd.isna(v) else v for v in values)
+
+
+def class_sort_key(key):
+    """groupby sort order: per level by value, missing values last."""
+    return tuple((v is None, '' if v is None else v) for v in key)
+
+
+class ClassIndex:
+    """
+    Mutable equivalence-class index: class key -> row positions.
+
+    Keys are tuples of the QI values (missing values as None); the first
+    ``n_cluster`` QIs define the cluster a class belongs to. Class sizes
+    are read off the row lists, so moving or dropping records only costs
+    the records touched instead of a fresh groupby over the frame. Row
+    lists are re-sorted lazily, only when positional order is asked for.
+    """
+
+    def __init__(self, df, qis, n_cluster=None):
+        self.qis = list(qis)
+        self.n_cluster = len(self.qis) - 1 if n_cluster is None else n_cluster
+        classes = EquivalenceClasses(df, self.qis, dropna=False)
+
+        order = np.argsort(classes.codes, kind='stable')
+        chunks = np.split(order, np.cumsum(classes.k)[:-1])
+        keys = classes.keys.itertuples(index=False, name=None)
+        self._rows = {class_key(key): chunk.tolist() for key, chunk in zip(keys, chunks)}
+        self._unsorted = set()
+        self._clusters = {}
+        for key in self._rows:
+            self._clusters.setdefault(key[:self.n_cluster], set()).add(key)
+
+    def count(self, key):
+        rows = self._rows.get(key)
+        return len(rows) if rows else 0
+
+    def rows(self, key):
+        """Row positions of class ``key`` in frame order."""
+        rows = self._rows.get(key, [])
+        if key in self._unsorted:
+            rows.sort()
+            self._unsorted.discard(key)
+        return rows
+
+    def cluster(self, cluster_key):
+        """Keys of the non-empty classes in a cluster."""
+        return sorted(self._clusters.get(cluster_key, ()), key=class_sort_key)
+
+    def small(self, k):
+        """Keys of the classes with fewer than ``k`` records, in groupby order."""
+        return sorted((key for key, rows in self._rows.items() if len(rows) < k), key=class_sort_key)
+
+    def first_rows(self, keys, n):
+        """The first ``n`` (position, key) pairs in frame order across ``keys``."""
+        streams = [zip(self.rows(key), repeat(key)) for key in keys]
+        return list(islice(heapq.merge(*streams), n))
+
+    def move(self, key, positions, new_key):
+        """Move ``positions`` (all in class ``key``) to class ``new_key``."""
+        if not positions or key == new_key:
+            return
+        rows = self.rows(key)
+        if len(positions) == len(rows):
+            self._discard(key)
+        else:
+            taken = set(positions)
+            self._rows[key] = [pos for pos in rows if pos not in taken]
+
+        if new_key in self._rows:
+            self._rows[new_key].extend(positions)
+            self._unsorted.add(new_key)
+        else:
+            self._rows[new_key] = sorted(positions)
+            self._clusters.setdefault(new_key[:self.n_cluster], set()).add(new_key)
+
+    def drop(self, key):
+        """Remove class ``key``; returns its row positions."""
+        rows = self.rows(key)
+        self._discard(key)
+        return rows
+
+    def _discard(self, key):
+        del self._rows[key]
+        self._unsorted.discard(key)
+        cluster = self._clusters[key[:self.n_cluster]]
+        cluster.discard(key)
+        if not cluster:
+            del self._clusters[key[:self.n_cluster]]
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+SUPPRESSED = '*'
+
+
+class _Marker:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+# Special keys of a dict rule: value for anything not listed / for missing input
+OTHER = _Marker('OTHER')
+MISSING = _Marker('MISSING')
+
+EU_COUNTRIES = frozenset([
+    "Austria", "Belgium", "Bulgaria", "Croatia", "Cyprus", "Czech Republic",
+    "Denmark", "Estonia", "Finland", "France", "Germany", "Greece", "Hungary",
+    "Ireland", "Italy", "Latvia", "Lithuania", "Luxembourg", "Malta",
+    "Netherlands", "Poland", "Portugal", "Romania", "Slovakia", "Slovenia",
+    "Spain", "Sweden",
+])
+
+# =========================================================
+# HIERARCHY DEFINITION
+# =========================================================
+
+def _apply_rule(rule, values):
+    """Evaluate one level rule on the distinct raw values."""
+    if callable(rule):
+        return [rule(v) for v in values]
+    if isinstance(rule, dict):
+        other = rule.get(OTHER, np.nan)
+        missing = rule.get(MISSING, other)
+        return [missing if pd.isna(v) else rule.get(v, other) for v in values]
+    return [rule] * len(values)
+
+
+def _factorize(values):
+    values = pd.Series(values, dtype=object)
+    try:
+        return pd.factorize(values, sort=True)
+    except TypeError:
+        # Mixed types (e.g. invalid zips kept as-is next to "21xx")
+        return pd.factorize(values)
+
+
+class Hierarchy:
+    """
+    Generalisation hierarchy of one attribute.
+
+    ``levels`` lists (name, rule) pairs from the most specific to the most
+    general level; level 0 ("raw") is the value itself. A rule is one of
+      dict     -- raw value -> generalised value; OTHER gives the value for
+                  anything not listed (missing otherwise, like ``.map``) and
+                  MISSING the value for missing input (defaults to OTHER)
+      callable -- called once per distinct raw value
+      scalar   -- every value generalises to it (e.g. "*")
+    Every rule is applied to the raw values, not to the level below it.
+    """
+
+    def __init__(self, name, levels):
+        self.name = name
+        self.level_names = ['raw'] + [level for level, _ in levels]
+        self.rules = [None] + [rule for _, rule in levels]
+
+    def level(self, level):
+        """Level number of a level name (numbers pass through)."""
+        if isinstance(level, str):
+            return self.level_names.index(level)
+        if not -len(self.rules) <= level < len(self.rules):
+            raise IndexError(f"{self.name} has no level {level}")
+        return level % len(self.rules)
+
+    def compile(self, column):
+        return CompiledHierarchy(self, column)
+
+    def generalise(self, column, level):
+        """Generalise ``column`` to ``level`` (name or number)."""
+        return self.compile(column).values(level)
+
+# =========================================================
+# COMPILED LOOKUP TABLES
+# =========================================================
+
+class CompiledHierarchy:
+    """
+    A hierarchy compiled against one column.
+
+    The column is factorized once; every level is a lookup array from
+    that raw code to the level's (sorted) category code, with -1 for a
+    missing generalised value. Generalising to any level is one
+    ``np.take``, so switching levels never touches the strings again.
+    """
+
+    def __init__(self, hierarchy, column):
+        self.hierarchy = hierarchy
+        column = pd.Series(column)
+        self.index = column.index
+        self.name = column.name
+
+        codes, uniques = pd.factorize(column)
+        # Raw code len(uniques) stands for a missing raw value
+        raw = np.append(np.asarray(uniques, dtype=object), np.nan)
+        self.raw_codes = np.where(codes < 0, len(uniques), codes)
+
+        self.tables, self.categories = [], []
+        for rule in hierarchy.rules:
+            generalised = raw if rule is None else _apply_rule(rule, raw)
+            table, categories = _factorize(generalised)
+            self.tables.append(table)
+            self.categories.append(np.asarray(categories, dtype=object))
+
+    def codes(self, level):
+        """Category code of every record at ``level`` (-1 for missing)."""
+        return self.tables[self.hierarchy.level(level)][self.raw_codes]
+
+    def values(self, level):
+        """The column generalised to ``level`` (object dtype, like ``.map``)."""
+        level = self.hierarchy.level(level)
+        lookup = np.append(self.categories[level], np.nan)
+        return pd.Series(lookup[self.codes(level)], index=self.index, name=self.name, dtype=object)
+
+    def rollup(self, from_level, to_level):
+        """
+        Code -> code array taking ``from_level`` categories to ``to_level``
+        (last slot: missing). Raises ValueError if a category would have
+        to generalise to two different values.
+        """
+        src = self.tables[self.hierarchy.level(from_level)]
+        dst = self.tables[self.hierarchy.level(to_level)]
+        n = len(self.categories[self.hierarchy.level(from_level)])
+        src = np.where(src < 0, n, src)
+
+        pairs = np.unique(np.stack([src, dst]), axis=1)
+        if len(np.unique(pairs[0])) != pairs.shape[1]:
+            raise ValueError(f"{self.hierarchy.name}: level {to_level!r} does not "
+                             f"generalise level {from_level!r}")
+        table = np.full(n + 1, -1, dtype=np.int64)
+        table[pairs[0]] = pairs[1]
+        return table
+
+# =========================================================
+# SHARED ATTRIBUTE RULES
+# =========================================================
+
+def zip_prefix(zip_code, invalid=SUPPRESSED):
+    """2100 -> "21xx"; anything that is not a number -> ``invalid``."""
+    try:
+        return str(int(zip_code))[:2] + "xx"
+    except (TypeError, ValueError, OverflowError):
+        return invalid
+
+
+def zip_region(zip_code):
+    """Two regions: 21/22xx and 23/24xx."""
+    return '21-22xx' if str(zip_code).startswith(('21', '22')) else '23-24xx'
+
+
+ZIP = Hierarchy('zip', [
+    ('prefix', zip_prefix),
+    ('region', zip_region),
+    ('suppressed', SUPPRESSED),
+])
+
+CITIZENSHIP = Hierarchy('citizenship', [
+    ('eu', lambda c: "Other" if pd.isna(c) else "EU" if str(c).strip() in EU_COUNTRIES else "non EU"),
+    ('suppressed', SUPPRESSED),
+])
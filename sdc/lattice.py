@@ -0,0 +1,241 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from sdc.hierarchy import Hierarchy
+
+# =========================================================
+# FREQUENCY TABLES
+# =========================================================
+
+class FrequencyTable:
+    """
+    Equivalence classes of one lattice node: the level code of every QI
+    per class (the last code of a QI stands for missing), the class
+    sizes and the sensitive value counts per class.
+    """
+
+    def __init__(self, codes, k, counts):
+        self.codes = codes
+        self.k = k
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.k)
+
+    @classmethod
+    def from_records(cls, codes, cards, sensitive_codes, n_sensitive):
+        """Build the table from per-record QI codes (one pass over the data)."""
+        first, inv, n_classes = _group(codes, cards)
+        k = np.bincount(inv, minlength=n_classes)
+        keep = sensitive_codes >= 0
+        counts = np.bincount(inv[keep] * n_sensitive + sensitive_codes[keep],
+                             minlength=n_classes * n_sensitive).reshape(n_classes, n_sensitive)
+        return cls(codes[first], k, counts)
+
+    def rollup(self, qi, mapping, cards):
+        """
+        Generalise one QI by ``mapping`` (code -> code of the next level)
+        and merge the classes that collapse, without touching the records.
+        """
+        codes = self.codes.copy()
+        codes[:, qi] = mapping[codes[:, qi]]
+        first, inv, n_classes = _group(codes, cards)
+        k = np.bincount(inv, weights=self.k, minlength=n_classes).astype(np.int64)
+        counts = np.zeros((n_classes, self.counts.shape[1]), dtype=np.int64)
+        for v in range(self.counts.shape[1]):
+            counts[:, v] = np.bincount(inv, weights=self.counts[:, v], minlength=n_classes)
+        return FrequencyTable(codes[first], k, counts)
+
+    # ------------------------- privacy models -----------------------
+    def min_k(self):
+        return int(self.k.min()) if len(self) else 0
+
+    def min_l(self):
+        return int((self.counts > 0).sum(axis=1).min()) if len(self) else 0
+
+    def max_dominance(self):
+        """Largest share of one sensitive value within a class."""
+        return float((self.counts.max(axis=1, initial=0) / self.k).max()) if len(self) else 0.0
+
+    def meets(self, k=1, l=1, dominance=None):
+        """k-anonymity, distinct l-diversity and dominant share < ``dominance``."""
+        if self.min_k() < k:
+            return False
+        if l > 1 and self.min_l() < l:
+            return False
+        return dominance is None or self.max_dominance() < dominance
+
+
+def _group(codes, cards):
+    """Class of every row of a code matrix: first row, inverse, count."""
+    if int(np.prod([float(c) for c in cards])) < 2 ** 62:
+        combined = np.zeros(len(codes), dtype=np.int64)
+        for j, card in enumerate(cards):
+            combined = combined * card + codes[:, j]
+        _, first, inv = np.unique(combined, return_index=True, return_inverse=True)
+    else:
+        _, first, inv = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+    inv = inv.ravel()
+    return first, inv, len(first)
+
+# =========================================================
+# INFORMATION LOSS (monotone: never drops when generalising)
+# =========================================================
+
+def discernibility(table, node, depths):
+    """Sum of squared class sizes."""
+    return float((table.k.astype(float) ** 2).sum())
+
+
+def average_class_size(table, node, depths):
+    """Records per class (C_avg without the k normalisation)."""
+    return float(table.k.sum() / len(table))
+
+
+def precision_loss(table, node, depths):
+    """Mean generalisation height over the QIs (1 - Prec)."""
+    return float(np.mean([level / (depth - 1) if depth > 1 else 0.0
+                          for level, depth in zip(node, depths)]))
+
+
+LOSS_METRICS = {
+    'dm': discernibility,
+    'avg_class': average_class_size,
+    'prec': precision_loss,
+}
+
+# =========================================================
+# LATTICE SEARCH
+# =========================================================
+
+class Lattice:
+    """
+    Full-domain generalisation lattice of ``df`` over per-QI hierarchies.
+
+    A node picks one level per QI. Every hierarchy is compiled once and
+    the data is grouped once, at the bottom node; every other node's
+    frequency table is rolled up from an already evaluated child by
+    re-mapping one code column of that (much smaller) table.
+    """
+
+    def __init__(self, df, hierarchies, sensitive=None):
+        self.qis = list(hierarchies)
+        self.sensitive = sensitive
+        self.n_records = len(df)
+        self.compiled = [h.compile(df[qi]) if isinstance(h, Hierarchy) else h
+                         for qi, h in hierarchies.items()]
+        self.depths = [len(c.categories) for c in self.compiled]
+        # One extra code per level for missing values
+        self.cards = [[len(cats) + 1 for cats in c.categories] for c in self.compiled]
+        self.up = [[self._step(j, a) for a in range(depth - 1)]
+                   for j, depth in enumerate(self.depths)]
+
+        codes = np.column_stack([self._record_codes(j, 0) for j in range(len(self.qis))])
+        if sensitive is not None:
+            s_codes, self.sensitive_values = pd.factorize(df[sensitive], sort=True)
+        else:
+            s_codes, self.sensitive_values = np.full(len(df), -1), []
+        self.bottom = FrequencyTable.from_records(
+            codes, self.node_cards((0,) * len(self.qis)), s_codes, len(self.sensitive_values))
+
+    def _record_codes(self, j, level):
+        codes = self.compiled[j].codes(level)
+        return np.where(codes < 0, self.cards[j][level] - 1, codes)
+
+    def _step(self, j, level):
+        """Code -> code mapping from ``level`` to ``level + 1`` of QI ``j``."""
+        mapping = self.compiled[j].rollup(level, level + 1)
+        return np.where(mapping < 0, self.cards[j][level + 1] - 1, mapping)
+
+    def node_cards(self, node):
+        return [self.cards[j][level] for j, level in enumerate(node)]
+
+    def nodes(self):
+        """Every node of the lattice, bottom to top."""
+        return sorted(product(*(range(d) for d in self.depths)), key=sum)
+
+    def table(self, node):
+        """Frequency table of any node, rolled up from the bottom."""
+        table, current = self.bottom, [0] * len(node)
+        for j, level in enumerate(node):
+            for a in range(level):
+                current[j] = a + 1
+                table = table.rollup(j, self.up[j][a], self.node_cards(current))
+        return table
+
+    def describe(self, node):
+        """{qi: level name} of a node."""
+        return {qi: c.hierarchy.level_names[level]
+                for qi, c, level in zip(self.qis, self.compiled, node)}
+
+    def search(self, k=2, l=1, dominance=None, loss='dm'):
+        """
+        Bottom-up search for the minimal-loss node meeting k, l and the
+        dominance threshold.
+
+        Monotonicity prunes the lattice: every generalisation of a node
+        that meets the targets meets them too, so such nodes are tagged
+        without being evaluated, and only the lowest satisfying nodes (the
+        frontier) are scored. ``loss`` is a name from LOSS_METRICS or a
+        callable(table, node, depths) that must not decrease up the lattice.
+        Returns None if not even the top node meets the targets.
+        """
+        loss_fn = LOSS_METRICS[loss] if isinstance(loss, str) else loss
+        satisfied, frontier = set(), []
+        failed_tables = {}          # evaluated nodes of the previous height that failed
+        evaluated = 0
+
+        by_height = {}
+        for node in self.nodes():
+            by_height.setdefault(sum(node), []).append(node)
+
+        for height in sorted(by_height):
+            failed_now = {}
+            for node in by_height[height]:
+                children = [node[:j] + (node[j] - 1,) + node[j + 1:]
+                            for j in range(len(node)) if node[j] > 0]
+                if any(child in satisfied for child in children):
+                    satisfied.add(node)
+                    continue
+
+                # All children failed, so all of them have a table to roll up from
+                if children:
+                    child = min(children, key=lambda c: len(failed_tables[c]))
+                    j = next(j for j in range(len(node)) if child[j] != node[j])
+                    table = failed_tables[child].rollup(j, self.up[j][child[j]], self.node_cards(node))
+                else:
+                    table = self.bottom
+                evaluated += 1
+
+                if table.meets(k, l, dominance):
+                    satisfied.add(node)
+                    frontier.append((node, loss_fn(table, node, self.depths), table))
+                else:
+                    failed_now[node] = table
+            failed_tables = failed_now
+
+        if not frontier:
+            return None
+        node, best_loss, table = min(frontier, key=lambda f: (f[1], sum(f[0])))
+        return {
+            'node': self.describe(node),
+            'levels': node,
+            'loss': best_loss,
+            'k': table.min_k(),
+            'l': table.min_l(),
+            'max_dominance': table.max_dominance(),
+            'n_classes': len(table),
+            'frontier': [(self.describe(n), score) for n, score, _ in frontier],
+            'n_nodes': len(self.nodes()),
+            'evaluated': evaluated,
+            'tagged': len(satisfied) - len(frontier),
+        }
+
+    def generalise(self, df, node):
+        """Copy of ``df`` with every QI generalised to its level in ``node``."""
+        out = df.copy()
+        for qi, compiled, level in zip(self.qis, self.compiled, node):
+            out[qi] = compiled.values(level).to_numpy()
+        return out
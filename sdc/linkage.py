@@ -0,0 +1,754 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sdc.cache import read_store, write_store
+from sdc.eqclass import EquivalenceClasses, combine_codes
+
+# =========================================================
+# QUASI-IDENTIFIERS USED BY THE LINKAGE ATTACK
+# =========================================================
+
+# Must match exactly between the anonymised and the public record
+EXACT_QIS = ['sex', 'maritalstatus_a', 'last_voted', 'citizenship_a']
+AGE_QI = 'age_a'
+ZIP_QI = 'zip_a'
+SUPPRESSED = '*'
+
+# Age noise parameter (±5 years)
+AGE_NOISE = 5
+
+AGE_RANGES = {
+    "<30": (0, 29),
+    "30-49": (30, 49),
+    "50-64": (50, 64),
+    "65+": (65, 150)
+}
+
+# =========================================================
+# AGE MATCHING LOGIC (intervals widened by ±noise)
+# =========================================================
+# An age is an interval [lo, hi]: a band label from ``ranges`` ("30-49"),
+# a generic "a-b", "<a" or "a+" label, or an exact age (lo == hi). Two
+# ages can match when their intervals overlap once both are widened by
+# the noise radius, so exact ages on one side and bands on the other
+# compare like any two bands. A missing, suppressed ("*") or unreadable
+# age is the wildcard [0, inf), as "*" is for zip: it hides the age, it
+# does not rule anyone out.
+ANY_AGE = (0.0, np.inf)
+
+
+def parse_interval(value, ranges=AGE_RANGES):
+    """(lo, hi) of one age value; ANY_AGE if missing, suppressed or unreadable."""
+    if pd.isna(value):
+        return ANY_AGE
+    if value in ranges:
+        return ranges[value]
+    if isinstance(value, (int, float, np.number)):
+        return float(value), float(value)
+    text = str(value).strip()
+    try:
+        if text.startswith('<'):
+            return 0, float(text[1:]) - 1
+        if text.endswith('+'):
+            return float(text[:-1]), np.inf
+        if '-' in text[1:]:
+            lo, hi = text.split('-', 1)
+            return float(lo), float(hi)
+        return float(text), float(text)
+    except ValueError:
+        return ANY_AGE
+
+
+def to_intervals(values, ranges=AGE_RANGES):
+    """lo and hi arrays of a column of ages, parsing every distinct value once."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    bounds = np.array([parse_interval(v, ranges) for v in uniques] + [ANY_AGE],
+                      dtype=float).reshape(-1, 2)
+    codes = np.where(codes < 0, len(uniques), codes)
+    return bounds[codes, 0], bounds[codes, 1]
+
+
+def age_groups_can_match(age_group1, age_group2, noise=AGE_NOISE):
+    """
+    Check if two ages (band labels or exact ages) could match given
+    ±noise years.
+
+    Examples (noise=5):
+    - "<30" could match "<30" or "30-49" (if person is 25-34)
+    - "30-49" could match "<30", "30-49", or "50-64"
+    - "50-64" could match "30-49", "50-64", or "65+"
+    - "65+" could match "50-64" or "65+"
+    - 27 could match "<30" or "30-49"
+
+    The same rule as ``interval_join``; a missing, suppressed ("*") or
+    unreadable age matches any age.
+    """
+    min1, max1 = parse_interval(age_group1)
+    min2, max2 = parse_interval(age_group2)
+
+    # Expand each range by ±noise and check if they overlap
+    return bool(min1 - noise <= max2 + noise and min2 - noise <= max1 + noise)
+
+
+def interval_runs(lo, hi, positions=None):
+    """
+    The intervals at ``positions`` (all by default) sorted by lo, as two
+    runs: finite width and open-ended. Each run is (positions, sorted lo,
+    sorted hi, widest width); missing intervals are left out.
+    """
+    lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+    positions = np.arange(len(lo)) if positions is None else np.asarray(positions, dtype=np.intp)
+    valid = ~(np.isnan(lo[positions]) | np.isnan(hi[positions]))
+    bounded = np.isfinite(hi[positions] - lo[positions])
+
+    runs = []
+    for group in (bounded, ~bounded):
+        run = positions[valid & group]
+        run = run[np.argsort(lo[run], kind='stable')]
+        width = float((hi[run] - lo[run]).max()) if len(run) else 0.0
+        runs.append((run, lo[run], hi[run], width))
+    return runs
+
+
+def _probe(left_lo, left_hi, run, noise):
+    """(left, right) positions of the left intervals meeting the intervals of one run."""
+    order, sorted_lo, sorted_hi, width = run
+    ok = ~(np.isnan(left_lo) | np.isnan(left_hi))
+    start = np.searchsorted(sorted_lo, left_lo - 2 * noise - width, side='left') if np.isfinite(width) \
+        else np.zeros(len(left_lo), dtype=np.int64)
+    stop = np.searchsorted(sorted_lo, left_hi + 2 * noise, side='right')
+    size = np.where(ok, stop - start, 0)
+
+    offsets = np.concatenate([[0], np.cumsum(size)])
+    left_pos = np.repeat(np.arange(len(left_lo)), size)
+    window = np.repeat(start - offsets[:-1], size) + np.arange(offsets[-1])
+    if width > 0:
+        keep = sorted_hi[window] + noise >= left_lo[left_pos] - noise
+        left_pos, window = left_pos[keep], window[keep]
+    return left_pos, order[window]
+
+
+def probe_runs(left_lo, left_hi, runs, noise=AGE_NOISE):
+    """interval_join against prebuilt ``interval_runs``."""
+    left_lo, left_hi = np.asarray(left_lo, dtype=float), np.asarray(left_hi, dtype=float)
+    parts = [_probe(left_lo, left_hi, run, noise) for run in runs]
+    left_pos = np.concatenate([l for l, _ in parts])
+    right_pos = np.concatenate([r for _, r in parts])
+
+    # Register order within every left position
+    by = np.lexsort((right_pos, left_pos))
+    return left_pos[by], right_pos[by]
+
+
+def interval_join(left_lo, left_hi, right_lo, right_hi, noise=AGE_NOISE):
+    """
+    Every (left, right) pair of positions whose intervals overlap after
+    widening both by ``noise``, ordered by left and then right position.
+
+    A sorted sweep instead of pairwise tests: the right intervals are
+    sorted by lo once; one can only reach a left interval if its lo lies
+    within [left lo - 2 noise - widest right interval, left hi + 2 noise],
+    which two ``searchsorted`` calls find, and only that window is checked
+    against hi. Exact ages (zero width) need no check at all; open-ended
+    bands ("65+", and the ANY_AGE wildcard) are swept apart so they do not
+    widen the window of the rest. NaN intervals never match; to_intervals
+    gives ANY_AGE instead.
+    """
+    return probe_runs(left_lo, left_hi, interval_runs(right_lo, right_hi), noise)
+
+# =========================================================
+# VECTORIZED LINKAGE (blocks on hard QIs, interval sweep on age)
+# =========================================================
+
+RESULT_QIS = ['age_a', 'sex', 'maritalstatus_a', 'last_voted', 'citizenship_a', 'zip_a']
+
+
+class CandidateIndex:
+    """
+    Candidate index over the public register for ``link_pairs``.
+
+    The register is blocked on the hard QIs once; every block keeps its
+    age intervals sorted (``interval_runs``) and the zips are held as
+    integer codes. Looking up any set of anonymised records then only
+    sweeps the blocks those records fall in, so the index can be kept and
+    probed again for a handful of changed records.
+    """
+
+    def __init__(self, public_df, noise=AGE_NOISE, public_age=AGE_QI):
+        self.noise = noise
+        self.public_age = public_age
+        lo, hi = to_intervals(public_df[public_age])
+        # dropna=True: a missing QI never equals anything, so it never matches
+        blocks = public_df[EXACT_QIS].groupby(EXACT_QIS, sort=False).indices
+        self.runs = {key: interval_runs(lo, hi, positions) for key, positions in blocks.items()}
+
+        zips = public_df[ZIP_QI].astype(str).to_numpy(dtype=object)
+        wild = zips == SUPPRESSED
+        self.zip_values = pd.Index(pd.unique(zips[~wild]))
+        self.zip_codes = np.where(wild, -1, self.zip_values.get_indexer(zips))
+
+    def _anon_zip_codes(self, zips):
+        """Zip codes of anonymised records: -1 for "*", -2 for zips not in the register."""
+        zips = pd.Series(zips).astype(str).to_numpy(dtype=object)
+        codes = self.zip_values.get_indexer(zips)
+        return np.where(zips == SUPPRESSED, -1, np.where(codes < 0, -2, codes))
+
+    def pairs(self, anon_df, rows=None):
+        """
+        Candidate pairs of the anonymised records at the sorted positions
+        ``rows`` (all records by default), as ``link_pairs`` returns them.
+        """
+        rows = np.arange(len(anon_df)) if rows is None else np.asarray(rows, dtype=np.intp)
+        records = anon_df.iloc[rows]
+        lo, hi = to_intervals(records[AGE_QI])
+
+        anon_parts, public_parts = [], []
+        for key, positions in records[EXACT_QIS].groupby(EXACT_QIS, sort=False).indices.items():
+            runs = self.runs.get(key)
+            if runs is None:
+                continue
+            left, right = probe_runs(lo[positions], hi[positions], runs, self.noise)
+            anon_parts.append(positions[left])
+            public_parts.append(right)
+        anon_pos = np.concatenate(anon_parts) if anon_parts else np.empty(0, dtype=np.intp)
+        public_pos = np.concatenate(public_parts) if public_parts else np.empty(0, dtype=np.intp)
+
+        # Zip rule: real zips on both sides must agree
+        anon_zip = self._anon_zip_codes(records[ZIP_QI])[anon_pos]
+        public_zip = self.zip_codes[public_pos]
+        zip_scored = (anon_zip != -1) & (public_zip != -1)
+        zip_agree = anon_zip == public_zip
+        keep = ~zip_scored | zip_agree
+        anon_pos, public_pos = anon_pos[keep], public_pos[keep]
+        zip_scored, zip_agree = zip_scored[keep], zip_agree[keep]
+
+        # Order by anonymised record; a record sits in one block, already in register order
+        order = np.argsort(anon_pos, kind='stable')
+
+        # Score: five hard QIs always agree, zip only counts when both sides have one
+        max_score = 5 + zip_scored[order]
+        match_score = 5 + (zip_scored & zip_agree)[order]
+        return pd.DataFrame({
+            'anon_pos': rows[anon_pos[order]],
+            'public_pos': public_pos[order],
+            'match_strength': (match_score / max_score) * 100,
+        })
+
+
+def link_pairs(anon_df, public_df, noise=AGE_NOISE, public_age=AGE_QI):
+    """
+    All (anonymised, public) candidate pairs with their match strength.
+
+    Both frames are blocked on the hard QIs; inside a block the ages are
+    joined as intervals widened by ±noise with a sorted sweep, so the
+    public side may hold bands or exact ages (``public_age``, e.g. the
+    ``age`` column written by agecalculator.py). The zip rule is applied
+    to the joined pairs: real zips on both sides must agree, a "*" on
+    either side always passes. Returns a frame with anon_pos, public_pos
+    (iloc positions) and match_strength, ordered like the original nested
+    scan.
+    """
+    return CandidateIndex(public_df, noise, public_age).pairs(anon_df)
+
+
+def reidentification_results(anon_df, public_df, noise=AGE_NOISE, public_age=AGE_QI):
+    """
+    Build the identifier.py results table: one row per unmatched record,
+    one row per candidate for everything else. ``public_age`` names the
+    register's age column (bands or exact ages).
+    """
+    return _results_table(anon_df, public_df, link_pairs(anon_df, public_df, noise, public_age))
+
+
+def _results_table(anon_df, public_df, pairs):
+    """
+    The reidentification_results table of ``anon_df`` from its candidate
+    pairs. Columns are gathered with ``take`` on the pandas arrays, which
+    keeps their dtypes instead of re-inferring millions of strings.
+    """
+    pair_anon = pairs['anon_pos'].to_numpy()
+    counts = np.bincount(pair_anon, minlength=len(anon_df))
+
+    unmatched = np.flatnonzero(counts == 0)
+    rows = np.concatenate([pair_anon, unmatched])
+    public_pos = np.concatenate([pairs['public_pos'].to_numpy(), np.full(len(unmatched), -1)])
+    strength = np.concatenate([pairs['match_strength'].to_numpy(), np.zeros(len(unmatched))])
+
+    order = np.argsort(rows, kind='stable')
+    rows, public_pos, strength = rows[order], public_pos[order], strength[order]
+    match_count = counts[rows]
+    kind = np.minimum(match_count, 2)      # no match, unique match, several
+
+    return pd.DataFrame({
+        'anon_index': anon_df.index[rows],
+        'party': anon_df['party'].array.take(rows),
+        'match_count': match_count,
+        'match_type': pd.Series(['No Match', 'UNIQUE MATCH', 'Multiple Matches']).array.take(kind),
+        'confidence': pd.Series(['N/A', 'HIGH', 'LOW']).array.take(kind),
+        # -1 (no candidate) becomes a missing name
+        'matched_name': public_df['name'].array.take(public_pos, allow_fill=True),
+        'match_strength': strength,
+        **{col: anon_df[col].array.take(rows) for col in RESULT_QIS}
+    })
+
+# =========================================================
+# INCREMENTAL AUDIT (cached pairs, re-score changed records)
+# =========================================================
+
+# Columns that decide a record's candidates
+LINKAGE_COLUMNS = EXACT_QIS + [AGE_QI, ZIP_QI]
+AUDIT_FILE = 'audit.json'
+
+
+def release_diff(old, new, columns=None):
+    """
+    Cells that differ between two releases of the same records (same
+    index), as {column: positions of the changed rows}; unchanged columns
+    are left out and a missing value equals a missing value.
+    """
+    if not old.index.equals(new.index):
+        raise ValueError("Releases must hold the same records in the same order.")
+    diff = {}
+    for col in (new.columns if columns is None else columns):
+        if col not in old:
+            diff[col] = np.arange(len(new))
+            continue
+        before, after = old[col].to_numpy(dtype=object), new[col].to_numpy(dtype=object)
+        changed = np.flatnonzero(~((before == after) | (pd.isna(before) & pd.isna(after))))
+        if len(changed):
+            diff[col] = changed
+    return diff
+
+
+def _register_fingerprint(public_df, noise, public_age):
+    """Hash of everything the cached pairs depend on besides the release."""
+    columns = EXACT_QIS + [public_age, ZIP_QI, 'name']
+    h = hashlib.sha1(pd.util.hash_pandas_object(public_df[columns]).to_numpy().tobytes())
+    h.update(json.dumps([columns, noise, AGE_RANGES], default=str).encode())
+    return h.hexdigest()
+
+
+class LinkageAudit:
+    """
+    Re-identification audit of successive releases against one register.
+
+    Holds a CandidateIndex over the register and the candidate pairs of
+    the last audited release. ``audit`` diffs a new release against it and
+    re-scores only the records whose linkage QIs changed; other edits (a
+    flipped party, a blanked evote) just refresh the results table.
+    ``save`` and ``load`` carry the release and its pairs between runs; a
+    state saved for another register, noise or age column is ignored.
+    """
+
+    def __init__(self, public_df, noise=AGE_NOISE, public_age=AGE_QI):
+        self.public_df = public_df
+        self.index = CandidateIndex(public_df, noise, public_age)
+        self.fingerprint = _register_fingerprint(public_df, noise, public_age)
+        self.release = None     # linkage columns of the last audited release
+        self.pairs = None       # its candidate pairs, by anonymised record
+        self.rescored = 0       # records scored by the last audit
+
+    def audit(self, anon_df, diff=None):
+        """
+        reidentification_results of ``anon_df``. ``diff`` lists the cells
+        changed since the last audited release (as ``release_diff`` returns
+        them) and is worked out when not given. The first release, or one
+        holding other records, is scored in full.
+        """
+        release = anon_df[LINKAGE_COLUMNS]
+        if self.release is None or not self.release.index.equals(release.index):
+            self.pairs = self.index.pairs(anon_df)
+            self.rescored = len(anon_df)
+        else:
+            if diff is None:
+                diff = release_diff(self.release, release, LINKAGE_COLUMNS)
+            rows = np.unique(np.concatenate(
+                [np.asarray(diff.get(c, ()), dtype=np.intp) for c in LINKAGE_COLUMNS]))
+            if len(rows):
+                kept = self.pairs[~np.isin(self.pairs['anon_pos'].to_numpy(), rows)]
+                pairs = pd.concat([kept, self.index.pairs(anon_df, rows)], ignore_index=True)
+                order = np.argsort(pairs['anon_pos'].to_numpy(), kind='stable')
+                self.pairs = pairs.take(order).reset_index(drop=True)
+            self.rescored = len(rows)
+
+        self.release = release.copy()
+        return _results_table(anon_df, self.public_df, self.pairs)
+
+    def save(self, path):
+        """Write the last audited release and its pairs to the folder ``path``."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        # The stores only count once the state file naming them is back
+        (path / AUDIT_FILE).unlink(missing_ok=True)
+        write_store(self.release.reset_index(names='_index'), path / 'release')
+        write_store(self.pairs, path / 'pairs')
+
+        fd, tmp = tempfile.mkstemp(dir=path, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint, 'records': len(self.release)}, f, indent=1)
+        os.replace(tmp, path / AUDIT_FILE)
+
+    @classmethod
+    def load(cls, path, public_df, noise=AGE_NOISE, public_age=AGE_QI):
+        """An audit over ``public_df`` that resumes from the state in ``path``, if it fits."""
+        audit = cls(public_df, noise, public_age)
+        path = Path(path)
+        try:
+            with open(path / AUDIT_FILE) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return audit
+        if state.get('fingerprint') != audit.fingerprint:
+            return audit
+
+        # Copied out of the memory-mapped files so the next save can replace them
+        audit.release = read_store(path / 'release').set_index('_index').rename_axis(None).copy()
+        audit.pairs = read_store(path / 'pairs').copy()
+        return audit
+
+# =========================================================
+# EXACT MATCHES ON MANY QIS (sorted-key join)
+# =========================================================
+
+def match_counts(left, right, columns):
+    """
+    For every row of ``left``, how many rows of ``right`` hold exactly the
+    same values on ``columns`` (``matches``) and how many rows of ``left``
+    share them (``multiplicity``).
+
+    Both frames are factorized together and every row folded into one
+    64-bit key, so comparing values costs one pass; the keys of ``right``
+    are sorted once and looked up with ``searchsorted``. Values compare
+    like ``==`` (1 equals 1.0, a missing value equals nothing), so rows
+    with a missing value have no matches and a multiplicity of 0.
+    """
+    columns = list(columns)
+    both = pd.concat([left[columns], right[columns]], ignore_index=True)
+    keys, _, missing = combine_codes(both, columns)
+    keys = np.where(missing, -1, keys)
+    left_keys, right_keys = keys[:len(left)], keys[len(left):]
+
+    uniques, counts = np.unique(right_keys[right_keys >= 0], return_counts=True)
+    pos = np.searchsorted(uniques, left_keys)
+    found = (left_keys >= 0) & (pos < len(uniques))
+    found[found] = uniques[pos[found]] == left_keys[found]
+    matches = np.zeros(len(left), dtype=np.int64)
+    matches[found] = counts[pos[found]]
+
+    _, inverse, left_counts = np.unique(left_keys, return_inverse=True, return_counts=True)
+    multiplicity = np.where(left_keys >= 0, left_counts[inverse.ravel()], 0)
+
+    return pd.DataFrame({'matches': matches, 'multiplicity': multiplicity}, index=left.index)
+
+# =========================================================
+# HOMOGENEOUS CLASSES AND THEIR PUBLIC CANDIDATES
+# =========================================================
+
+def homogeneous_groups(anon_df, public_df, qis, sensitive='party', name='name', dominance=1.0):
+    """
+    Classes of ``anon_df`` on ``qis`` whose dominant ``sensitive`` value
+    covers at least ``dominance`` of the class (1.0: pure, l = 1), joined
+    to the rows of ``public_df`` with the same QI values.
+
+    Classes are counted on integer codes (EquivalenceClasses); the class
+    keys and the public QIs are factorized together into one code
+    dictionary, and the public codes are sorted once, so every class finds
+    its candidates with a ``searchsorted``. Records or public rows with a
+    missing QI are left out, like ``groupby``.
+
+    Returns (groups, offsets, names): one row per selected class (QI
+    values, party_count, unique_party, dominant_party, k, dominant_ratio,
+    n_public, which may be 0) and the candidate names of class i as
+    ``names[offsets[i]:offsets[i + 1]]`` in register order.
+    """
+    qis = list(qis)
+    classes = EquivalenceClasses(anon_df, qis, sensitive)
+    k = classes.sensitive_counts.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(k > 0, classes.dominant_count / k, 0.0)
+    selected = np.flatnonzero((k > 0) & (ratio >= dominance))
+
+    groups = classes.keys.iloc[selected].reset_index(drop=True)
+    groups['party_count'] = classes.l[selected]
+    groups['unique_party'] = np.where(classes.l[selected] == 1, classes.dominant_value[selected], None)
+    groups['dominant_party'] = classes.dominant_value[selected]
+    groups['k'] = k[selected]
+    groups['dominant_ratio'] = ratio[selected]
+
+    public = public_df[qis]
+    both = pd.concat([groups[qis], public], ignore_index=True)
+    keys, _, missing = combine_codes(both, qis)
+    keys = np.where(missing, -1, keys)
+    group_keys, public_keys = keys[:len(groups)], keys[len(groups):]
+
+    # Public rows sorted by key (stable: register order within a key)
+    order = np.argsort(public_keys, kind='stable')
+    order = order[public_keys[order] >= 0]
+    sorted_keys = public_keys[order]
+    start = np.searchsorted(sorted_keys, group_keys, side='left')
+    n_public = np.searchsorted(sorted_keys, group_keys, side='right') - start
+
+    groups['n_public'] = n_public
+
+    offsets = np.concatenate([[0], np.cumsum(n_public)]).astype(np.int64)
+    rows = np.repeat(start - offsets[:-1], n_public) + np.arange(offsets[-1])
+    names = public_df[name].to_numpy(dtype=object)[order[rows]]
+    return groups, offsets, names
+
+# =========================================================
+# PROBABILISTIC LINKAGE (Fellegi-Sunter, EM over blocked pairs)
+# =========================================================
+
+DISAGREE, AGREE, MISSING = 0, 1, 2
+
+# Pairs handled at a time; a record's candidates are never split
+PAIR_CHUNK = 1 << 22
+
+
+def blocked_pairs(anon_df, public_df, block_on, chunk_size=PAIR_CHUNK):
+    """
+    Yield every (anonymised, public) pair that agrees on the ``block_on``
+    columns, as chunks of two position arrays of about ``chunk_size``
+    pairs, ordered by anonymised record and then register order. Records
+    with a missing blocking value form no pairs.
+    """
+    block_on = list(block_on)
+    both = pd.concat([anon_df[block_on], public_df[block_on]], ignore_index=True)
+    keys, _, missing = combine_codes(both, block_on)
+    keys = np.where(missing, -1, keys)
+    anon_keys, public_keys = keys[:len(anon_df)], keys[len(anon_df):]
+
+    order = np.argsort(public_keys, kind='stable')
+    order = order[public_keys[order] >= 0]
+    sorted_keys = public_keys[order]
+    start = np.searchsorted(sorted_keys, anon_keys, side='left')
+    size = np.where(anon_keys >= 0, np.searchsorted(sorted_keys, anon_keys, side='right') - start, 0)
+
+    ends = np.cumsum(size)
+    first = 0
+    while first < len(anon_df):
+        # Whole records up to ~chunk_size pairs (at least one record)
+        last = max(int(np.searchsorted(ends, ends[first] - size[first] + chunk_size, side='right')),
+                   first + 1)
+        records = np.arange(first, last)
+        n = size[records]
+        offsets = np.concatenate([[0], np.cumsum(n)])
+        anon_pos = np.repeat(records, n)
+        public_pos = order[np.repeat(start[records] - offsets[:-1], n) + np.arange(offsets[-1])]
+        if len(anon_pos):
+            yield anon_pos, public_pos
+        first = last
+
+
+class PairComparer:
+    """
+    Agreement of record pairs on the ``compare`` columns: DISAGREE, AGREE
+    or MISSING (a missing or ``wildcard`` value on either side).
+
+    Each column is factorized over both frames once and compiled to a
+    small value x value agreement table, so comparing a pair is a lookup.
+    ``comparators`` ({column: f(a, b) -> bool}) replace equality, e.g.
+    overlapping noisy age bands; they are called once per pair of distinct
+    values, never per record pair. ``public_columns`` ({column: register
+    column}) names register columns that differ from the anonymised ones,
+    e.g. exact ages in 'age' against the 'age_a' bands.
+    """
+
+    def __init__(self, anon_df, public_df, compare, comparators=None, wildcard=SUPPRESSED,
+                 public_columns=None):
+        comparators = comparators or {}
+        public_columns = public_columns or {}
+        self.compare = list(compare)
+        self.anon_codes, self.public_codes, self.tables = [], [], []
+        for col in self.compare:
+            public = public_df[public_columns.get(col, col)]
+            codes, values = pd.factorize(pd.concat([anon_df[col], public], ignore_index=True))
+            n = len(values)
+            codes = np.where(codes < 0, n, codes)       # last slot: missing
+            self.anon_codes.append(codes[:len(anon_df)])
+            self.public_codes.append(codes[len(anon_df):])
+
+            compare_fn = comparators.get(col, lambda x, y: x == y)
+            table = np.full((n + 1, n + 1), MISSING, dtype=np.int8)
+            table[:n, :n] = [[bool(compare_fn(x, y)) for y in values] for x in values]
+            unknown = [j for j, v in enumerate(values) if v == wildcard]
+            table[unknown, :] = MISSING
+            table[:, unknown] = MISSING
+            self.tables.append(table)
+
+    @property
+    def n_patterns(self):
+        return 3 ** len(self.compare)
+
+    def gamma(self, anon_pos, public_pos):
+        """Agreement of every pair (pairs x columns)."""
+        return np.column_stack([table[a[anon_pos], p[public_pos]] for a, p, table
+                                in zip(self.anon_codes, self.public_codes, self.tables)])
+
+    def patterns(self, anon_pos, public_pos):
+        """Base-3 code of every pair's agreement pattern (first column lowest)."""
+        code = np.zeros(len(anon_pos), dtype=np.int64)
+        for a, p, table in zip(self.anon_codes[::-1], self.public_codes[::-1], self.tables[::-1]):
+            code = code * 3 + table[a[anon_pos], p[public_pos]]
+        return code
+
+
+def _decode(codes, n_cols):
+    """Agreement patterns (patterns x columns) of base-3 codes."""
+    return (np.asarray(codes)[:, None] // 3 ** np.arange(n_cols)) % 3
+
+
+def fellegi_sunter(pattern_counts, n_cols, max_iter=500, tol=1e-6, m_init=0.9, p_init=0.01,
+                   monotone=True):
+    """
+    Fit the Fellegi-Sunter m/u probabilities per column and the match
+    prevalence p by EM on agreement-pattern counts (index: base-3 code).
+    Pairs with the same pattern are interchangeable, so the cost depends
+    on the (at most 3^columns) patterns seen, not on the number of pairs.
+    MISSING comparisons count neither way. ``monotone`` keeps m >= u: an
+    agreement is never evidence against a match, which stops EM from
+    settling on a "match" class that is really some other subpopulation.
+
+    Returns {'m', 'u', 'p', 'iterations', 'converged', 'weight',
+    'match_prob'}, the last two per pattern code: the log2 likelihood
+    ratio and the posterior probability that a pair with that pattern is
+    a match. ``converged`` is False when EM stopped at ``max_iter``.
+    """
+    pattern_counts = np.asarray(pattern_counts, dtype=float)
+    seen = np.flatnonzero(pattern_counts)
+    counts = pattern_counts[seen]
+    patterns = _decode(seen, n_cols)
+    observed = patterns != MISSING
+    agree = patterns == AGREE
+    disagree = patterns == DISAGREE
+    eps = 1e-6
+
+    def log_likelihoods(m, u):
+        return (agree @ np.log(m) + disagree @ np.log1p(-m),
+                agree @ np.log(u) + disagree @ np.log1p(-u))
+
+    # u starts at the agreement rate over all pairs (nearly all are non-matches)
+    u = np.clip((counts @ agree) / np.maximum(counts @ observed, 1), eps, 1 - eps)
+    m = np.clip(np.maximum(u, m_init), eps, 1 - eps)
+    p = float(np.clip(p_init, eps, 1 - eps))
+
+    converged = False
+    for iteration in range(1, max_iter + 1):
+        log_m, log_u = log_likelihoods(m, u)
+        g = 1 / (1 + np.exp(log_u - log_m) * (1 - p) / p)
+
+        w_match, w_non = counts * g, counts * (1 - g)
+        new_m = np.clip((w_match @ agree) / np.maximum(w_match @ observed, eps), eps, 1 - eps)
+        new_u = np.clip((w_non @ agree) / np.maximum(w_non @ observed, eps), eps, 1 - eps)
+        if monotone:
+            new_m = np.maximum(new_m, new_u)
+        new_p = float(np.clip(w_match.sum() / counts.sum(), eps, 1 - eps))
+
+        shift = max(np.abs(new_m - m).max(), np.abs(new_u - u).max(), abs(new_p - p))
+        m, u, p = new_m, new_u, new_p
+        if shift < tol:
+            converged = True
+            break
+
+    log_m, log_u = log_likelihoods(m, u)
+    weight = np.zeros(len(pattern_counts))
+    match_prob = np.zeros(len(pattern_counts))
+    weight[seen] = (log_m - log_u) / np.log(2)
+    match_prob[seen] = 1 / (1 + np.exp(log_u - log_m) * (1 - p) / p)
+    return {'m': m, 'u': u, 'p': p, 'iterations': iteration, 'converged': converged,
+            'weight': weight, 'match_prob': match_prob}
+
+
+def linkage_risk(anon_df, public_df, block_on, compare, comparators=None, name='name',
+                 keep_pairs=False, chunk_size=PAIR_CHUNK, public_columns=None, **em):
+    """
+    Graded re-identification risk of every anonymised record.
+
+    Candidate pairs are the public records in the same block on
+    ``block_on``. A first pass over the pairs counts their agreement
+    patterns on ``compare``, EM learns m/u from those counts, and a second
+    pass scores every pair and folds the scores per record. Pairs are
+    generated chunk by chunk, so only the per-record results stay in
+    memory. EM starts from one true match per record (``p_init``).
+    ``comparators`` and ``public_columns`` go to PairComparer.
+
+    For a record, the match probabilities of its candidates are turned
+    into a distribution over who it is (scaled down when they add up to
+    more than one match), and ``reid_prob`` is the chance the attacker's
+    best guess is right: about 1 for one clear candidate, 1/n for n
+    equally good ones, low when no candidate looks like a match.
+
+    Returns (records, model, pairs): one row per anonymised record
+    (candidates, expected_matches, reid_prob, best_match, best_weight),
+    the fitted m/u and agreement weights per column (p, iterations,
+    converged and pairs in ``model.attrs``) and, with ``keep_pairs``,
+    every scored pair (anon_pos, public_pos, weight, match_prob); otherwise
+    None. Without any candidate pair nothing is fitted: m/u are NaN, p is
+    0 and no record has a candidate.
+    """
+    comparer = PairComparer(anon_df, public_df, compare, comparators, public_columns=public_columns)
+    chunks = lambda: blocked_pairs(anon_df, public_df, block_on, chunk_size)
+
+    pattern_counts = np.zeros(comparer.n_patterns, dtype=np.int64)
+    for anon_pos, public_pos in chunks():
+        pattern_counts += np.bincount(comparer.patterns(anon_pos, public_pos),
+                                      minlength=comparer.n_patterns)
+    n_pairs = int(pattern_counts.sum())
+    if n_pairs:
+        em.setdefault('p_init', len(anon_df) / n_pairs)
+        fit = fellegi_sunter(pattern_counts, len(comparer.compare), **em)
+    else:
+        # EM on no pairs would divide 0 by 0; skip the fit and the scoring pass
+        unknown = np.full(len(comparer.compare), np.nan)
+        fit = {'m': unknown, 'u': unknown, 'p': 0.0, 'iterations': 0, 'converged': True}
+
+    n = len(anon_df)
+    names = public_df[name].to_numpy(dtype=object)
+    candidates = np.zeros(n, dtype=np.int64)
+    expected = np.zeros(n)
+    best_prob = np.zeros(n)
+    best_weight = np.full(n, np.nan)
+    best_name = np.full(n, None, dtype=object)
+    kept = []
+    for anon_pos, public_pos in (chunks() if n_pairs else ()):
+        code = comparer.patterns(anon_pos, public_pos)
+        g, w = fit['match_prob'][code], fit['weight'][code]
+        candidates += np.bincount(anon_pos, minlength=n)
+        expected += np.bincount(anon_pos, weights=g, minlength=n)
+
+        # A record's pairs all sit in one chunk: its best candidate is the
+        # last one after sorting by probability within the record
+        order = np.lexsort((g, anon_pos))
+        last = order[np.flatnonzero(np.diff(np.append(anon_pos[order], -1)) != 0)]
+        rec = anon_pos[last]
+        best_prob[rec], best_weight[rec] = g[last], w[last]
+        best_name[rec] = names[public_pos[last]]
+        if keep_pairs:
+            kept.append(pd.DataFrame({'anon_pos': anon_pos, 'public_pos': public_pos,
+                                      'weight': w, 'match_prob': g}))
+
+    records = pd.DataFrame({
+        'candidates': candidates,
+        'expected_matches': expected,
+        'reid_prob': best_prob / np.maximum(expected, 1),
+        'best_match': best_name,
+        'best_weight': best_weight,
+    }, index=anon_df.index)
+
+    model = pd.DataFrame({'m': fit['m'], 'u': fit['u']}, index=comparer.compare)
+    model['agree_weight'] = np.log2(model['m'] / model['u'])
+    model['disagree_weight'] = np.log2((1 - model['m']) / (1 - model['u']))
+    model.attrs.update(p=fit['p'], iterations=fit['iterations'], converged=fit['converged'],
+                       pairs=n_pairs)
+
+    pairs = None
+    if keep_pairs:
+        columns = ['anon_pos', 'public_pos', 'weight', 'match_prob']
+        pairs = pd.concat(kept, ignore_index=True) if kept else pd.DataFrame(columns=columns)
+    return records, model, pairs
@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# ENCODING
+# =========================================================
+
+def _encode(column, order=None):
+    """
+    Integer codes of a QI column, sorted by value (or by ``order`` for
+    ordered categories), with missing values as the last code. Returns
+    codes, the category values, the position of every code used to
+    measure widths, and whether the column is numeric.
+    """
+    if order is not None:
+        categories = list(order)
+        codes = pd.Categorical(column, categories=categories).codes.astype(np.int64)
+        unknown = (codes < 0) & column.notna().to_numpy()
+        if unknown.any():
+            raise ValueError(f"{column.name}: values outside the given order: "
+                             f"{sorted(map(str, pd.unique(column[unknown])))}")
+        numeric = False
+    else:
+        codes, uniques = pd.factorize(column, sort=True)
+        categories = list(uniques)
+        numeric = pd.api.types.is_numeric_dtype(column)
+
+    n_values = len(categories)
+    codes = np.where(codes < 0, n_values, codes)
+    if numeric:
+        position = np.asarray(categories, dtype=float)
+    else:
+        position = np.arange(n_values, dtype=float)
+    # Missing values sort last but add no width
+    position = np.append(position, position[-1] if n_values else 0.0)
+    return codes, categories, position, numeric
+
+# =========================================================
+# PARTITIONING
+# =========================================================
+
+def partition(df, qis, k=2, sensitive=None, l=1, order=None):
+    """
+    Strict top-down Mondrian partitioning of ``df`` over ``qis``.
+
+    Every round cuts each open partition at the median of its widest QI
+    (normalised by the QI's overall range) for which both halves keep at
+    least ``k`` records and ``l`` distinct ``sensitive`` values; a partition
+    with no such cut is final. All partitions of a round are cut at once:
+    the rows are kept in one presorted order per QI, grouped by partition,
+    so medians and ranges are array lookups and a cut re-partitions each
+    order with a stable linear scatter instead of re-sorting. Final
+    partitions are dropped from the working arrays, so every round only
+    touches the records still being split.
+    ``order`` maps a QI to its ordered categories (e.g. education levels).
+
+    Returns the partition id of every record (0 .. n_partitions-1).
+    """
+    order = order or {}
+    n = len(df)
+    encoded = [_encode(df[qi], order.get(qi)) for qi in qis]
+    positions = [e[2] for e in encoded]
+    spans = [max(p[-1] - p[0], 1e-12) for p in positions]
+
+    check_l = sensitive is not None and l > 1
+    if check_l:
+        s_codes, s_values = pd.factorize(df[sensitive])
+        n_sensitive = len(s_values) + 1      # last code: missing, never counted
+
+    # Per QI: row numbers sorted by code, and the codes/sensitive values in
+    # that order (narrow dtypes: every round streams these arrays)
+    row_type = np.int32 if n < 2 ** 31 else np.int64
+    rows = [np.argsort(e[0], kind='stable').astype(row_type) for e in encoded]
+    values = [e[0].astype(np.min_scalar_type(len(e[1])))[r] for e, r in zip(encoded, rows)]
+    if check_l:
+        s_codes = np.where(s_codes < 0, n_sensitive - 1, s_codes).astype(np.min_scalar_type(n_sensitive))
+        s_sorted = [s_codes[r] for r in rows]
+
+    part = np.zeros(n, dtype=np.int64)
+    n_final = 0
+    seg_len = np.array([n], dtype=np.int64)
+    if not qis or n < 2 * k:
+        return part
+
+    while len(seg_len):
+        n_parts, n_open = len(seg_len), int(seg_len.sum())
+        seg_start = np.cumsum(seg_len) - seg_len
+        last = seg_start + seg_len - 1
+        seg_of = np.repeat(np.arange(n_parts), seg_len)
+
+        best_dim = np.full(n_parts, -1)
+        best_width = np.full(n_parts, -np.inf)
+        rights = []
+        for d in range(len(qis)):
+            v = values[d]
+            low, high = v[seg_start].astype(np.int64), v[last].astype(np.int64)
+            median = v[seg_start + (seg_len - 1) // 2].astype(np.int64)
+            # Left half: <= median, or < median when the median is the maximum
+            cut = np.where(high > median, median, median - 1)
+            right = v > np.repeat(cut, seg_len)
+            n_right = np.add.reduceat(right, seg_start, dtype=np.int64)
+            ok = (high > low) & (n_right >= k) & (seg_len - n_right >= k)
+
+            if check_l:
+                cell = (seg_of * 2 + right) * n_sensitive + s_sorted[d].astype(np.int64)
+                present = np.bincount(cell, minlength=n_parts * 2 * n_sensitive) > 0
+                distinct = present.reshape(n_parts, 2, n_sensitive)[:, :, :-1].sum(axis=2)
+                ok &= (distinct >= l).all(axis=1)
+
+            width = (positions[d][high] - positions[d][low]) / spans[d]
+            better = ok & (width > best_width)
+            best_dim[better] = d
+            best_width[better] = width[better]
+            rights.append(right)
+
+        split = best_dim >= 0
+
+        # Record the partitions that are final and drop them from the work
+        closed = ~split
+        if closed.any():
+            in_closed = np.repeat(closed, seg_len)
+            ids = np.cumsum(closed) - 1 + n_final
+            part[rows[0][in_closed]] = ids[seg_of[in_closed]]
+            n_final += int(closed.sum())
+        if not split.any():
+            break
+
+        # Which side every open row goes to, taken from its partition's cut QI
+        go_right = np.zeros(n, dtype=bool)
+        for d in range(len(qis)):
+            chosen = np.repeat(best_dim == d, seg_len)
+            go_right[rows[d][chosen]] = rights[d][chosen]
+
+        keep = slice(None) if split.all() else np.repeat(split, seg_len)
+        left_len = seg_len - np.add.reduceat(go_right[rows[0]], seg_start, dtype=np.int64)
+        new_len = np.column_stack([left_len, seg_len - left_len])[split].ravel()
+        new_start = np.cumsum(new_len) - new_len
+        left_start = np.repeat(new_start[0::2], seg_len[split])
+        right_start = np.repeat(new_start[1::2], seg_len[split])
+        seg_first = np.repeat(np.cumsum(seg_len[split]) - seg_len[split], seg_len[split])
+        local = np.arange(len(seg_first)) - seg_first
+
+        for d in range(len(qis)):
+            r_d, v_d = rows[d][keep], values[d][keep]
+            r = go_right[r_d]
+            # Stable split of every segment: lefts first, rights after, order kept
+            seen_right = np.cumsum(r)
+            n_r = seen_right - np.where(seg_first > 0, seen_right[seg_first - 1], 0)
+            dest = np.where(r, right_start + n_r - 1, left_start + local - n_r)
+            rows[d] = np.empty_like(r_d)
+            rows[d][dest] = r_d
+            values[d] = np.empty_like(v_d)
+            values[d][dest] = v_d
+            if check_l:
+                s_d = s_sorted[d][keep]
+                s_sorted[d] = np.empty_like(s_d)
+                s_sorted[d][dest] = s_d
+        seg_len = new_len
+
+    return part
+
+# =========================================================
+# GENERALISED RANGES
+# =========================================================
+
+def _number(v):
+    v = float(v)
+    return str(int(v)) if v.is_integer() else f"{v:g}"
+
+
+def generalise(df, qis, part, order=None):
+    """
+    Replace every QI by its partition's range: "lo-hi" for numbers,
+    "first..last" for categories (single values as-is).
+    Missing values take their partition's range so the classes stay
+    intact; a partition with only missing values stays missing.
+    """
+    order = order or {}
+    out = df.copy()
+    n_parts = int(part.max()) + 1 if len(part) else 0
+    for qi in qis:
+        codes, categories, _, numeric = _encode(df[qi], order.get(qi))
+        missing = codes == len(categories)
+        low = np.full(n_parts, np.iinfo(np.int64).max)
+        high = np.full(n_parts, -1)
+        np.minimum.at(low, part[~missing], codes[~missing])
+        np.maximum.at(high, part[~missing], codes[~missing])
+
+        spans, span_of_part = np.unique(np.stack([low, high]), axis=1, return_inverse=True)
+        labels = []
+        for lo, hi in spans.T:
+            if hi < 0:
+                labels.append(np.nan)
+            elif lo == hi:
+                labels.append(categories[lo])
+            elif numeric:
+                labels.append(f"{_number(categories[lo])}-{_number(categories[hi])}")
+            else:
+                labels.append(f"{categories[lo]}..{categories[hi]}")
+        values = np.asarray(labels, dtype=object)
+        out[qi] = values[span_of_part.ravel()[part]]
+    return out
+
+
+def anonymise(df, qis, k=2, sensitive=None, l=1, order=None):
+    """Mondrian partitioning + generalised ranges. Returns (frame, partition ids)."""
+    part = partition(df, qis, k=k, sensitive=sensitive, l=l, order=order)
+    return generalise(df, qis, part, order=order), part
@@ -0,0 +1,281 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import count, repeat
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Below this many records a pool costs more than it saves
+PARALLEL_MIN_ROWS = 1 << 20
+
+# =========================================================
+# POOL AND SHARED ARRAYS
+# =========================================================
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def executor(n_workers):
+    """
+    Forked processes where the platform has them. On Windows (spawn only)
+    the scripts would be re-run by every child, so threads are used
+    instead: numpy's sort and searchsorted release the GIL.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(n_workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(n_workers)
+
+
+class SharedArray:
+    """A numpy array in a named shared-memory block, owned by the creating process."""
+
+    def __init__(self, shape, dtype):
+        self.shape, self.dtype = tuple(shape), np.dtype(dtype)
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.array = np.ndarray(self.shape, self.dtype, buffer=self.shm.buf)
+
+    @classmethod
+    def copy_of(cls, values):
+        shared = cls(values.shape, values.dtype)
+        shared.array[...] = values
+        return shared
+
+    @property
+    def spec(self):
+        return self.shm.name, self.shape, self.dtype.str
+
+    def release(self):
+        """Copy the data out, then free the block."""
+        out = self.array.copy()
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+        return out
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if hasattr(self, 'array'):
+            self.release()
+
+
+def attach(spec):
+    """The (SharedMemory, array) of a ``SharedArray.spec``; close the block when done."""
+    # Forked children share the parent's resource tracker, so attaching
+    # does not hand the block over to them
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+
+
+class WorkerPool:
+    """
+    One pool for every parallel step over the same data. ``context`` (a
+    DataFrame, say) is registered before any worker starts: forked workers
+    inherit it and threads share it, so tasks name it by ``token`` instead
+    of pickling it. Workers start on the first ``map``.
+    """
+
+    def __init__(self, n_workers, context=None):
+        self.n_workers = n_workers
+        self.token = next(_tokens)
+        _contexts[self.token] = context
+        self._executor = None
+
+    @property
+    def context(self):
+        return _contexts[self.token]
+
+    def map(self, fn, *iterables):
+        if self._executor is None:
+            self._executor = executor(self.n_workers)
+        return list(self._executor.map(fn, *iterables))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        _contexts.pop(self.token, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Contexts of the open pools, by token (read by the workers)
+_contexts = {}
+_tokens = count()
+
+
+def _slices(n, n_workers):
+    bounds = np.linspace(0, n, n_workers + 1).astype(np.int64)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+# =========================================================
+# WORKERS (one slice of rows each)
+# =========================================================
+
+def _factorize_slice(token, columns, local_spec, start, stop):
+    df = _contexts[token]
+    shm, local = attach(local_spec)
+    try:
+        uniques = []
+        for i, col in enumerate(columns):
+            codes, values = pd.factorize(df[col].iloc[start:stop], sort=True)
+            local[i, start:stop] = codes
+            uniques.append(values)
+        return uniques
+    finally:
+        del local
+        shm.close()
+
+
+def _combine_slice(local_spec, out_spec, remaps, sizes, dropna, start, stop):
+    blocks = [attach(spec) for spec in (local_spec, out_spec)]
+    (_, local), (_, out) = blocks
+    try:
+        combined = np.zeros(stop - start, dtype=np.int64)
+        missing = np.zeros(stop - start, dtype=bool)
+        for i, (remap, size) in enumerate(zip(remaps, sizes)):
+            codes = local[i, start:stop]
+            na = codes < 0
+            missing |= na
+            combined = combined * size + np.where(na, size - 1, remap[np.maximum(codes, 0)])
+        out[start:stop] = np.where(missing, -1, combined) if dropna else combined
+    finally:
+        del local, out
+        for shm, _ in blocks:
+            shm.close()
+
+
+def _bincount_slice(codes_spec, hist_spec, row, start, stop):
+    blocks = [attach(spec) for spec in (codes_spec, hist_spec)]
+    (_, codes), (_, hist) = blocks
+    try:
+        c = codes[start:stop]
+        hist[row] = np.bincount(c[c >= 0], minlength=hist.shape[1])
+    finally:
+        del codes, hist, c
+        for shm, _ in blocks:
+            shm.close()
+
+
+def _count_slice(codes_spec, start, stop):
+    shm, codes = attach(codes_spec)
+    try:
+        c = codes[start:stop]
+        return np.unique(c[c >= 0], return_counts=True)
+    finally:
+        del codes, c
+        shm.close()
+
+
+def _locate_slice(codes_spec, uniques_spec, start, stop):
+    blocks = [attach(spec) for spec in (codes_spec, uniques_spec)]
+    (_, codes), (_, uniques) = blocks
+    try:
+        c = codes[start:stop]
+        codes[start:stop] = np.where(c >= 0, np.searchsorted(uniques, c), -1)
+    finally:
+        del codes, uniques, c
+        for shm, _ in blocks:
+            shm.close()
+
+
+def _gather_slice(codes_spec, table_spec, fill, start, stop):
+    blocks = [attach(spec) for spec in (codes_spec, table_spec)]
+    (_, codes), (_, table) = blocks
+    try:
+        c = codes[start:stop]
+        codes[start:stop] = np.where(c >= 0, table[np.maximum(c, 0)], fill)
+    finally:
+        del codes, table, c
+        for shm, _ in blocks:
+            shm.close()
+
+# =========================================================
+# PARALLEL PRIMITIVES
+# =========================================================
+
+def factorize_combined(pool, columns, dropna=False, max_radix=2 ** 62):
+    """
+    The combined QI code of every record of ``pool.context``, like
+    ``sdc.eqclass.combine_codes`` but factorized slice by slice over the
+    pool: every worker factorizes its rows of each column, the sorted
+    slice uniques are merged into one sorted domain per column, and the
+    workers then fold their remapped codes into one int64 per record
+    (-1 for records with a missing QI when ``dropna``).
+
+    Returns the shared codes, which the caller releases, and the radix. None when the radix would reach
+    ``max_radix`` (renumbering needs the serial path).
+    """
+    df = pool.context
+    n = len(df)
+    slices = _slices(n, pool.n_workers)
+    starts, stops = [a for a, _ in slices], [b for _, b in slices]
+
+    with SharedArray((len(columns), n), np.int32) as local:
+        parts = pool.map(_factorize_slice, repeat(pool.token), repeat(columns), repeat(local.spec),
+                         starts, stops)
+
+        # One sorted domain per column; each slice maps into it
+        remaps = [[] for _ in slices]
+        sizes = []
+        for i in range(len(columns)):
+            pieces = [pd.Series(part[i]) for part in parts]
+            codes, uniques = pd.factorize(pd.concat(pieces, ignore_index=True), sort=True)
+            bounds = np.cumsum([0] + [len(p) for p in pieces])
+            for s, (a, b) in enumerate(zip(bounds[:-1], bounds[1:])):
+                remaps[s].append(codes[a:b] if b > a else np.zeros(1, dtype=np.int64))
+            sizes.append(len(uniques) + 1)     # last slot: missing
+        radix = int(np.prod(sizes, dtype=object))
+        if radix >= max_radix:
+            return None
+
+        out = SharedArray((n,), np.int64)
+        try:
+            pool.map(_combine_slice, repeat(local.spec), repeat(out.spec), remaps, repeat(sizes),
+                     repeat(dropna), starts, stops)
+        except BaseException:
+            out.release()
+            raise
+    return out, radix
+
+
+def count_classes(pool, shared_codes, radix, dense_limit):
+    """
+    Class sizes of the codes in ``shared_codes`` (negative: no class),
+    which are replaced in place by class positions in code order.
+    Every worker bincounts its slice into a radix-sized histogram and the
+    histograms are summed, as long as they fit in ``dense_limit`` cells
+    together (one serial bincount's worth); beyond that the slices are
+    sorted (``np.unique``) and the classes located by ``searchsorted``.
+    """
+    slices = _slices(len(shared_codes.array), pool.n_workers)
+    starts, stops = [a for a, _ in slices], [b for _, b in slices]
+
+    if radix <= dense_limit // len(slices):
+        with SharedArray((len(slices), radix), np.int32) as hist:
+            pool.map(_bincount_slice, repeat(shared_codes.spec), repeat(hist.spec), range(len(slices)),
+                     starts, stops)
+            counts = hist.array.sum(axis=0, dtype=np.int64)
+        present = counts > 0
+        with SharedArray.copy_of(np.cumsum(present) - 1) as rank:
+            pool.map(_gather_slice, repeat(shared_codes.spec), repeat(rank.spec), repeat(-1),
+                     starts, stops)
+        return counts[present]
+
+    partial = pool.map(_count_slice, repeat(shared_codes.spec), starts, stops)
+    uniques, where = np.unique(np.concatenate([u for u, _ in partial]), return_inverse=True)
+    counts = np.bincount(where, weights=np.concatenate([c for _, c in partial]),
+                         minlength=len(uniques)).astype(np.int64)
+    with SharedArray.copy_of(uniques) as shared_u:
+        pool.map(_locate_slice, repeat(shared_codes.spec), repeat(shared_u.spec), starts, stops)
+    return counts
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+from sdc.eqclass import EquivalenceClasses
+
+# =========================================================
+# TRANSITION MATRICES
+# =========================================================
+
+def flip_matrix(n_categories, p):
+    """Keep a value with probability 1-p, otherwise move uniformly to another category."""
+    if n_categories < 2:
+        return np.ones((n_categories, n_categories))
+    m = np.full((n_categories, n_categories), p / (n_categories - 1))
+    np.fill_diagonal(m, 1.0 - p)
+    return m
+
+
+def adjacent_matrix(n_categories, p):
+    """
+    Ordered-adjacent PRAM: a value moves to a neighbouring category with
+    probability p (split evenly between both neighbours for inner categories).
+    """
+    m = np.eye(n_categories)
+    for i in range(n_categories):
+        neighbours = [j for j in (i - 1, i + 1) if 0 <= j < n_categories]
+        if not neighbours:
+            continue
+        m[i, i] = 1.0 - p
+        for j in neighbours:
+            m[i, j] = p / len(neighbours)
+    return m
+
+# =========================================================
+# APPLY PRAM
+# =========================================================
+
+def apply_pram(series, categories, matrix, rng):
+    """
+    Apply a PRAM transition matrix to a categorical column.
+
+    matrix[i, j] is the probability that categories[i] is released as
+    categories[j]. One uniform is drawn per non-missing value (values
+    outside ``categories`` keep theirs but still consume a draw) and the new
+    category is read from the cumulative row probabilities, with the
+    "change" outcomes first in category order and "keep" last.
+
+    Returns the perturbed column (object dtype, missing values kept) and
+    the realised transition counts (rows: from, columns: to).
+    """
+    categories = list(categories)
+    n = len(categories)
+    matrix = np.asarray(matrix, dtype=float)
+    if matrix.shape != (n, n):
+        raise ValueError(f"Transition matrix must be {n}x{n}, got {matrix.shape}")
+    if not np.allclose(matrix.sum(axis=1), 1.0) or (matrix < 0).any():
+        raise ValueError("Transition matrix rows must be probabilities summing to 1")
+
+    s = series.astype(object)
+    values = s.to_numpy(dtype=object, copy=True)
+    present = np.flatnonzero(pd.notna(values))
+    u = rng.random(len(present))
+
+    src = pd.Index(categories).get_indexer(values[present])
+    in_domain = src >= 0
+    present, u, src = present[in_domain], u[in_domain], src[in_domain]
+
+    # Lookup order per source category: the other categories, then itself
+    order = np.array([[j for j in range(n) if j != i] + [i] for i in range(n)], dtype=np.intp)
+    cum = np.cumsum(np.take_along_axis(matrix, order, axis=1), axis=1)
+    pick = np.minimum((u[:, None] >= cum[src]).sum(axis=1), n - 1)
+    dst = order[src, pick]
+
+    values[present] = np.asarray(categories, dtype=object)[dst]
+    counts = np.bincount(src * n + dst, minlength=n * n).reshape(n, n)
+    transitions = pd.DataFrame(counts, index=pd.Index(categories, name='from'),
+                               columns=pd.Index(categories, name='to'))
+    return pd.Series(values, index=s.index, name=s.name, dtype=object), transitions
+
+
+def n_changed(transitions):
+    """Number of values PRAM released under a different category."""
+    counts = transitions.to_numpy()
+    return int(counts.sum() - np.trace(counts))
+
+# =========================================================
+# LOCALISED SENSITIVE FLIPS
+# =========================================================
+
+def dominance_flip(df, qis, rng, sensitive='party', opposite=None, dominance_threshold=0.80,
+                   flip_frac_low=0.20, flip_frac_high=0.40, cap=0.40):
+    """
+    Localised PRAM on the sensitive attribute: in every class whose
+    dominant value (one of ``opposite``) reaches ``dominance_threshold``,
+    flip a random fraction in [flip_frac_low, flip_frac_high) of the
+    records to the opposite value, without pushing the minority share past
+    ``cap`` (at least one flip while the cap allows it).
+
+    Returns the flipped copy and counts of eligible, processed and capped
+    classes and flipped records.
+    """
+    opposite = opposite or {'Green': 'Red', 'Red': 'Green'}
+    df = df.copy()
+    classes = EquivalenceClasses(df, qis, sensitive=sensitive)
+
+    # Dominant per group
+    dominant = classes.keys.assign(
+        party=classes.dominant_value,
+        party_count=classes.dominant_count,
+        k=classes.k,
+        party_ratio=classes.dominant_ratio,
+    )
+
+    is_eligible = (
+        (dominant['party_ratio'] >= dominance_threshold) &
+        (dominant['party'].isin(opposite.keys()))
+    ).to_numpy()
+    eligible = dominant[is_eligible].reset_index(drop=True)
+    eligible_groups = np.flatnonzero(is_eligible)
+
+    # --- Correct minority (opposite) count per eligible group ---
+    eligible = eligible.assign(opp_party=eligible['party'].map(opposite))
+
+    party_col = {p: i for i, p in enumerate(classes.sensitive_values)}
+    opp_col = np.array([party_col.get(p, -1) for p in eligible['opp_party']], dtype=np.int64)
+    opp_count = classes.sensitive_counts[eligible_groups, np.maximum(opp_col, 0)]
+    eligible['opp_count'] = np.where(opp_col >= 0, opp_count, 0)
+
+    # Row positions of the dominant party in every eligible group, in frame
+    # order (one stable sort by group code instead of a mask per group)
+    codes = classes.codes
+    # index -1 (rows dropped for a missing QI) lands on the padding entry
+    group_ok = np.zeros(classes.n_classes + 1, dtype=bool)
+    group_ok[eligible_groups] = True
+    dom_value = np.append(classes.dominant_value, None)
+    party_values = df[sensitive].to_numpy(dtype=object)
+    dom_rows = np.flatnonzero(group_ok[codes] & (party_values == dom_value[codes]))
+    dom_rows = dom_rows[np.argsort(codes[dom_rows], kind='stable')]
+    start = np.searchsorted(codes[dom_rows], eligible_groups, side='left')
+    stop = np.searchsorted(codes[dom_rows], eligible_groups, side='right')
+
+    stats = {'eligible': len(eligible), 'processed': 0, 'capped': 0, 'flipped': 0}
+    flip_rows, flip_values = [], []
+
+    for i, row in enumerate(eligible.itertuples(index=False)):
+        idx_dom = dom_rows[start[i]:stop[i]]
+        k = int(row.k)
+        n_dom = len(idx_dom)
+        if k == 0 or n_dom == 0:
+            continue
+
+        minority_share_before = int(row.opp_count) / k
+        if minority_share_before >= cap:
+            continue  # already at/above cap
+
+        # Draw desired fraction, then cap to avoid exceeding the minority cap
+        desired_flip_frac = float(rng.uniform(flip_frac_low, flip_frac_high))
+        max_flip_frac_allowed = max(0.0, cap - minority_share_before)
+        actual_flip_frac = min(desired_flip_frac, max_flip_frac_allowed)
+
+        x_draw = int(np.floor(k * actual_flip_frac))                # rows from the capped draw
+        x_cap = min(int(np.floor(k * max_flip_frac_allowed)), n_dom)  # absolute cap in rows
+
+        # At least 1 flip if the cap allows, even when floor(...) is 0 (small k)
+        n_to_flip = 1 if x_draw == 0 and x_cap >= 1 else min(x_draw, x_cap)
+        if n_to_flip <= 0:
+            continue
+
+        # Same draw as choosing from the index labels: only len(idx_dom) matters
+        chosen = rng.choice(idx_dom, size=n_to_flip, replace=False)
+        flip_rows.append(chosen)
+        flip_values.append(np.full(n_to_flip, opposite[row.party], dtype=object))
+
+        stats['flipped'] += n_to_flip
+        stats['processed'] += 1
+        if actual_flip_frac < desired_flip_frac:
+            stats['capped'] += 1
+
+    # Groups are disjoint, so all flips can be applied in one assignment
+    if flip_rows:
+        df.iloc[np.concatenate(flip_rows), df.columns.get_loc(sensitive)] = np.concatenate(flip_values)
+    return df, stats
@@ -0,0 +1,207 @@
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sdc.eqclass import EquivalenceClasses, class_key, class_sort_key
+from sdc.suppression import blank_cells, plan_from_counts
+
+# =========================================================
+# CHUNKED READING
+# =========================================================
+
+def _excel_chunks(path, chunksize, sheet_name=0):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        sheet.reset_dimensions()  # stored dimensions are often wrong; read to the end
+        rows = (row for row in sheet.iter_rows(values_only=True) if any(v is not None for v in row))
+        header = next(rows, None)
+        if header is None:
+            return
+        start = 0
+        for batch in iter(lambda: list(islice(rows, chunksize)), []):
+            yield pd.DataFrame(batch, columns=header, index=pd.RangeIndex(start, start + len(batch)))
+            start += len(batch)
+        if start == 0:
+            # Header only: one empty chunk, like pd.read_csv
+            yield pd.DataFrame(columns=header)
+    finally:
+        workbook.close()
+
+
+def read_chunks(path, chunksize=100_000, **kwargs):
+    """
+    Iterate over an .xlsx (openpyxl read-only mode) or .csv file in frames
+    of ``chunksize`` rows, without ever holding the whole file.
+    Excel cells come as stored: unlike ``pd.read_excel`` no numeric
+    inference is done on text cells, so every chunk types a column the
+    same way. Other keyword arguments go to ``pd.read_csv`` (``sheet_name`` for Excel).
+    """
+    path = Path(path)
+    if path.suffix.lower() in ('.xlsx', '.xlsm'):
+        yield from _excel_chunks(path, chunksize, kwargs.get('sheet_name', 0))
+    else:
+        with pd.read_csv(path, chunksize=chunksize, **kwargs) as reader:
+            yield from reader
+
+# =========================================================
+# MERGEABLE CLASS COUNTS
+# =========================================================
+
+class ClassCounter:
+    """
+    Equivalence-class counts accumulated chunk by chunk.
+
+    Memory grows with the number of classes, not records. Missing QI
+    values form their own classes (``groupby(dropna=False)``); missing
+    sensitive values are not counted towards l (``nunique()``). Counters of
+    different chunks or files combine with :meth:`merge`.
+
+    k                 -- class key -> number of records
+    sensitive_counts  -- class key -> {sensitive value: records}
+    """
+
+    def __init__(self, qis, sensitive=None):
+        self.qis = list(qis)
+        self.sensitive = sensitive
+        self.n_records = 0
+        self.k = {}
+        self.sensitive_counts = {}
+
+    def update(self, chunk):
+        """Add the records of ``chunk``; returns its EquivalenceClasses and class keys."""
+        classes = EquivalenceClasses(chunk, self.qis, sensitive=self.sensitive, dropna=False)
+        keys = [class_key(key) for key in classes.keys.itertuples(index=False, name=None)]
+        for key, n in zip(keys, classes.k.tolist()):
+            self.k[key] = self.k.get(key, 0) + n
+        if self.sensitive is not None:
+            values = classes.sensitive_values
+            for key, row in zip(keys, classes.sensitive_counts):
+                counts = self.sensitive_counts.setdefault(key, {})
+                for j in np.flatnonzero(row):
+                    counts[values[j]] = counts.get(values[j], 0) + int(row[j])
+        self.n_records += len(chunk)
+        return classes, keys
+
+    def merge(self, other):
+        """Add the counts of another counter over the same QIs."""
+        if other.qis != self.qis or other.sensitive != self.sensitive:
+            raise ValueError("Counters over different attributes cannot be merged.")
+        for key, n in other.k.items():
+            self.k[key] = self.k.get(key, 0) + n
+        for key, counts in other.sensitive_counts.items():
+            mine = self.sensitive_counts.setdefault(key, {})
+            for value, n in counts.items():
+                mine[value] = mine.get(value, 0) + n
+        self.n_records += other.n_records
+        return self
+
+    @property
+    def n_classes(self):
+        return len(self.k)
+
+    def class_table(self, k_name='k', l_name=None, ratio_name=None):
+        """One row per class in groupby order: QI values, size, optionally l and dominant ratio."""
+        keys = sorted(self.k, key=class_sort_key)
+        table = pd.DataFrame(keys, columns=self.qis)
+        if k_name is not None:
+            table[k_name] = [self.k[key] for key in keys]
+        if l_name is not None:
+            table[l_name] = [len(self.sensitive_counts.get(key, {})) for key in keys]
+        if ratio_name is not None:
+            table[ratio_name] = [max((self.sensitive_counts.get(key) or {None: 0}).values()) / self.k[key]
+                                 for key in keys]
+        return table
+
+    def sensitive_table(self, count_name='count', k_name='k', ratio_name='ratio'):
+        """
+        One row per (class, sensitive value) present, in groupby order, like
+        ``EquivalenceClasses.sensitive_table``.
+        """
+        rows = []
+        for key in sorted(self.k, key=class_sort_key):
+            counts = self.sensitive_counts.get(key, {})
+            for value in sorted(counts, key=lambda v: class_sort_key((v,))):
+                rows.append(key + (value, counts[value], self.k[key]))
+        table = pd.DataFrame(rows, columns=self.qis + [self.sensitive, count_name, k_name])
+        table[ratio_name] = table[count_name] / table[k_name]
+        return table
+
+    def summary(self, k=None):
+        """Minimum k, unique records, records below ``k``, and min l / max dominance if counted."""
+        sizes = np.fromiter(self.k.values(), dtype=np.int64, count=len(self.k))
+        out = {
+            'records': self.n_records,
+            'classes': self.n_classes,
+            'min k': int(sizes.min()) if len(sizes) else 0,
+            'unique records': int(sizes[sizes == 1].sum()),
+        }
+        if k is not None:
+            out[f'records k<{k}'] = int(sizes[sizes < k].sum())
+        if self.sensitive is not None:
+            table = self.class_table(k_name=None, l_name='l', ratio_name='ratio')
+            out['min l'] = int(table['l'].min()) if len(table) else 0
+            out['max dominance'] = float(table['ratio'].max()) if len(table) else 0.0
+        return out
+
+# =========================================================
+# TWO-PASS ANONYMISATION
+# =========================================================
+
+def stream_anonymise(read, transform, qis, output_path, k=None, suppress=None,
+                     sensitive=None, post=None, unfixable='keep'):
+    """
+    Anonymise a file chunk by chunk in two passes.
+
+    ``read`` returns a fresh chunk iterator (e.g. ``lambda: read_chunks(path)``)
+    and ``transform`` is the row-local recoding applied to every chunk, so
+    it must give the same result in both passes.
+    Pass 1 only counts the classes of the transformed chunks. With ``k``
+    and ``suppress`` (attributes that may be blanked, cheapest first) a
+    local-suppression plan is made from those global counts; classes that
+    blanking cannot lift to k are handled as ``unfixable`` says
+    (sdc.suppression.plan_from_counts). Pass 2
+    transforms each chunk again, applies the plan, then
+    ``post(chunk, before)`` (e.g. PRAM or filling invalid values; ``before``
+    is the pass-1 ClassCounter, for decisions that need the global
+    classes), counts the result and appends it to ``output_path`` as CSV.
+    ``output_path`` is always written, empty when the input has no rows.
+
+    Returns the counters before and after and the cells suppressed per
+    attribute (sdc.suppression.blank_cells).
+    """
+    qis = list(qis)
+    suppress = list(suppress or [])
+
+    before = ClassCounter(qis, sensitive)
+    for chunk in read():
+        before.update(transform(chunk))
+
+    plan = {}
+    if k is not None and suppress:
+        plan, _ = plan_from_counts(before.k, k, [qis.index(a) for a in suppress], unfixable)
+
+    after = ClassCounter(qis, sensitive)
+    cells = dict.fromkeys(suppress, 0)
+    first = True
+    for chunk in read():
+        out = transform(chunk)
+        if plan:
+            classes = EquivalenceClasses(out, qis, dropna=False)
+            keys = [class_key(key) for key in classes.keys.itertuples(index=False, name=None)]
+            out, blanked = blank_cells(out, classes, [plan.get(key, key) for key in keys], suppress)
+            for a, n in blanked.items():
+                cells[a] = cells.get(a, 0) + n
+        if post is not None:
+            out = post(out, before)
+        after.update(out)
+        out.to_csv(output_path, mode='w' if first else 'a', header=first, index=False)
+        first = False
+    if first:
+        # No chunk at all (not even a header): still leave the output file
+        open(output_path, 'w').close()
+    return before, after, cells
@@ -0,0 +1,157 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from sdc.eqclass import EquivalenceClasses, class_key, class_sort_key
+
+# =========================================================
+# LOCAL SUPPRESSION
+# =========================================================
+
+def plan_from_counts(counts, k, positions, unfixable='keep'):
+    """
+    Greedy suppression plan on a class count table.
+
+    ``counts`` maps class keys (tuples, missing values as None) to class
+    sizes and ``positions`` lists the key positions that may be blanked,
+    in priority order. Blanked values form their own class
+    (``groupby(dropna=False)``), so blanking position ``p`` of a class
+    moves all its records into the class with ``p`` missing. Small
+    classes are handled largest first; each one blanks the position whose
+    target class is largest, preferring targets that already make it to
+    k. Targets still below k go back on the queue and may be blanked
+    further. Class counts are updated as classes merge, so the records are
+    never regrouped.
+
+    A blank only joins classes that already hold it, so some classes (a
+    lone record, say) can never reach k this way. ``unfixable`` decides
+    what happens to them:
+      'keep'   -- leave their original values (default)
+      'blank'  -- blank every position in ``positions``; the blanked
+                  classes pool together but may still be below k
+      'remove' -- suppress the whole records (final key None)
+
+    Returns the final key of every class that changes, and the number of
+    classes that were below k.
+    """
+    if unfixable not in ('remove', 'blank', 'keep'):
+        raise ValueError(f"unfixable must be 'remove', 'blank' or 'keep', got {unfixable!r}")
+    counts = dict(counts)
+    members = {key: [key] for key in counts}
+
+    queue = [(-n, class_sort_key(key), key) for key, n in counts.items() if n < k]
+    n_small = len(queue)
+    heapq.heapify(queue)
+
+    while queue:
+        size, _, key = heapq.heappop(queue)
+        if -size != counts.get(key, 0) or counts[key] >= k:
+            continue  # stale entry: the class grew or was merged away
+
+        best = None
+        for priority, pos in enumerate(positions):
+            if key[pos] is None:
+                continue
+            target = key[:pos] + (None,) + key[pos + 1:]
+            merged = counts.get(target, 0) + counts[key]
+            score = (merged >= k, merged, -priority)
+            if best is None or score > best[0]:
+                best = (score, target)
+        if best is None:
+            continue  # nothing left to blank in this class
+
+        target = best[1]
+        counts[target] = counts.get(target, 0) + counts.pop(key)
+        members.setdefault(target, []).extend(members.pop(key))
+        if counts[target] < k:
+            heapq.heappush(queue, (-counts[target], class_sort_key(target), target))
+
+    plan = {}
+    for key, originals in members.items():
+        if counts[key] >= k:
+            plan.update((orig, key) for orig in originals if orig != key)
+        elif unfixable == 'remove':
+            plan.update((orig, None) for orig in originals)
+        elif unfixable == 'blank':
+            target = tuple(None if pos in positions else v for pos, v in enumerate(key))
+            plan.update((orig, target) for orig in originals if orig != target)
+        # 'keep': the blanks gained nothing, so the class keeps its values
+    return plan, n_small
+
+
+def plan_suppression(df, qis, k, attributes=None, unfixable='keep'):
+    """
+    :func:`plan_from_counts` on the equivalence classes of ``df``.
+
+    Returns the EquivalenceClasses of the input, the final key of every
+    input class (None: records removed) and the number of classes that
+    were below k.
+    """
+    qis = list(qis)
+    attributes = qis if attributes is None else list(attributes)
+
+    classes = EquivalenceClasses(df, qis, dropna=False)
+    keys = [class_key(key) for key in classes.keys.itertuples(index=False, name=None)]
+    plan, n_small = plan_from_counts(zip(keys, classes.k.tolist()), k,
+                                     [qis.index(a) for a in attributes], unfixable)
+    return classes, [plan.get(key, key) for key in keys], n_small
+
+
+def blank_cells(df, classes, final, attributes):
+    """
+    Blank, in a copy of ``df``, the attributes whose value is None in the
+    final key of the record's class, and drop the records whose final key
+    is None. Returns the copy and the cells suppressed per attribute: the
+    blanked ones plus the non-missing cells of removed records, which also
+    lists the other QIs once a record is removed.
+    """
+    qis = classes.qis
+    out = df.copy()
+    before = classes.keys.notna().to_numpy()
+    removed = np.array([key is None for key in final], dtype=bool)
+    after = np.array([[True] * len(qis) if key is None else [v is not None for v in key] for key in final],
+                     dtype=bool).reshape(before.shape)
+    cells = {}
+    for a in attributes:
+        j = qis.index(a)
+        blank_class = before[:, j] & ~after[:, j]
+        rows = np.flatnonzero(blank_class[classes.codes])
+        if len(rows):
+            out.iloc[rows, out.columns.get_loc(a)] = np.nan
+        cells[a] = len(rows)
+    if removed.any():
+        gone = removed[classes.codes]
+        for j, a in enumerate(qis):
+            lost = int((gone & before[classes.codes, j]).sum())
+            cells[a] = cells.get(a, 0) + lost
+        out = out[~gone]
+    return out, cells
+
+
+def local_suppression(df, qis, k, attributes=None, unfixable='keep'):
+    """
+    Blank the cells chosen by :func:`plan_suppression`; classes blanking
+    cannot lift to k are handled as ``unfixable`` says (see
+    :func:`plan_from_counts`).
+
+    Returns the suppressed copy of ``df`` and a report: cells suppressed
+    per attribute (see :func:`blank_cells`), total cells, classes below k
+    before, records removed, and records still in a class below k (only
+    with 'blank' or 'keep').
+    """
+    qis = list(qis)
+    attributes = qis if attributes is None else list(attributes)
+    classes, final, n_small = plan_suppression(df, qis, k, attributes, unfixable)
+    out, cells = blank_cells(df, classes, final, attributes)
+
+    removed = np.array([key is None for key in final], dtype=bool)
+    final_counts = pd.Series(classes.k).groupby(pd.Series(final, dtype=object)).transform('sum').to_numpy()
+    report = {
+        'cells': cells,
+        'total_cells': sum(cells.values()),
+        'small_classes': n_small,
+        'records_removed': int(classes.k[removed].sum()),
+        'records_below_k': int(classes.k[~removed & (final_counts < k)].sum()),
+    }
+    return out, report
@@ -0,0 +1,109 @@
+from itertools import product, repeat
+
+import numpy as np
+import pandas as pd
+
+from sdc.parallel import SharedArray, attach, default_workers, executor
+
+# =========================================================
+# READ-ONLY FRAME IN SHARED MEMORY
+# =========================================================
+
+class SharedFrame:
+    """
+    A DataFrame held in shared-memory blocks so pool workers can rebuild
+    it without pickling the data: numbers and dates as-is, everything else
+    as int32 codes plus the (small) list of distinct values.
+    """
+
+    def __init__(self, df):
+        self.blocks, self.columns = [], []
+        for name in df.columns:
+            column = df[name]
+            dtype = column.dtype
+            if isinstance(dtype, np.dtype) and dtype.kind in 'biufmM':
+                block = SharedArray.copy_of(column.to_numpy())
+                self.columns.append((name, block.spec, None, None))
+            else:
+                codes, uniques = pd.factorize(column)
+                block = SharedArray.copy_of(codes.astype(np.int32))
+                self.columns.append((name, block.spec, list(uniques), str(dtype)))
+            self.blocks.append(block)
+        self.index = df.index
+
+    @property
+    def spec(self):
+        return self.columns, self.index
+
+    def release(self):
+        for block in self.blocks:
+            block.release()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def attach_frame(spec):
+    """
+    Rebuild a SharedFrame in a worker. Numeric columns are read-only views
+    of the shared blocks, so copy the frame before changing it in place.
+    Returns the frame and the attached blocks (close them when done).
+    """
+    columns, index = spec
+    data, blocks = {}, []
+    for name, block_spec, categories, dtype in columns:
+        shm, values = attach(block_spec)
+        values.flags.writeable = False
+        blocks.append(shm)
+        if categories is None:
+            data[name] = values
+        else:
+            data[name] = pd.Categorical.from_codes(values, categories=pd.Index(categories, dtype=object)).astype(dtype)
+    return pd.DataFrame(data, index=index, copy=False), blocks
+
+# =========================================================
+# SWEEP
+# =========================================================
+
+def parameter_grid(grid):
+    """Every combination of a {parameter: [values]} grid, as a list of dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[n] for n in names))]
+
+
+def _run_point(frame_spec, pipeline, params):
+    df, blocks = attach_frame(frame_spec)
+    try:
+        return pipeline(df, **params)
+    except Exception as exc:  # one bad point must not stop the sweep
+        return {'error': f"{type(exc).__name__}: {exc}"}
+    finally:
+        del df
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # a result still views the block; freed at worker exit
+
+
+def sweep(df, pipeline, grid, n_workers=None):
+    """
+    Run ``pipeline(df, **params)`` for every point of ``grid`` (a
+    {parameter: [values]} dict or a list of parameter dicts) over a
+    process pool. ``df`` is placed in shared memory once and every worker
+    reads it from there; ``pipeline`` returns a flat dict of metrics.
+
+    Returns a tidy table: one row per point, the parameters then the
+    metrics (an 'error' column when a point failed).
+    """
+    points = parameter_grid(grid) if isinstance(grid, dict) else list(grid)
+    if not points:
+        return pd.DataFrame()
+    n_workers = min(n_workers or default_workers(), len(points))
+    with SharedFrame(df) as shared, executor(n_workers) as pool:
+        results = list(pool.map(_run_point, repeat(shared.spec), repeat(pipeline), points))
+    return pd.DataFrame([{**params, **result} for params, result in zip(points, results)])
@@ -0,0 +1,387 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from sdc.eqclass import EquivalenceClasses
+
+# p-values need SciPy; chi² and Cramér's V do not
+try:
+    from scipy.special import chdtrc
+except ImportError:
+    chdtrc = None
+
+# =========================================================
+# CHI² AND CRAMÉR'S V OVER MANY ATTRIBUTE PAIRS
+# =========================================================
+
+class Associations:
+    """
+    χ² test of independence and Cramér's V for many attribute pairs at once.
+
+    Every column is factorized once (levels sorted like ``pd.crosstab``).
+    Each contingency table is one ``np.bincount`` over the combined codes
+    of its pair, written into its own block of one flat array, and the
+    statistics are computed for all cells of all tables together. Records
+    missing either value of a pair are left out of that pair only, and
+    levels never observed in a pair are not part of its table, so the
+    results match ``chi2_contingency(pd.crosstab(...))`` per pair,
+    including Yates' correction on 1-dof tables (``correction``).
+
+    results -- one row per pair: var1, var2, n, rows, cols, chi2, dof,
+               p_value (NaN without SciPy), cramers_v
+    """
+
+    def __init__(self, df, pairs=None, correction=True):
+        if pairs is None:
+            pairs = list(combinations(df.columns, 2))
+        self.pairs = [(a, b) for a, b in pairs]
+
+        self.levels, codes = {}, {}
+        for col in dict.fromkeys(c for pair in self.pairs for c in pair):
+            try:
+                codes[col], self.levels[col] = pd.factorize(df[col], sort=True)
+            except TypeError:  # mixed types cannot be sorted
+                codes[col], self.levels[col] = pd.factorize(df[col])
+
+        # One block of na x nb cells per pair, filled by one bincount
+        shapes = np.array([(len(self.levels[a]), len(self.levels[b])) for a, b in self.pairs],
+                          dtype=np.int64).reshape(-1, 2)
+        sizes = shapes[:, 0] * shapes[:, 1]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+        self.counts = np.zeros(int(self.offsets[-1]), dtype=np.int64)
+        for p, (a, b) in enumerate(self.pairs):
+            ca, cb = codes[a], codes[b]
+            both = (ca >= 0) & (cb >= 0)
+            self.counts[self.offsets[p]:self.offsets[p + 1]] = np.bincount(
+                ca[both].astype(np.int64) * shapes[p, 1] + cb[both], minlength=int(sizes[p]))
+        self.shapes = shapes
+        self.results = self._statistics(correction)
+
+    def _statistics(self, correction):
+        shapes, counts = self.shapes, self.counts.astype(float)
+        n_pairs = len(self.pairs)
+        sizes = shapes[:, 0] * shapes[:, 1]
+
+        # Pair, global row and global column of every cell
+        pair = np.repeat(np.arange(n_pairs), sizes)
+        local = np.arange(len(counts)) - self.offsets[:-1][pair]
+        row_offsets = np.concatenate([[0], np.cumsum(shapes[:, 0])])
+        col_offsets = np.concatenate([[0], np.cumsum(shapes[:, 1])])
+        row = row_offsets[:-1][pair] + local // np.maximum(shapes[:, 1], 1)[pair]
+        col = col_offsets[:-1][pair] + local % np.maximum(shapes[:, 1], 1)[pair]
+
+        n = np.bincount(pair, weights=counts, minlength=n_pairs)
+        row_tot = np.bincount(row, weights=counts, minlength=int(row_offsets[-1]))
+        col_tot = np.bincount(col, weights=counts, minlength=int(col_offsets[-1]))
+        row_pair = np.repeat(np.arange(n_pairs), shapes[:, 0])
+        col_pair = np.repeat(np.arange(n_pairs), shapes[:, 1])
+        r = np.bincount(row_pair, weights=row_tot > 0, minlength=n_pairs).astype(np.int64)
+        c = np.bincount(col_pair, weights=col_tot > 0, minlength=n_pairs).astype(np.int64)
+        dof = np.maximum(r - 1, 0) * np.maximum(c - 1, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = row_tot[row] * col_tot[col] / n[pair]
+            diff = np.abs(counts - expected)
+            if correction:
+                yates = dof[pair] == 1
+                diff[yates] -= np.minimum(0.5, diff[yates])
+            terms = np.where(expected > 0, diff ** 2 / expected, 0.0)
+        chi2 = np.bincount(pair, weights=terms, minlength=n_pairs)
+        chi2[dof == 0] = 0.0
+
+        if chdtrc is not None:
+            p = np.where(dof > 0, chdtrc(np.maximum(dof, 1), chi2), 1.0)
+        else:
+            p = np.full(n_pairs, np.nan)
+        denom = n * np.minimum(r - 1, c - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v = np.where(denom > 0, np.sqrt(chi2 / denom), np.nan)
+
+        return pd.DataFrame({
+            'var1': [a for a, _ in self.pairs],
+            'var2': [b for _, b in self.pairs],
+            'n': n.astype(np.int64),
+            'rows': r,
+            'cols': c,
+            'chi2': chi2,
+            'dof': dof,
+            'p_value': p,
+            'cramers_v': v,
+        })
+
+    def table(self, a, b):
+        """The contingency table of one pair, as ``pd.crosstab`` prints it."""
+        p = self.pairs.index((a, b))
+        na, nb = self.shapes[p]
+        tab = self.counts[self.offsets[p]:self.offsets[p + 1]].reshape(na, nb)
+        out = pd.DataFrame(tab, index=pd.Index(self.levels[a], name=a),
+                           columns=pd.Index(self.levels[b], name=b))
+        return out.loc[tab.sum(axis=1) > 0, tab.sum(axis=0) > 0]
+
+
+def chisq_cramer(df, pairs=None, correction=True):
+    """χ², dof, p-value and Cramér's V per attribute pair (all pairs by default)."""
+    return Associations(df, pairs, correction).results
+
+# =========================================================
+# INFORMATION LOSS FROM CLASS HISTOGRAMS
+# =========================================================
+# Every measure below reads the class sizes and class keys of an
+# EquivalenceClasses (or any table with ``k``), never the records.
+
+class Domain:
+    """
+    The raw values of one QI and, for every value an anonymised release
+    may hold, the raw values it stands for: a raw value itself, a
+    generalised value of ``hierarchy`` (any level) the raw values that
+    generalise to it, and a missing, suppressed or unknown value all of
+    them. Built from the distinct raw values, e.g. the class keys.
+    """
+
+    def __init__(self, raw, hierarchy=None):
+        raw = pd.Series(raw)
+        has_missing = bool(raw.isna().any())
+        raw = pd.Series(pd.unique(raw.dropna()), dtype=object)
+        self.values = list(raw)
+        self.size = len(self.values)
+        self.cover = {v: np.array([i]) for i, v in enumerate(self.values)}
+        if hierarchy is not None and self.size:
+            compiled = hierarchy.compile(raw)
+            for level in range(1, len(hierarchy.level_names)):
+                codes = compiled.codes(level)
+                for c, category in enumerate(compiled.categories[level]):
+                    covered = np.flatnonzero(codes == c)
+                    # A category only the missing raw value maps to covers nothing
+                    if len(covered):
+                        self.cover.setdefault(category, covered)
+        # Code ``size`` is a missing raw value; only suppression covers it
+        self.everything = np.arange(self.size + has_missing)
+
+    def code(self, value):
+        """Raw code of an original value (``size`` for missing)."""
+        if pd.isna(value):
+            return self.size
+        return int(self.cover[value][0])
+
+    def covered(self, value):
+        """Raw codes an anonymised value stands for."""
+        if pd.isna(value):
+            return self.everything
+        return self.cover.get(value, self.everything)
+
+    def penalty(self, value):
+        """NCP of one value: 0 for a raw value, 1 for suppressed."""
+        if self.size <= 1:
+            return 0.0
+        return min(len(self.covered(value)) - 1, self.size - 1) / (self.size - 1)
+
+
+def _histogram(classes, qis=None):
+    """(keys, sizes) of a class histogram, summed down to ``qis`` if given."""
+    table = classes.class_table(k_name='_k')
+    if qis is not None and list(qis) != list(classes.qis):
+        table = table.groupby(list(qis), dropna=False, sort=False)['_k'].sum().reset_index()
+    return table.drop(columns='_k'), table['_k'].to_numpy(dtype=float)
+
+
+def discernibility(classes, n_suppressed=0):
+    """Sum of squared class sizes, plus N for every suppressed record."""
+    k = np.asarray(classes.k, dtype=float)
+    return float((k ** 2).sum() + n_suppressed * (k.sum() + n_suppressed))
+
+
+def average_class_size(classes, k=None):
+    """Records per class; divided by ``k`` this is the normalised C_avg."""
+    sizes = np.asarray(classes.k)
+    avg = float(sizes.sum() / len(sizes)) if len(sizes) else 0.0
+    return avg / k if k else avg
+
+
+def certainty_penalty(classes, domains):
+    """
+    Normalised certainty penalty per QI with a Domain: the mean over the
+    records of (raw values covered - 1) / (raw values - 1). 'total' is
+    the mean over those QIs.
+    """
+    keys, k = _histogram(classes)
+    out = {}
+    for qi, domain in domains.items():
+        penalty = np.array([domain.penalty(v) for v in keys[qi]], dtype=float)
+        out[qi] = float((penalty * k).sum() / k.sum()) if k.sum() else 0.0
+    out['total'] = float(np.mean(list(out.values()))) if out else 0.0
+    return out
+
+
+def _release_mass(original, anonymised, domains, qis, block):
+    """
+    (p, q) over the original classes on ``qis``: P's share of every class
+    and the share of the release Q that falls on it, where a generalised
+    or suppressed value spreads its records evenly over the raw values it
+    covers. q sums to less than 1 when Q also covers raw values P lacks.
+    """
+    p_keys, p = _histogram(original, qis)
+    q_keys, q = _histogram(anonymised, qis)
+    p, q = p / p.sum(), q / q.sum()
+
+    # Per QI: raw code of every original class, weight of every anonymised
+    # class on every raw code
+    x_codes, weights = [], []
+    for qi in qis:
+        domain = domains[qi]
+        x_codes.append(np.array([domain.code(v) for v in p_keys[qi]], dtype=np.int64))
+        w = np.zeros((domain.size + 1, len(q_keys)))
+        for c, value in enumerate(q_keys[qi]):
+            covered = domain.covered(value)
+            w[covered, c] = 1.0 / len(covered)
+        weights.append(w)
+
+    q_at_p = np.empty(len(p))
+    for start in range(0, len(p), block):
+        rows = slice(start, start + block)
+        share = np.ones((len(p[rows]), len(q)))
+        for codes, w in zip(x_codes, weights):
+            share *= w[codes[rows]]
+        q_at_p[rows] = share @ q
+    return p, q_at_p
+
+
+def kl_divergence(original, anonymised, domains, qis=None, block=4096):
+    """
+    KL(P || Q) of the original distribution P over ``qis`` (all QIs of
+    ``original`` by default) against the anonymised release Q. Infinite
+    when Q misses records P has (e.g. values changed by PRAM that nothing
+    in the release covers); js_divergence is the bounded alternative.
+    """
+    qis = list(original.qis if qis is None else qis)
+    p, q = _release_mass(original, anonymised, domains, qis, block)
+    with np.errstate(divide='ignore'):
+        return float(np.sum(p * (np.log(p) - np.log(q))))
+
+
+def js_divergence(original, anonymised, domains, qis=None, block=4096):
+    """
+    Jensen-Shannon divergence (natural log, 0 .. log 2) of P and Q as in
+    kl_divergence, against their mixture M = (P + Q) / 2. Finite when Q
+    misses cells of P; the mass Q puts outside P's classes adds
+    (1 - sum q) * log 2.
+    """
+    qis = list(original.qis if qis is None else qis)
+    return _js(*_release_mass(original, anonymised, domains, qis, block))
+
+
+def _js(p, q):
+    m = (p + q) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        in_p = np.sum(p * np.log(p / m)) + np.sum(np.where(q > 0, q * np.log(q / m), 0.0))
+    outside = max(1.0 - q.sum(), 0.0) * np.log(2)
+    return max(float((in_p + outside) / 2), 0.0)
+
+
+def uncovered_mass(original, anonymised, domains, qis=None, block=4096):
+    """Share of the original records on ``qis`` that no release value covers."""
+    qis = list(original.qis if qis is None else qis)
+    return _uncovered(*_release_mass(original, anonymised, domains, qis, block))
+
+
+def _uncovered(p, q):
+    return float(p[q <= 0].sum())
+
+
+def information_loss(original, anonymised, qis, hierarchies=None, k=None, n_suppressed=0):
+    """
+    Discernibility, average class size, NCP per QI, and the Jensen-Shannon
+    divergence and uncovered mass (see js_divergence, uncovered_mass) of
+    the joint and of every marginal, for an anonymised release against
+    the original. Both may be frames or EquivalenceClasses over ``qis``
+    (missing values as their own classes); frames are grouped once and
+    everything else is read off the two class histograms. ``hierarchies``
+    ({qi: Hierarchy}) tells which raw values a generalised value covers.
+    """
+    if not isinstance(original, EquivalenceClasses):
+        original = EquivalenceClasses(original, qis, dropna=False)
+    if not isinstance(anonymised, EquivalenceClasses):
+        anonymised = EquivalenceClasses(anonymised, qis, dropna=False)
+    hierarchies = hierarchies or {}
+    domains = {qi: Domain(original.keys[qi], hierarchies.get(qi)) for qi in qis}
+
+    out = {
+        'discernibility': discernibility(anonymised, n_suppressed),
+        'avg_class_size': average_class_size(anonymised, k),
+    }
+    out.update({f'ncp_{qi}': v for qi, v in certainty_penalty(anonymised, domains).items()})
+    for name, cols in [('joint', qis)] + [(qi, [qi]) for qi in qis]:
+        p, q = _release_mass(original, anonymised, domains, cols, 4096)
+        out[f'js_{name}'] = _js(p, q)
+        out[f'uncovered_{name}'] = _uncovered(p, q)
+    return out
+
+# =========================================================
+# BEFORE / AFTER UTILITY DELTA
+# =========================================================
+
+def _overlap(before, after):
+    """1 - total variation distance of two count tables (Series or DataFrames)."""
+    p = before.stack() if isinstance(before, pd.DataFrame) else before
+    q = after.stack() if isinstance(after, pd.DataFrame) else after
+    p, q = p / p.sum(), q / q.sum()
+    p, q = p.align(q, fill_value=0)
+    return float(np.minimum(p, q).sum())
+
+
+def _preserved(before, after):
+    """Share of aligned records whose value is unchanged (missing == missing)."""
+    b, a = pd.Series(before, dtype=object).to_numpy(), pd.Series(after, dtype=object).to_numpy()
+    same = (b == a) | (pd.isna(b) & pd.isna(a))
+    return float(same.mean()) if len(same) else float('nan')
+
+
+def utility_delta(original, anonymised, pairs, aligned=None, alpha=0.05):
+    """
+    How much association survives anonymisation, one row per pair.
+
+    ``original`` and ``anonymised`` are frames or Associations already
+    computed over ``pairs`` (so the original's tables can be reused for
+    every candidate release). Per pair: Cramér's V and p-value before and
+    after, whether the test is significant at ``alpha`` before/after, and
+    the overlap (1 - total variation distance) of the two contingency
+    tables. Per attribute, the share of records whose value is kept when
+    the releases are aligned row by row (``aligned``: by default when
+    both are frames with the same index), otherwise the overlap of the
+    two marginal distributions.
+    """
+    pairs = [(a, b) for a, b in pairs]
+    frames = isinstance(original, pd.DataFrame) and isinstance(anonymised, pd.DataFrame)
+    if aligned is None:
+        aligned = frames and original.index.equals(anonymised.index)
+    if aligned and not frames:
+        raise ValueError("Record alignment needs both releases as frames.")
+    before = original if isinstance(original, Associations) else Associations(original, pairs)
+    after = anonymised if isinstance(anonymised, Associations) else Associations(anonymised, pairs)
+    stats_before = before.results.set_index(['var1', 'var2'])
+    stats_after = after.results.set_index(['var1', 'var2'])
+
+    rows = []
+    for a, b in pairs:
+        s0, s1 = stats_before.loc[(a, b)], stats_after.loc[(a, b)]
+        t0, t1 = before.table(a, b), after.table(a, b)
+        if aligned:
+            kept_a = _preserved(original[a], anonymised[a])
+            kept_b = _preserved(original[b], anonymised[b])
+        else:
+            kept_a = _overlap(t0.sum(axis=1), t1.sum(axis=1))
+            kept_b = _overlap(t0.sum(axis=0), t1.sum(axis=0))
+        rows.append({
+            'var1': a, 'var2': b,
+            'n_before': int(s0['n']), 'n_after': int(s1['n']),
+            'v_before': s0['cramers_v'], 'v_after': s1['cramers_v'],
+            'delta_v': s1['cramers_v'] - s0['cramers_v'],
+            'p_before': s0['p_value'], 'p_after': s1['p_value'],
+            'significant_before': bool(s0['p_value'] < alpha),
+            'significant_after': bool(s1['p_value'] < alpha),
+            'table_overlap': _overlap(t0, t1),
+            'var1_kept': kept_a, 'var2_kept': kept_b,
+        })
+    out = pd.DataFrame(rows)
+    out['alignment'] = 'records' if aligned else 'marginals'
+    return out
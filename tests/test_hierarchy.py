@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sdc.hierarchy import CITIZENSHIP, MISSING, OTHER, SUPPRESSED, ZIP, Hierarchy, zip_prefix
+
+ZIPS = pd.Series([2100, 2210, 2350, 2480, 2100, np.nan, 'abc'], name='zip', dtype=object)
+
+
+def test_every_level_matches_map():
+    for level, rule in enumerate(ZIP.rules[1:], start=1):
+        expected = ZIPS.map(rule) if callable(rule) else pd.Series(rule, index=ZIPS.index)
+        assert ZIP.generalise(ZIPS, level).tolist() == expected.tolist()
+    assert ZIP.generalise(ZIPS, 'raw').iloc[:5].tolist() == ZIPS.iloc[:5].tolist()
+
+
+def test_level_names_and_bounds():
+    assert ZIP.level('region') == 2
+    assert ZIP.level(-1) == 3
+    with pytest.raises(IndexError):
+        ZIP.level(4)
+
+
+def test_dict_rule_other_and_missing():
+    sex = Hierarchy('sex', [('coded', {'Male': 'M', OTHER: '?', MISSING: '-'})])
+    out = sex.generalise(pd.Series(['Male', 'Female', None]), 'coded')
+    assert out.tolist() == ['M', '?', '-']
+
+
+def test_rollup_maps_level_codes_upwards():
+    compiled = ZIP.compile(ZIPS)
+    table = compiled.rollup('prefix', 'region')
+    prefix, region = compiled.codes('prefix'), compiled.codes('region')
+    assert (table[prefix] == region).all()
+
+
+def test_rollup_rejects_levels_that_do_not_nest():
+    compiled = CITIZENSHIP.compile(pd.Series(['Denmark', 'Chile', 'Spain']))
+    with pytest.raises(ValueError):
+        compiled.rollup('suppressed', 'eu')
+
+
+def test_zip_prefix_invalid():
+    assert zip_prefix('2345') == '23xx'
+    assert zip_prefix(None) == SUPPRESSED
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from sdc.ages import band_rule
+from sdc.hierarchy import ZIP, Hierarchy
+from sdc.lattice import Lattice
+
+AGE = Hierarchy('age', [
+    ('10y', band_rule("18-30/31-40/41-50/51-65/66+")),
+    ('3 bands', band_rule("18-30/31-50/51+")),
+    ('suppressed', '*'),
+])
+SEX = Hierarchy('sex', [('suppressed', '*')])
+
+
+def toy_table(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'age': rng.integers(18, 70, n),
+        'zip': rng.choice([2100, 2150, 2200, 2300, 2420], n),
+        'sex': rng.choice(['Male', 'Female'], n),
+        'party': rng.choice(['Red', 'Blue', 'Green'], n),
+    })
+
+
+def brute_force(lattice, df, k, l=1):
+    """(discernibility, node) of every node meeting k and l, from the generalised records."""
+    out = []
+    for node in lattice.nodes():
+        gen = lattice.generalise(df, node)
+        groups = gen.groupby(lattice.qis, dropna=False)
+        sizes = groups.size()
+        if sizes.min() >= k and groups['party'].nunique().min() >= l:
+            out.append((float((sizes.astype(float) ** 2).sum()), node))
+    return out
+
+
+def test_search_finds_the_minimal_loss_node():
+    df = toy_table()
+    lattice = Lattice(df, {'age': AGE, 'zip': ZIP, 'sex': SEX}, sensitive='party')
+    for k, l in [(2, 1), (3, 1), (5, 2), (10, 1)]:
+        found = lattice.search(k=k, l=l)
+        expected = brute_force(lattice, df, k, l)
+        best = min(loss for loss, _ in expected)
+        assert found['loss'] == best
+        assert (best, found['levels']) in expected
+        assert found['k'] >= k and found['l'] >= l
+
+
+def test_frontier_is_every_minimal_satisfying_node():
+    df = toy_table(seed=1)
+    lattice = Lattice(df, {'age': AGE, 'zip': ZIP, 'sex': SEX})
+    satisfying = {node for _, node in brute_force(lattice, df, 4)}
+    minimal = {node for node in satisfying
+               if not any(other != node and all(a <= b for a, b in zip(other, node))
+                          for other in satisfying)}
+    found = lattice.search(k=4)
+    assert {tuple(lattice.describe(n).values()) for n in minimal} == \
+        {tuple(node.values()) for node, _ in found['frontier']}
+
+
+def test_search_returns_none_when_nothing_qualifies():
+    df = toy_table(n=5)
+    lattice = Lattice(df, {'age': AGE, 'zip': ZIP, 'sex': SEX})
+    assert lattice.search(k=6) is None
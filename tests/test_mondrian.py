@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from sdc.mondrian import anonymise, partition
+
+EDUCATION = ['Primary', 'Secondary', 'Bachelor', 'Master', 'PhD']
+
+
+def survey(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'age': rng.integers(18, 90, n).astype(float),
+        'zip': rng.choice([2100, 2200, 2300, 2400], n),
+        'education': rng.choice(EDUCATION, n),
+        'party': rng.choice(['Red', 'Blue', 'Green', 'Yellow'], n),
+    })
+    df.loc[rng.random(n) < 0.05, 'age'] = np.nan
+    return df
+
+
+def test_every_partition_reaches_k():
+    df = survey()
+    for k in [2, 5, 17]:
+        part = partition(df, ['age', 'zip', 'education'], k=k,
+                         order={'education': EDUCATION})
+        sizes = np.bincount(part)
+        assert sizes.min() >= k
+        assert len(sizes) > 1
+
+
+def test_every_partition_reaches_l():
+    df = survey(seed=1)
+    part = partition(df, ['age', 'zip'], k=4, sensitive='party', l=3)
+    distinct = df.groupby(part)['party'].nunique()
+    assert np.bincount(part).min() >= 4
+    assert distinct.min() >= 3
+
+
+def test_generalised_classes_reach_k():
+    df = survey(seed=2)
+    out, part = anonymise(df, ['age', 'zip', 'education'], k=6,
+                          order={'education': EDUCATION})
+    assert out.groupby(['age', 'zip', 'education'], dropna=False).size().min() >= 6
+    # Every partition generalises to one class
+    assert (out.groupby(part)[['age', 'zip', 'education']].nunique(dropna=False) == 1).all().all()
+
+
+def test_too_few_records_stay_one_partition():
+    df = survey(n=7)
+    assert (partition(df, ['age', 'zip'], k=4) == 0).all()
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sdc.eqclass import EquivalenceClasses
+from sdc.hierarchy import ZIP
+from sdc.utility import Associations, Domain, certainty_penalty, js_divergence, uncovered_mass
+
+
+def survey(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'sex': rng.choice(['Male', 'Female'], n),
+        'voted': rng.choice([0, 1], n),
+        'education': rng.choice(['Primary', 'Secondary', 'Bachelor', 'Master'], n),
+        'party': rng.choice(['Red', 'Blue', 'Green'], n, p=[0.5, 0.3, 0.2]),
+    })
+    df.loc[rng.random(n) < 0.1, 'education'] = np.nan
+    # A level that only occurs where party is missing
+    df.loc[:4, 'party'] = np.nan
+    df.loc[:4, 'education'] = 'PhD'
+    return df
+
+
+@pytest.mark.parametrize('correction', [True, False])
+def test_associations_match_chi2_contingency(correction):
+    scipy_stats = pytest.importorskip('scipy.stats')
+    df = survey()
+    results = Associations(df, correction=correction).results
+    assert len(results) == 6
+    for row in results.itertuples():
+        table = pd.crosstab(df[row.var1], df[row.var2])
+        chi2, p, dof, _ = scipy_stats.chi2_contingency(table, correction=correction)
+        n = table.to_numpy().sum()
+        assert row.n == n
+        assert row.dof == dof
+        assert row.chi2 == pytest.approx(chi2)
+        assert row.p_value == pytest.approx(p)
+        assert row.cramers_v == pytest.approx(np.sqrt(chi2 / (n * (min(table.shape) - 1))))
+
+
+def test_table_matches_crosstab():
+    df = survey(seed=1)
+    assoc = Associations(df, pairs=[('education', 'party')])
+    expected = pd.crosstab(df['education'], df['party'])
+    pd.testing.assert_frame_equal(assoc.table('education', 'party'), expected, check_dtype=False)
+
+
+# One record per zip; the domain covers 2100 .. 2400
+ORIGINAL = pd.DataFrame({'zip': ['2100', '2200', '2300', '2400']})
+DOMAINS = {'zip': Domain(ORIGINAL['zip'], ZIP)}
+
+
+def classes(zips):
+    return EquivalenceClasses(pd.DataFrame({'zip': zips}), ['zip'], dropna=False)
+
+
+def test_certainty_penalty_of_hand_built_release():
+    # '21-22xx' covers 2 of 4 values: (2 - 1) / (4 - 1); '*' covers all: 1
+    release = classes(['21-22xx', '21-22xx', '*', '*'])
+    penalty = certainty_penalty(release, DOMAINS)
+    assert penalty['zip'] == pytest.approx((2 * 1 / 3 + 2 * 1) / 4)
+    assert penalty['total'] == penalty['zip']
+    assert certainty_penalty(classes(ORIGINAL['zip']), DOMAINS)['zip'] == 0.0
+
+
+def test_js_divergence_of_hand_built_release():
+    original = classes(ORIGINAL['zip'])
+    # P = 1/4 each; Q = 1/2, 1/4, 1/4, 0; M = 3/8, 1/4, 1/4, 1/8
+    # JS = (1/4 log(4/3) + 1/2 log(4/3)) / 2
+    release = classes(['2100', '2100', '2200', '2300'])
+    assert js_divergence(original, release, DOMAINS) == pytest.approx(0.375 * np.log(4 / 3))
+    assert uncovered_mass(original, release, DOMAINS) == pytest.approx(0.25)
+    # Generalising spreads the records evenly: nothing is lost on a uniform P
+    for zips in [['21-22xx', '21-22xx', '23-24xx', '23-24xx'], ['*'] * 4]:
+        assert js_divergence(original, classes(zips), DOMAINS) == pytest.approx(0.0, abs=1e-12)
+    assert js_divergence(original, original, DOMAINS) == pytest.approx(0.0, abs=1e-12)